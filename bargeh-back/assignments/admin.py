@@ -10,6 +10,7 @@ from .models import (
     Submission,
     SubmissionPageMap,
     SubmissionGrade,
+    SubmissionScore,
 )
 
 
@@ -415,6 +416,20 @@ class SubmissionGradeAdmin(admin.ModelAdmin):
 
     selected_items_count.short_description = "Selected Items"
 
+    # Admin edits keep the materialized submission totals in step
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        SubmissionScore.refresh([form.instance.submission_id])
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        SubmissionScore.refresh([obj.submission_id])
+
+    def delete_queryset(self, request, queryset):
+        submission_ids = set(queryset.values_list("submission_id", flat=True))
+        super().delete_queryset(request, queryset)
+        SubmissionScore.refresh(submission_ids)
+
     def get_queryset(self, request):
         return (
             super()
@@ -426,3 +441,33 @@ class SubmissionGradeAdmin(admin.ModelAdmin):
             )
             .prefetch_related("selected_items")
         )
+
+
+@admin.register(SubmissionScore)
+class SubmissionScoreAdmin(admin.ModelAdmin):
+    list_display = (
+        "submission",
+        "total_score",
+        "graded_questions",
+        "last_graded_at",
+        "updated_at",
+    )
+    list_filter = ("submission__assignment__course",)
+    search_fields = (
+        "submission__student__email",
+        "submission__assignment__title",
+    )
+    readonly_fields = (
+        "submission",
+        "total_score",
+        "graded_questions",
+        "last_graded_at",
+        "updated_at",
+    )
+
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .select_related("submission__student", "submission__assignment")
+        )
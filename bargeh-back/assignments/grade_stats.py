@@ -0,0 +1,100 @@
+import numpy as np
+
+from .models import Submission, SubmissionGrade
+
+PERCENTILES = (10, 25, 50, 75, 90)
+HISTOGRAM_BINS = 10
+
+
+def describe(scores, max_points):
+    """
+    Summary statistics of a score array, with a histogram over [0, max_points].
+
+    The standard deviation is the sample one (ddof=1), as the statistics
+    module's stdev used before.
+    """
+    scores = np.asarray(scores, dtype=float)
+    upper = max(float(max_points), float(scores.max()) if scores.size else 0.0) or 1.0
+    counts, edges = np.histogram(scores, bins=HISTOGRAM_BINS, range=(0.0, upper))
+    histogram = {
+        "bin_edges": [round(float(edge), 2) for edge in edges],
+        "counts": counts.tolist(),
+    }
+
+    if not scores.size:
+        return {
+            "count": 0,
+            "minimum": 0,
+            "maximum": 0,
+            "mean": 0,
+            "median": 0,
+            "std_dev": 0,
+            "percentiles": {f"p{p}": 0 for p in PERCENTILES},
+            "histogram": histogram,
+        }
+
+    percentiles = np.percentile(scores, PERCENTILES)
+    return {
+        "count": int(scores.size),
+        "minimum": round(float(scores.min()), 2),
+        "maximum": round(float(scores.max()), 2),
+        "mean": round(float(scores.mean()), 2),
+        "median": round(float(np.median(scores)), 2),
+        "std_dev": round(float(scores.std(ddof=1)) if scores.size > 1 else 0.0, 2),
+        "percentiles": {
+            f"p{p}": round(float(value), 2)
+            for p, value in zip(PERCENTILES, percentiles)
+        },
+        "histogram": histogram,
+    }
+
+
+def assignment_statistics(assignment):
+    """
+    Statistics over per-student totals and for each question of an assignment.
+
+    Scores come back from the database as flat (submission, question, points)
+    rows; totals are summed per submission with bincount rather than by
+    building model instances.
+    """
+    questions = list(
+        assignment.questions.order_by("order_index", "number").values_list(
+            "id", "number", "title", "max_points"
+        )
+    )
+    total_students = Submission.objects.filter(assignment=assignment).count()
+    rows = list(
+        SubmissionGrade.objects.filter(submission__assignment=assignment)
+        .order_by()
+        .values_list("submission_id", "question_id", "total_points")
+    )
+
+    if rows:
+        submission_ids, question_ids, points = zip(*rows)
+        submission_ids = np.asarray(submission_ids)
+        question_ids = np.asarray(question_ids)
+        points = np.asarray(points, dtype=float)
+    else:
+        submission_ids = question_ids = np.empty(0, dtype=int)
+        points = np.empty(0, dtype=float)
+
+    # Each graded submission counts once, with the sum of its question scores
+    _, student_index = np.unique(submission_ids, return_inverse=True)
+    totals = np.bincount(student_index, weights=points) if points.size else points
+
+    max_total = sum(float(max_points) for *_, max_points in questions)
+    stats = describe(totals, max_total or float(assignment.total_points or 0))
+    stats.pop("count")
+    stats["total_students"] = total_students
+    stats["graded_students"] = int(totals.size)
+    stats["questions"] = [
+        {
+            "question_id": question_id,
+            "number": number,
+            "title": title,
+            "max_points": float(max_points),
+            **describe(points[question_ids == question_id], max_points),
+        }
+        for question_id, number, title, max_points in questions
+    ]
+    return stats
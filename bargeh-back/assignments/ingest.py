@@ -0,0 +1,337 @@
+import os
+import re
+import shutil
+import uuid
+import zipfile
+from collections import defaultdict
+from concurrent.futures import as_completed
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from courses.models import CourseMembership
+from .models import (
+    Submission,
+    SubmissionPageMap,
+    UploadSession,
+    default_page_map,
+)
+from .pdf import inspect_pdf_path, split_pdf_pages
+from .rendering import get_executor, schedule_render
+from .storage import content_addressed_storage
+
+COPY_BUFFER_SIZE = 1024 * 1024
+TOKEN_SPLIT_RE = re.compile(r"[\s_\-]+")
+
+
+class IngestError(Exception):
+    """An upload that cannot be ingested at all"""
+
+
+def make_staging_dir():
+    """A fresh directory under MEDIA_ROOT, on the same file system as storage"""
+    staging_dir = os.path.join(
+        settings.MEDIA_ROOT, UploadSession.PARTIAL_DIR, f"ingest-{uuid.uuid4().hex}"
+    )
+    os.makedirs(staging_dir)
+    return staging_dir
+
+
+class StagedStream:
+    """
+    An iterator over ``iterable`` that owns a staging directory.
+
+    Django closes a streamed response's content even when it was never read,
+    for instance when the client goes away before the first chunk. A plain
+    generator that was never started skips its ``finally`` on close, so the
+    directory is removed here instead.
+    """
+
+    def __init__(self, iterable, staging_dir):
+        self.iterator = iter(iterable)
+        self.staging_dir = staging_dir
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.iterator)
+
+    def close(self):
+        close = getattr(self.iterator, "close", None)
+        if close is not None:
+            close()
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+
+def stage_uploads(archive=None, files=()):
+    """
+    Copy a ZIP's PDFs and loose uploaded PDFs into a staging directory.
+
+    The directory sits under MEDIA_ROOT so staged files can later be renamed
+    into storage without another copy. Returns (staging_dir, [(name, path)]).
+    """
+    staging_dir = make_staging_dir()
+    staged = []
+    total_size = 0
+
+    def stage(name, source):
+        nonlocal total_size
+        path = os.path.join(staging_dir, f"{len(staged)}.pdf")
+        with open(path, "wb") as target:
+            while True:
+                chunk = source.read(COPY_BUFFER_SIZE)
+                if not chunk:
+                    break
+                total_size += len(chunk)
+                if total_size > settings.UPLOAD_MAX_SIZE:
+                    raise IngestError(
+                        f"Upload exceeds {settings.UPLOAD_MAX_SIZE} bytes"
+                    )
+                target.write(chunk)
+        staged.append((name, path))
+
+    try:
+        if archive is not None:
+            try:
+                with zipfile.ZipFile(archive) as zf:
+                    for member in zf.infolist():
+                        name = os.path.basename(member.filename)
+                        if (
+                            member.is_dir()
+                            or not name.lower().endswith(".pdf")
+                            or member.filename.startswith("__MACOSX/")
+                            or name.startswith(".")
+                        ):
+                            continue
+                        with zf.open(member) as source:
+                            stage(name, source)
+            except zipfile.BadZipFile:
+                raise IngestError("archive is not a valid ZIP file")
+
+        for uploaded in files:
+            name = os.path.basename(uploaded.name)
+            if name.lower().endswith(".pdf"):
+                uploaded.seek(0)
+                stage(name, uploaded)
+    except Exception:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+    return staging_dir, staged
+
+
+def roster_lookup(course_id):
+    """
+    Map lower-cased emails and email local parts to student ids in one query.
+
+    Local parts shared by several students are left out, since a file name
+    carrying one of them cannot be matched safely.
+    """
+    lookup = {}
+    ambiguous = set()
+    memberships = CourseMembership.objects.filter(
+        course_id=course_id, role=CourseMembership.Role.STUDENT
+    ).values_list("user_id", "user__email")
+    for user_id, email in memberships:
+        email = email.lower()
+        lookup[email] = user_id
+        local_part = email.split("@", 1)[0]
+        if local_part in lookup and lookup[local_part] != user_id:
+            ambiguous.add(local_part)
+        lookup[local_part] = user_id
+    for key in ambiguous:
+        del lookup[key]
+    return lookup
+
+
+def match_student(filename, lookup):
+    """Student id for a file named after an email or student number, if any"""
+    stem = os.path.splitext(filename)[0].strip().lower()
+    if stem in lookup:
+        return lookup[stem]
+    for token in TOKEN_SPLIT_RE.split(stem):
+        if token in lookup:
+            return lookup[token]
+    return None
+
+
+def insert_submissions(submissions):
+    """
+    Bulk-insert new submissions of one assignment and return them with ids set.
+
+    Backends that do not return rows from a bulk insert (MySQL) re-select the
+    new rows instead. Rows with the same student and stored file are
+    interchangeable, so their ids are handed out by that key; rows that
+    already held one of the files are left out.
+    """
+    if not submissions or connection.features.can_return_rows_from_bulk_insert:
+        return Submission.objects.bulk_create(submissions)
+
+    rows = Submission.objects.filter(
+        assignment=submissions[0].assignment,
+        file__in={submission.file.name for submission in submissions},
+    )
+    existing = list(rows.values_list("id", flat=True))
+    Submission.objects.bulk_create(submissions)
+
+    new_ids = defaultdict(list)
+    for pk, student_id, file_name in rows.exclude(id__in=existing).values_list(
+        "id", "student_id", "file"
+    ):
+        new_ids[(student_id, file_name)].append(pk)
+    for submission in submissions:
+        submission.pk = new_ids[(submission.student_id, submission.file.name)].pop()
+    return submissions
+
+
+def create_submissions(assignment, uploaded_by, staged_files, prefill_page_maps=False):
+    """
+    Move staged PDFs into storage and bulk-create their submissions.
+
+    ``staged_files`` holds (name, path, student_id, metadata) tuples, with
+    metadata as returned by inspect_pdf_path. Page maps start empty, or from
+    the questions' default pages with ``prefill_page_maps``.
+    """
+    default_pages = assignment.question_default_pages() if prefill_page_maps else []
+
+    upload_to = Submission._meta.get_field("file").upload_to
+    with transaction.atomic():
+        # Blob references are registered in the transaction that inserts
+        # the rows holding them, so a rollback drops both
+        submissions = []
+        for name, path, student_id, metadata in staged_files:
+            submission = Submission(
+                assignment=assignment,
+                uploaded_by=uploaded_by,
+                student_id=student_id,
+                num_pages=metadata["num_pages"],
+                file_size=metadata["file_size"],
+                content_hash=metadata["content_hash"],
+                page_sizes=metadata["page_sizes"],
+            )
+            submission.file.name = content_addressed_storage.save_local_file(
+                upload_to + name,
+                path,
+                metadata["content_hash"],
+                metadata["file_size"],
+            )
+            submissions.append(submission)
+
+        submissions = insert_submissions(submissions)
+        SubmissionPageMap.objects.bulk_create(
+            SubmissionPageMap(
+                submission=submission,
+                page_map=default_page_map(default_pages, submission.num_pages),
+            )
+            for submission in submissions
+        )
+        for submission in submissions:
+            transaction.on_commit(lambda f=submission.file: schedule_render(f))
+
+    return submissions
+
+
+def split_stack(assignment, uploaded_by, pdf_path, pages_per_submission):
+    """
+    Split one scanned stack into unassigned submissions of a fixed page count.
+
+    The split runs in the worker pool; each part's page map is pre-filled
+    from the questions' default page numbers.
+    """
+    staging_dir = make_staging_dir()
+    try:
+        parts = (
+            get_executor()
+            .submit(split_pdf_pages, pdf_path, staging_dir, pages_per_submission)
+            .result()
+        )
+        return create_submissions(
+            assignment,
+            uploaded_by,
+            [
+                (f"stack-part-{index}.pdf", part["path"], None, part)
+                for index, part in enumerate(parts, start=1)
+            ],
+            prefill_page_maps=True,
+        )
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def ingest_pdfs(assignment, uploaded_by, staged, staging_dir):
+    """
+    Inspect staged PDFs in the worker pool and create their submissions.
+
+    Yields one progress event per file as workers finish, then a summary.
+    Submissions and page maps are created with one bulk_create each. The
+    staging directory is removed once the events are exhausted; wrap them in
+    StagedStream when they may never be read.
+    """
+    try:
+        lookup = roster_lookup(assignment.course_id)
+        submitted = set(
+            Submission.objects.filter(
+                assignment=assignment, student__isnull=False
+            ).values_list("student_id", flat=True)
+        )
+
+        executor = get_executor()
+        futures = {
+            executor.submit(inspect_pdf_path, path): (name, path)
+            for name, path in staged
+        }
+        results = []
+        duplicates = []
+        failed = []
+        for processed, future in enumerate(as_completed(futures), start=1):
+            name, path = futures[future]
+            event = {"processed": processed, "total": len(staged), "file": name}
+            try:
+                metadata = future.result()
+            except Exception as e:
+                failed.append({"file": name, "error": str(e)})
+                event["status"] = "failed"
+                yield event
+                continue
+            if metadata["num_pages"] is None:
+                failed.append({"file": name, "error": "Not a readable PDF"})
+                event["status"] = "failed"
+                yield event
+                continue
+
+            student_id = match_student(name, lookup)
+            if student_id in submitted:
+                duplicates.append(name)
+                event["status"] = "duplicate"
+                event["student_id"] = student_id
+                yield event
+                continue
+            if student_id is not None:
+                submitted.add(student_id)
+
+            results.append((name, path, student_id, metadata))
+            event["status"] = "matched" if student_id else "unmatched"
+            event["student_id"] = student_id
+            yield event
+
+        submissions = create_submissions(
+            assignment,
+            uploaded_by,
+            results,
+            prefill_page_maps=assignment.prefills_page_maps,
+        )
+
+        yield {
+            "done": True,
+            "created": len(submissions),
+            "matched": sum(1 for s in submissions if s.student_id),
+            "unmatched": [
+                name for name, _, student_id, _ in results if student_id is None
+            ],
+            "duplicates": duplicates,
+            "failed": failed,
+            "submission_ids": [submission.id for submission in submissions],
+        }
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
@@ -0,0 +1,148 @@
+import json
+import logging
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from assignments.management.commands.generate_benchmark_data import BENCHMARK_CODE
+from assignments.models import Assignment
+from courses.models import Course
+
+
+def benchmark_endpoints(course):
+    """(name, url) pairs for the grading hot paths of one course"""
+    assignment = Assignment.objects.filter(course=course).order_by("id").first()
+    if assignment is None:
+        return []
+    question = assignment.questions.order_by("order_index").first()
+    endpoints = [
+        ("course_list", reverse("course-list")),
+        (
+            "list_submissions",
+            reverse("list-submissions", args=[assignment.id]),
+        ),
+        (
+            "get_student_grades",
+            reverse("student-grades", args=[assignment.id]),
+        ),
+        (
+            "get_grade_statistics",
+            reverse("grade-statistics", args=[assignment.id]),
+        ),
+    ]
+    if question is not None:
+        endpoints.insert(
+            2,
+            (
+                "get_question_submissions",
+                reverse("question-submissions", args=[assignment.id, question.id]),
+            ),
+        )
+    return endpoints
+
+
+class Command(BaseCommand):
+    help = (
+        "Time and count queries for the grading endpoints on each benchmark course. "
+        "Generate courses of different sizes with generate_benchmark_data "
+        "to compare scales."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--course",
+            type=int,
+            action="append",
+            help="Course id to benchmark (repeatable; default: all benchmark courses)",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Timed requests per endpoint after one warm-up (default: 5)",
+        )
+        parser.add_argument(
+            "--json",
+            dest="json_path",
+            help="Also write the results to this file for comparing runs",
+        )
+
+    def handle(self, *args, **options):
+        courses = Course.objects.select_related("owner").order_by("id")
+        if options["course"]:
+            courses = courses.filter(id__in=options["course"])
+        else:
+            courses = courses.filter(code__startswith=BENCHMARK_CODE)
+        courses = list(courses)
+        if not courses:
+            raise CommandError(
+                "No courses to benchmark; run generate_benchmark_data first"
+            )
+
+        repeat = max(1, options["repeat"])
+        results = []
+        # The test client needs the "testserver" host; request log lines
+        # would only add noise to the timings
+        logging.disable(logging.INFO)
+        try:
+            with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+            ):
+                for course in courses:
+                    results.extend(self.benchmark_course(course, repeat))
+        finally:
+            logging.disable(logging.NOTSET)
+
+        self.report(results)
+        if options["json_path"]:
+            with open(options["json_path"], "w") as handle:
+                json.dump(results, handle, indent=2)
+            self.stdout.write(f"Wrote {options['json_path']}")
+
+    def benchmark_course(self, course, repeat):
+        client = APIClient()
+        client.force_authenticate(course.owner)
+        students = course.memberships.filter(role="student").count()
+
+        results = []
+        for name, url in benchmark_endpoints(course):
+            response = client.get(url)  # warm-up
+            if response.status_code != 200:
+                raise CommandError(f"{url} returned {response.status_code}")
+
+            timings = []
+            for _ in range(repeat):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    client.get(url)
+                    timings.append((time.perf_counter() - started) * 1000)
+
+            results.append(
+                {
+                    "course": course.id,
+                    "students": students,
+                    "endpoint": name,
+                    "queries": len(queries),
+                    "median_ms": round(statistics.median(timings), 1),
+                    "max_ms": round(max(timings), 1),
+                }
+            )
+        return results
+
+    def report(self, results):
+        header = (
+            f"{'endpoint':<26} {'course':>6} {'students':>8} "
+            f"{'queries':>7} {'median ms':>10} {'max ms':>8}"
+        )
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for row in sorted(results, key=lambda row: (row["endpoint"], row["students"])):
+            self.stdout.write(
+                f"{row['endpoint']:<26} {row['course']:>6} {row['students']:>8} "
+                f"{row['queries']:>7} {row['median_ms']:>10} {row['max_ms']:>8}"
+            )
@@ -0,0 +1,259 @@
+import os
+import shutil
+import time
+from collections import Counter
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+from assignments.models import MediaBlob, UploadSession
+from assignments.uploads import abort_upload
+
+RENDER_DIR_SUFFIX = "_pages"
+
+
+class Command(BaseCommand):
+    help = "Report or delete media files that no database row references"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--delete",
+            action="store_true",
+            help="Delete orphaned files (default: dry run that only reports them)",
+        )
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=3600,
+            help="Skip files modified less than this many seconds ago (default: 3600)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of orphans to delete per batch (default: 500)",
+        )
+
+    def file_fields(self):
+        """(model, field name) for every FileField"""
+        for model in apps.get_models():
+            for field in model._meta.get_fields():
+                if isinstance(field, models.FileField):
+                    yield model, field.name
+
+    def referenced_names(self):
+        """Count references to each stored name across every FileField"""
+        references = Counter()
+        for model, field in self.file_fields():
+            names = (
+                model._default_manager.exclude(**{field: ""})
+                .exclude(**{f"{field}__isnull": True})
+                .values_list(field, flat=True)
+                .iterator(chunk_size=2000)
+            )
+            references.update(names)
+        # Partial files of chunked uploads that are still in progress;
+        # expired sessions no longer hold on to theirs
+        references.update(
+            session.partial_name
+            for session in UploadSession.objects.active().only("id").iterator()
+        )
+        return references
+
+    def still_referenced(self, names):
+        """Which of ``names`` rows reference now, after the snapshot was taken"""
+        found = set()
+        for model, field in self.file_fields():
+            found.update(
+                model._default_manager.filter(**{f"{field}__in": names}).values_list(
+                    field, flat=True
+                )
+            )
+        return found
+
+    def walk(self, root):
+        """Yield (relative name, DirEntry) for every entry under root"""
+        stack = [""]
+        while stack:
+            relative_dir = stack.pop()
+            with os.scandir(os.path.join(root, relative_dir)) as entries:
+                for entry in entries:
+                    name = (
+                        f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+                    )
+                    if entry.is_dir(follow_symlinks=False) and not entry.name.endswith(
+                        RENDER_DIR_SUFFIX
+                    ):
+                        stack.append(name)
+                    else:
+                        yield name, entry
+
+    def handle(self, *args, **options):
+        root = str(settings.MEDIA_ROOT)
+        delete = options["delete"]
+        batch_size = max(1, options["batch_size"])
+        cutoff = time.time() - options["min_age"]
+        started = time.monotonic()
+
+        expired = self.expire_upload_sessions(delete)
+
+        # Blob counts are read before the references, so an upload that
+        # registers a blob after this point shows up as a higher count
+        blob_counts = dict(MediaBlob.objects.values_list("name", "ref_count"))
+        references = self.referenced_names()
+        # Rendered page directories belong to the file with the same stem
+        referenced_stems = {os.path.splitext(name)[0] for name in references}
+
+        scanned = 0
+        orphan_count = 0
+        orphan_bytes = 0
+        skipped = 0
+        batch = []
+
+        for name, entry in self.walk(root):
+            scanned += 1
+            is_dir = entry.is_dir(follow_symlinks=False)
+            if is_dir:
+                if name[: -len(RENDER_DIR_SUFFIX)] in referenced_stems:
+                    continue
+            elif name in references:
+                continue
+
+            stat = entry.stat(follow_symlinks=False)
+            if stat.st_mtime > cutoff:
+                continue
+
+            size = directory_size(entry.path) if is_dir else stat.st_size
+            if not delete:
+                orphan_count += 1
+                orphan_bytes += size
+                self.stdout.write(f"Orphan: {name}")
+                continue
+
+            batch.append((name, entry.path, is_dir, size))
+            if len(batch) >= batch_size:
+                deleted, deleted_bytes, kept = self.delete_batch(batch, blob_counts)
+                orphan_count += deleted
+                orphan_bytes += deleted_bytes
+                skipped += kept
+                batch = []
+
+        if batch:
+            deleted, deleted_bytes, kept = self.delete_batch(batch, blob_counts)
+            orphan_count += deleted
+            orphan_bytes += deleted_bytes
+            skipped += kept
+
+        if delete:
+            self.sync_ref_counts(batch_size)
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        verb = "Deleted" if delete else "Found"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {orphan_count} orphans ({orphan_bytes} bytes) among "
+                f"{scanned} entries and {len(references)} referenced files "
+                f"in {elapsed:.2f}s ({scanned / elapsed:.0f} entries/s)"
+                + (f"; kept {skipped} referenced since the scan" if skipped else "")
+            )
+        )
+        if expired:
+            self.stdout.write(
+                f"{'Aborted' if delete else 'Found'} {expired} expired upload sessions"
+            )
+
+    def expire_upload_sessions(self, delete):
+        """Abort chunked uploads that have not received a chunk in
+        UPLOAD_SESSION_EXPIRY seconds, removing their partial files"""
+        sessions = UploadSession.objects.expired()
+        if not delete:
+            return sessions.count()
+        aborted = 0
+        for session in sessions.iterator():
+            abort_upload(session)
+            aborted += 1
+        return aborted
+
+    def delete_batch(self, batch, blob_counts):
+        """Delete a batch of orphans that are still unreferenced.
+
+        The references were read once at the start, so a file can have been
+        claimed since: a duplicate upload only bumps its blob's count and
+        does not rewrite the file. The batch's blob rows are locked, and a
+        file is kept if its blob appeared or gained references since the
+        snapshot or a row references it now. Returns (deleted, bytes, kept).
+        """
+        names = [name for name, _, is_dir, _ in batch if not is_dir]
+        with transaction.atomic():
+            blobs = dict(
+                MediaBlob.objects.select_for_update()
+                .filter(name__in=names)
+                .values_list("name", "ref_count")
+            )
+            claimed = self.still_referenced(names)
+            claimed.update(
+                name
+                for name, ref_count in blobs.items()
+                if ref_count > blob_counts.get(name, 0)
+            )
+
+            deleted = deleted_bytes = 0
+            for name, path, is_dir, size in batch:
+                if name in claimed:
+                    continue
+                if is_dir:
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                deleted += 1
+                deleted_bytes += size
+            # Rows are deleted while still locked; an upload waiting on the
+            # lock then registers a new blob and writes the file again
+            MediaBlob.objects.filter(
+                name__in=[name for name in blobs if name not in claimed]
+            ).delete()
+        return deleted, deleted_bytes, len(batch) - deleted
+
+    def sync_ref_counts(self, batch_size):
+        """Raise blob reference counts that are below the rows using them.
+
+        Counts are never lowered: an upload registers its blob before its
+        row is committed, so a count above the rows may be in flight. An
+        over-count only delays freeing the file until this command runs.
+        """
+        names = list(MediaBlob.objects.values_list("name", flat=True))
+        for start in range(0, len(names), batch_size):
+            chunk = names[start : start + batch_size]
+            with transaction.atomic():
+                blobs = list(
+                    MediaBlob.objects.select_for_update()
+                    .filter(name__in=chunk)
+                    .only("id", "name", "ref_count")
+                )
+                counts = Counter()
+                for model, field in self.file_fields():
+                    counts.update(
+                        model._default_manager.filter(
+                            **{f"{field}__in": chunk}
+                        ).values_list(field, flat=True)
+                    )
+                stale = []
+                for blob in blobs:
+                    if counts[blob.name] > blob.ref_count:
+                        blob.ref_count = counts[blob.name]
+                        stale.append(blob)
+                MediaBlob.objects.bulk_update(stale, ["ref_count"])
+
+
+def directory_size(path):
+    """Total size of the files directly inside a rendered pages directory"""
+    total = 0
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_file(follow_symlinks=False):
+                total += entry.stat(follow_symlinks=False).st_size
+    return total
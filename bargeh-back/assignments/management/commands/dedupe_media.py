@@ -0,0 +1,98 @@
+import os
+from collections import Counter
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from assignments.models import Assignment, Submission
+from assignments.storage import content_addressed_storage, hash_content
+
+
+class Command(BaseCommand):
+    help = "Move submission and template PDFs into content-addressed storage"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would be converted without touching any files",
+        )
+
+    def legacy_rows(self):
+        """(model, field name, rows) for files not yet stored by content hash"""
+        for model, field_name in (
+            (Submission, "file"),
+            (Assignment, "template_pdf"),
+        ):
+            rows = [
+                row
+                for row in model.objects.exclude(**{field_name: ""})
+                .exclude(**{f"{field_name}__isnull": True})
+                .only("id", field_name)
+                if not self.is_content_addressed(getattr(row, field_name).name)
+            ]
+            yield model, field_name, rows
+
+    def is_content_addressed(self, name):
+        stem = os.path.splitext(os.path.basename(name))[0]
+        return len(stem) == 64 and all(c in "0123456789abcdef" for c in stem)
+
+    def handle(self, *args, **options):
+        storage = content_addressed_storage
+        dry_run = options["dry_run"]
+
+        plan = list(self.legacy_rows())
+        references = Counter(
+            getattr(row, field_name).name
+            for _, field_name, rows in plan
+            for row in rows
+        )
+
+        converted = 0
+        missing = 0
+        written_bytes = 0
+        removed_bytes = 0
+        blobs = {}  # legacy name -> content-addressed name
+
+        for model, field_name, rows in plan:
+            for row in rows:
+                old_name = getattr(row, field_name).name
+                if not storage.exists(old_name):
+                    missing += 1
+                    self.stdout.write(self.style.WARNING(f"Missing file: {old_name}"))
+                    continue
+
+                if dry_run:
+                    converted += 1
+                    continue
+
+                with transaction.atomic():
+                    if old_name in blobs:
+                        new_name = blobs[old_name]
+                        storage.add_reference(new_name)
+                    else:
+                        with storage.open(old_name) as f:
+                            content = File(f, name=old_name)
+                            content_hash, size = hash_content(content)
+                            if not storage.exists(
+                                storage.blob_name(old_name, content_hash)
+                            ):
+                                written_bytes += size
+                            new_name = storage.save(old_name, content)
+                        blobs[old_name] = new_name
+                    model.objects.filter(pk=row.pk).update(**{field_name: new_name})
+
+                converted += 1
+                references[old_name] -= 1
+                if references[old_name] == 0 and old_name != new_name:
+                    # The legacy copy is no longer referenced by any row
+                    removed_bytes += storage.size(old_name)
+                    os.remove(storage.path(old_name))
+
+        verb = "Would convert" if dry_run else "Converted"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {converted} file references ({missing} missing), "
+                f"{removed_bytes - written_bytes} bytes freed"
+            )
+        )
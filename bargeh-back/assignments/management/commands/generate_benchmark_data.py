@@ -0,0 +1,325 @@
+import io
+import os
+import random
+import time
+import uuid
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+from pypdf import PdfWriter
+from assignments.models import (
+    Assignment,
+    MediaBlob,
+    Question,
+    RubricItem,
+    Submission,
+    SubmissionGrade,
+    SubmissionPageMap,
+    SubmissionScore,
+)
+from assignments.storage import content_addressed_storage
+from courses.models import Course, CourseMembership
+
+User = get_user_model()
+
+BENCHMARK_CODE = "BENCH"
+BENCHMARK_EMAIL_DOMAIN = "bench.bargeh.test"
+
+
+def blank_pdf(num_pages):
+    """Bytes of a PDF with ``num_pages`` empty A4 pages"""
+    writer = PdfWriter()
+    for _ in range(num_pages):
+        writer.add_blank_page(595, 842)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+FIRST_NAMES = [
+    "علی",
+    "محمد",
+    "رضا",
+    "امیر",
+    "مهدی",
+    "فاطمه",
+    "زهرا",
+    "مریم",
+    "سارا",
+    "نرگس",
+]
+LAST_NAMES = ["احمدی", "محمدی", "حسینی", "رضایی", "کریمی", "نوری", "صادقی", "موسوی"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic course dataset (students, assignments, questions, "
+        "rubric items, submissions, page maps and grades) for benchmarking"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--courses", type=int, default=1)
+        parser.add_argument("--students", type=int, default=1000)
+        parser.add_argument("--assignments", type=int, default=5)
+        parser.add_argument("--questions", type=int, default=8)
+        parser.add_argument("--rubric-items", type=int, default=6)
+        parser.add_argument("--pages", type=int, default=8)
+        parser.add_argument(
+            "--submitted",
+            type=float,
+            default=0.95,
+            help="Fraction of students with a submission per assignment (default: 0.95)",
+        )
+        parser.add_argument(
+            "--graded",
+            type=float,
+            default=0.8,
+            help="Fraction of submitted questions that are graded (default: 0.8)",
+        )
+        parser.add_argument("--seed", type=int, default=389)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Delete previously generated benchmark courses and users first",
+        )
+
+    def handle(self, *args, **options):
+        if options["students"] < 1 or options["questions"] < 1:
+            raise CommandError("--students and --questions must be at least 1")
+
+        self.random = random.Random(options["seed"])
+        self.batch_size = max(1, options["batch_size"])
+        self.options = options
+
+        if options["clear"]:
+            self.clear()
+
+        started = time.perf_counter()
+        # Every submission shares one content-addressed blob
+        self.file_name = content_addressed_storage.save(
+            Submission._meta.get_field("file").upload_to + "benchmark.pdf",
+            ContentFile(blank_pdf(options["pages"])),
+        )
+        self.page_sizes = [[595.0, 842.0]] * options["pages"]
+        self.file_size = content_addressed_storage.size(self.file_name)
+        self.content_hash = os.path.splitext(os.path.basename(self.file_name))[0]
+
+        # One unusable password hash instead of hashing per user
+        self.password = make_password(None)
+        tag = uuid.uuid4().hex[:8]
+        instructor = User.objects.create(
+            email=f"instructor-{tag}@{BENCHMARK_EMAIL_DOMAIN}",
+            name="Benchmark Instructor",
+            is_instructor=True,
+            password=self.password,
+        )
+
+        submissions = 0
+        for index in range(options["courses"]):
+            with transaction.atomic():
+                submissions += self.generate_course(instructor, f"{tag}-{index + 1}")
+
+        if submissions:
+            # save() registered one reference, every submission holds one
+            MediaBlob.objects.filter(name=self.file_name).update(
+                ref_count=F("ref_count") + submissions - 1
+            )
+        else:
+            # Nothing holds the reference save() took
+            content_addressed_storage.delete(self.file_name)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {options['courses']} course(s) with {submissions} "
+                f"submissions in {time.perf_counter() - started:.1f}s "
+                f"(instructor: {instructor.email})"
+            )
+        )
+
+    def clear(self):
+        courses = Course.objects.filter(code__startswith=BENCHMARK_CODE)
+        deleted = courses.count()
+        # The cascade releases each submission's reference to the shared blob
+        courses.delete()
+        User.objects.filter(email__endswith=f"@{BENCHMARK_EMAIL_DOMAIN}").delete()
+        self.stdout.write(f"Deleted {deleted} benchmark course(s)")
+
+    def generate_course(self, instructor, tag):
+        options = self.options
+        course = Course.objects.create(
+            title=f"Benchmark {tag}",
+            code=f"{BENCHMARK_CODE}-{tag}"[:20],
+            owner=instructor,
+            invite_code=uuid.uuid4().hex[:8].upper(),
+        )
+        CourseMembership.objects.create(
+            user=instructor, course=course, role=CourseMembership.Role.INSTRUCTOR
+        )
+
+        User.objects.bulk_create(
+            [
+                User(
+                    email=f"student{i + 1}-{tag}@{BENCHMARK_EMAIL_DOMAIN}",
+                    first_name=self.random.choice(FIRST_NAMES),
+                    last_name=self.random.choice(LAST_NAMES),
+                    password=self.password,
+                )
+                for i in range(options["students"])
+            ],
+            batch_size=self.batch_size,
+        )
+        # Re-read ids, bulk_create does not return them on every backend
+        student_ids = list(
+            User.objects.filter(
+                email__endswith=f"-{tag}@{BENCHMARK_EMAIL_DOMAIN}"
+            ).values_list("id", flat=True)
+        )
+        CourseMembership.objects.bulk_create(
+            [
+                CourseMembership(
+                    user_id=student_id,
+                    course=course,
+                    role=CourseMembership.Role.STUDENT,
+                )
+                for student_id in student_ids
+            ],
+            batch_size=self.batch_size,
+        )
+
+        submissions = 0
+        for number in range(1, options["assignments"] + 1):
+            submissions += self.generate_assignment(
+                course, instructor, student_ids, number
+            )
+        self.stdout.write(
+            f"{course.code}: {len(student_ids)} students, {submissions} submissions"
+        )
+        return submissions
+
+    def generate_assignment(self, course, instructor, student_ids, number):
+        options = self.options
+        assignment = Assignment.objects.create(
+            course=course,
+            title=f"Homework {number}",
+            created_by=instructor,
+            is_published=True,
+            upload_by_student=False,
+        )
+        Question.objects.bulk_create(
+            [
+                Question(
+                    assignment=assignment,
+                    number=q + 1,
+                    title=f"Question {q + 1}",
+                    max_points=Decimal(self.random.choice([5, 10, 15, 20])),
+                    order_index=q,
+                    default_page_numbers=[q % options["pages"] + 1],
+                )
+                for q in range(options["questions"])
+            ]
+        )
+        questions = list(assignment.questions.order_by("order_index"))
+        Assignment.objects.filter(pk=assignment.pk).update(
+            total_points=sum(question.max_points for question in questions)
+        )
+
+        RubricItem.objects.bulk_create(
+            [
+                RubricItem(
+                    question=question,
+                    label=f"Item {r + 1}",
+                    delta_points=(
+                        Decimal(self.random.randint(1, 3))
+                        if r == 0
+                        else -Decimal(self.random.randint(1, 5))
+                    ),
+                    order_index=r,
+                    is_positive=r == 0,
+                )
+                for question in questions
+                for r in range(options["rubric_items"])
+            ],
+            batch_size=self.batch_size,
+        )
+        items_by_question = {}
+        for item in RubricItem.objects.filter(question__assignment=assignment):
+            items_by_question.setdefault(item.question_id, []).append(item)
+
+        Submission.objects.bulk_create(
+            [
+                Submission(
+                    assignment=assignment,
+                    uploaded_by=instructor,
+                    student_id=student_id,
+                    file=self.file_name,
+                    num_pages=options["pages"],
+                    file_size=self.file_size,
+                    content_hash=self.content_hash,
+                    page_sizes=self.page_sizes,
+                )
+                for student_id in student_ids
+                if self.random.random() < options["submitted"]
+            ],
+            batch_size=self.batch_size,
+        )
+        submission_ids = list(
+            Submission.objects.filter(assignment=assignment).values_list(
+                "id", flat=True
+            )
+        )
+
+        page_map = {
+            str(question.id): question.default_page_numbers for question in questions
+        }
+        SubmissionPageMap.objects.bulk_create(
+            [
+                SubmissionPageMap(submission_id=submission_id, page_map=page_map)
+                for submission_id in submission_ids
+            ],
+            batch_size=self.batch_size,
+        )
+
+        self.generate_grades(assignment, questions, items_by_question, submission_ids)
+        for start in range(0, len(submission_ids), self.batch_size):
+            SubmissionScore.refresh(submission_ids[start : start + self.batch_size])
+        return len(submission_ids)
+
+    def generate_grades(self, assignment, questions, items_by_question, submission_ids):
+        selections = {}
+        grades = []
+        for submission_id in submission_ids:
+            for question in questions:
+                if self.random.random() >= self.options["graded"]:
+                    continue
+                items = items_by_question.get(question.id, [])
+                selected = self.random.sample(
+                    items, self.random.randint(0, min(2, len(items)))
+                )
+                delta = sum((item.delta_points for item in selected), Decimal("0"))
+                selections[(submission_id, question.id)] = selected
+                grades.append(
+                    SubmissionGrade(
+                        submission_id=submission_id,
+                        question=question,
+                        total_points=max(
+                            Decimal("0"),
+                            min(question.max_points + delta, question.max_points),
+                        ),
+                    )
+                )
+        SubmissionGrade.objects.bulk_create(grades, batch_size=self.batch_size)
+
+        Through = SubmissionGrade.selected_items.through
+        links = [
+            Through(submissiongrade_id=grade_id, rubricitem_id=item.id)
+            for grade_id, submission_id, question_id in SubmissionGrade.objects.filter(
+                submission__assignment=assignment
+            ).values_list("id", "submission_id", "question_id")
+            for item in selections.get((submission_id, question_id), ())
+        ]
+        Through.objects.bulk_create(links, batch_size=self.batch_size)
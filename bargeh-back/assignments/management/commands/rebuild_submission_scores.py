@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from assignments.models import Submission, SubmissionScore
+
+
+class Command(BaseCommand):
+    help = "Rebuild the materialized per-submission score table from SubmissionGrade"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--assignment",
+            type=int,
+            help="Only rebuild scores for this assignment id (default: all)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of submissions to rebuild per transaction (default: 500)",
+        )
+
+    def handle(self, *args, **options):
+        submissions = Submission.objects.order_by("id")
+        if options["assignment"]:
+            submissions = submissions.filter(assignment_id=options["assignment"])
+
+        submission_ids = list(submissions.values_list("id", flat=True))
+        batch_size = max(1, options["batch_size"])
+
+        rebuilt = 0
+        for start in range(0, len(submission_ids), batch_size):
+            batch = submission_ids[start : start + batch_size]
+            with transaction.atomic():
+                rebuilt += SubmissionScore.refresh(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully rebuilt {rebuilt} submission scores")
+        )
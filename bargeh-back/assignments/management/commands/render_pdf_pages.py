@@ -0,0 +1,62 @@
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from assignments.models import Assignment, Submission
+from assignments.rendering import render_args, get_executor, render_pdf_pages
+
+
+class Command(BaseCommand):
+    help = "Render page thumbnails and page images for submissions and templates"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--assignment",
+            type=int,
+            help="Only render files of this assignment id (default: all)",
+        )
+
+    def iter_files(self, assignment_id):
+        assignments = Assignment.objects.exclude(template_pdf="").exclude(
+            template_pdf__isnull=True
+        )
+        submissions = Submission.objects.exclude(file="")
+        if assignment_id:
+            assignments = assignments.filter(id=assignment_id)
+            submissions = submissions.filter(assignment_id=assignment_id)
+
+        for assignment in assignments.only("id", "template_pdf").iterator():
+            yield assignment.template_pdf
+        for submission in submissions.only("id", "file").iterator():
+            yield submission.file
+
+    def handle(self, *args, **options):
+        executor = get_executor()
+        # Keep a bounded number of documents in flight
+        max_in_flight = settings.PDF_RENDER_WORKERS * 2
+        pending = set()
+        rendered_pages = 0
+        failed = 0
+
+        def collect(futures):
+            nonlocal rendered_pages, failed
+            for future in futures:
+                try:
+                    rendered_pages += future.result()
+                except Exception as e:
+                    failed += 1
+                    self.stdout.write(self.style.WARNING(f"Render failed: {e}"))
+
+        for field_file in self.iter_files(options["assignment"]):
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending.add(executor.submit(render_pdf_pages, *render_args(field_file)))
+
+        collect(wait(pending).done)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully rendered {rendered_pages} pages ({failed} files failed)"
+            )
+        )
@@ -0,0 +1,191 @@
+import os
+import re
+import uuid
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework.negotiation import BaseContentNegotiation
+
+RANGE_RE = re.compile(r"^\s*(\d*)\s*-\s*(\d*)\s*$")
+CHUNK_SIZE = 64 * 1024
+# More ranges than this in one request is treated as abuse and ignored
+MAX_RANGES = 16
+
+
+class FileContentNegotiation(BaseContentNegotiation):
+    """
+    Ignore the client's Accept header on file-serving API views.
+
+    The file itself is returned as a plain Django response, so DRF's renderers
+    only handle error bodies; negotiating against them would answer a request
+    for ``application/pdf`` or ``image/jpeg`` with 406.
+    """
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+def file_etag(stat):
+    return quote_etag(f"{stat.st_size:x}-{stat.st_mtime_ns:x}")
+
+
+def parse_range_header(header, size):
+    """
+    Parse a bytes Range header into a list of inclusive (start, end) pairs.
+
+    Returns None when the header should be ignored (serve the full file) and
+    an empty list when no range is satisfiable.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec:
+        return None
+
+    ranges = []
+    for part in spec.split(","):
+        match = RANGE_RE.match(part)
+        if not match:
+            return None
+        first, last = match.groups()
+        if not first:
+            if not last:
+                return None
+            # Suffix range: the last N bytes; an empty file has none
+            length = int(last)
+            if length == 0 or size == 0:
+                continue
+            ranges.append((max(size - length, 0), size - 1))
+        else:
+            start = int(first)
+            if last and int(last) < start:
+                return None
+            if start >= size:
+                continue
+            end = int(last) if last else size - 1
+            ranges.append((start, min(end, size - 1)))
+
+    if len(ranges) > MAX_RANGES:
+        return None
+
+    # Merge overlapping and adjacent ranges
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def read_range(path, start, end):
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = handle.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def multipart_ranges(path, ranges, size, content_type, boundary):
+    for start, end in ranges:
+        yield (
+            f"\r\n--{boundary}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+        ).encode()
+        yield from read_range(path, start, end)
+    yield f"\r\n--{boundary}--\r\n".encode()
+
+
+def sendfile_response(path, content_type):
+    """Hand the transfer off to the front proxy, if one is configured"""
+    backend = getattr(settings, "MEDIA_SENDFILE_BACKEND", None)
+    if backend == "nginx":
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = (
+            settings.MEDIA_SENDFILE_PREFIX.rstrip("/")
+            + "/"
+            + os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, "/")
+        )
+        return response
+    if backend == "apache":
+        response = HttpResponse(content_type=content_type)
+        response["X-Sendfile"] = path
+        return response
+    return None
+
+
+def serve_file(request, path, content_type, filename=None, cache="private"):
+    """
+    Serve a file under MEDIA_ROOT with conditional and byte-range request support.
+
+    ETag/Last-Modified are derived from the file's size and mtime, so a 304 is
+    answered without opening the file. When MEDIA_SENDFILE_BACKEND is set the
+    body is left to the proxy, which handles ranges itself.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise Http404("File not found on disk")
+
+    etag = file_etag(stat)
+    last_modified = int(stat.st_mtime)
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if not_modified is not None:
+        return not_modified
+
+    size = stat.st_size
+    response = sendfile_response(path, content_type)
+    if response is None:
+        ranges = None
+        range_header = request.META.get("HTTP_RANGE")
+        if range_header and if_range_matches(request, etag, last_modified):
+            ranges = parse_range_header(range_header, size)
+
+        if ranges == []:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+        elif ranges and len(ranges) == 1:
+            start, end = ranges[0]
+            response = StreamingHttpResponse(
+                read_range(path, start, end), status=206, content_type=content_type
+            )
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+            response["Content-Length"] = str(end - start + 1)
+        elif ranges:
+            boundary = uuid.uuid4().hex
+            response = StreamingHttpResponse(
+                multipart_ranges(path, ranges, size, content_type, boundary),
+                status=206,
+                content_type=f"multipart/byteranges; boundary={boundary}",
+            )
+        else:
+            response = FileResponse(open(path, "rb"), content_type=content_type)
+            response["Content-Length"] = str(size)
+
+    if filename:
+        response["Content-Disposition"] = f'inline; filename="{filename}"'
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    response["Cache-Control"] = f"{cache}, max-age=3600"
+    return response
+
+
+def if_range_matches(request, etag, last_modified):
+    """A stale If-Range means the client must get the full file instead"""
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if not if_range:
+        return True
+    if if_range.startswith(('"', "W/")):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
@@ -0,0 +1,43 @@
+# Generated manually
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assignments", "0009_fix_grade_model_fields"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SubmissionScore",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "total_score",
+                    models.DecimalField(decimal_places=2, default=0.0, max_digits=8),
+                ),
+                ("graded_questions", models.PositiveIntegerField(default=0)),
+                ("last_graded_at", models.DateTimeField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "submission",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="score",
+                        to="assignments.submission",
+                    ),
+                ),
+            ],
+        ),
+    ]
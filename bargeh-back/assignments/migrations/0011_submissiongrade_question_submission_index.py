@@ -0,0 +1,19 @@
+# Generated manually
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assignments", "0010_submissionscore"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="submissiongrade",
+            index=models.Index(
+                fields=["question", "submission"], name="submissiongrade_q_sub_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated manually
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assignments", "0011_submissiongrade_question_submission_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="submission",
+            name="file_size",
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="submission",
+            name="content_hash",
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="submission",
+            name="page_sizes",
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
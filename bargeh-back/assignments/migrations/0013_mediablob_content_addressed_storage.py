@@ -0,0 +1,51 @@
+# Generated manually
+
+import assignments.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assignments", "0012_submission_pdf_metadata"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MediaBlob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255, unique=True)),
+                ("content_hash", models.CharField(db_index=True, max_length=64)),
+                ("size", models.PositiveBigIntegerField(default=0)),
+                ("ref_count", models.PositiveIntegerField(default=1)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="assignment",
+            name="template_pdf",
+            field=models.FileField(
+                blank=True,
+                null=True,
+                storage=assignments.storage.get_content_addressed_storage,
+                upload_to="assignment_templates/",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="submission",
+            name="file",
+            field=models.FileField(
+                storage=assignments.storage.get_content_addressed_storage,
+                upload_to="submissions/",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated manually
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assignments", "0014_uploadsession"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="assignment",
+            name="auto_map_pages",
+            field=models.BooleanField(default=False),
+        ),
+    ]
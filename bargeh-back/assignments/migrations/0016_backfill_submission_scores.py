@@ -0,0 +1,54 @@
+# Generated manually
+
+from django.db import migrations
+from django.db.models import Count, Max, Sum
+
+BATCH_SIZE = 500
+
+
+def backfill_submission_scores(apps, schema_editor):
+    """Create the missing score rows from existing grades, in batches"""
+    Submission = apps.get_model("assignments", "Submission")
+    SubmissionGrade = apps.get_model("assignments", "SubmissionGrade")
+    SubmissionScore = apps.get_model("assignments", "SubmissionScore")
+
+    submission_ids = list(
+        Submission.objects.filter(score__isnull=True)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    for start in range(0, len(submission_ids), BATCH_SIZE):
+        batch = submission_ids[start : start + BATCH_SIZE]
+        totals = {
+            row["submission_id"]: row
+            for row in SubmissionGrade.objects.filter(submission_id__in=batch)
+            .values("submission_id")
+            .annotate(
+                total=Sum("total_points"),
+                graded=Count("pk"),
+                last=Max("updated_at"),
+            )
+        }
+        scores = []
+        for submission_id in batch:
+            row = totals.get(submission_id)
+            scores.append(
+                SubmissionScore(
+                    submission_id=submission_id,
+                    total_score=row["total"] if row else 0,
+                    graded_questions=row["graded"] if row else 0,
+                    last_graded_at=row["last"] if row else None,
+                )
+            )
+        SubmissionScore.objects.bulk_create(scores, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assignments", "0015_assignment_auto_map_pages"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_submission_scores, migrations.RunPython.noop),
+    ]
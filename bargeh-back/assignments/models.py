@@ -1,6 +1,69 @@
-from django.db import models
+import os
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import Count, F, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Least
 from django.conf import settings
+from django.utils import timezone
 from courses.models import Course
+from .storage import get_content_addressed_storage
+
+
+def _aggregate_subquery(queryset, group_field, aggregate, output_field):
+    """Correlated subquery returning one aggregate per outer row"""
+    return Subquery(
+        queryset.order_by()
+        .values(group_field)
+        .annotate(value=aggregate)
+        .values("value")[:1],
+        output_field=output_field,
+    )
+
+
+class AssignmentQuerySet(models.QuerySet):
+    def with_grading_stats(self):
+        """Annotate question, submission and grading totals in a single query.
+
+        Each figure is computed by a correlated subquery so the joins do not
+        multiply each other's rows.
+        """
+        question_points = _aggregate_subquery(
+            Question.objects.filter(assignment=OuterRef("pk")),
+            "assignment",
+            Sum("max_points"),
+            models.DecimalField(max_digits=8, decimal_places=2),
+        )
+        question_count = _aggregate_subquery(
+            Question.objects.filter(assignment=OuterRef("pk")),
+            "assignment",
+            Count("pk"),
+            models.IntegerField(),
+        )
+        submission_count = _aggregate_subquery(
+            Submission.objects.filter(assignment=OuterRef("pk")),
+            "assignment",
+            Count("pk"),
+            models.IntegerField(),
+        )
+        graded_count = _aggregate_subquery(
+            SubmissionGrade.objects.filter(submission__assignment=OuterRef("pk")),
+            "submission__assignment",
+            Count("pk"),
+            models.IntegerField(),
+        )
+        return self.annotate(
+            question_points=Coalesce(
+                question_points,
+                Value(Decimal("0")),
+                output_field=models.DecimalField(max_digits=8, decimal_places=2),
+            ),
+            question_count=Coalesce(question_count, 0),
+            submission_count=Coalesce(submission_count, 0),
+            graded_count=Coalesce(graded_count, 0),
+        )
 
 
 class Assignment(models.Model):
@@ -18,7 +81,10 @@ class Assignment(models.Model):
     title = models.CharField(max_length=255)
     instructions = models.TextField(blank=True)
     template_pdf = models.FileField(
-        upload_to="assignment_templates/", blank=True, null=True
+        upload_to="assignment_templates/",
+        storage=get_content_addressed_storage,
+        blank=True,
+        null=True,
     )
     total_points = models.DecimalField(max_digits=5, decimal_places=2, default=0)
     is_published = models.BooleanField(default=False)
@@ -36,6 +102,8 @@ class Assignment(models.Model):
     release_at = models.DateTimeField(null=True, blank=True)
     time_limit_minutes = models.PositiveIntegerField(null=True, blank=True)
     variable_length = models.BooleanField(default=False)
+    # Pre-fill new submissions' page maps from the questions' default pages
+    auto_map_pages = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -43,12 +111,41 @@ class Assignment(models.Model):
         related_name="created_assignments",
     )
 
+    objects = AssignmentQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
 
     def __str__(self):
         return f"{self.title} - {self.course.title}"
 
+    @property
+    def prefills_page_maps(self):
+        """Default page maps only make sense when every copy has the same layout"""
+        return self.auto_map_pages and not self.variable_length
+
+    def question_default_pages(self):
+        """(question_id, default_page_numbers) for questions that have defaults"""
+        return [
+            (question_id, pages)
+            for question_id, pages in self.questions.values_list(
+                "id", "default_page_numbers"
+            )
+            if pages
+        ]
+
+    def initial_page_map(self, num_pages, default_pages=None):
+        """Page map for a newly uploaded submission.
+
+        Callers creating many submissions pass ``default_pages`` from
+        question_default_pages() so the questions are read once.
+        """
+        if not self.prefills_page_maps:
+            return {}
+        if default_pages is None:
+            default_pages = self.question_default_pages()
+        return default_page_map(default_pages, num_pages)
+
     def calculate_total_points(self):
         """Calculate total points from sum of all question points"""
         from decimal import Decimal
@@ -63,7 +160,9 @@ class Assignment(models.Model):
             # If this is an update and there are questions, calculate from questions
             self.total_points = self.calculate_total_points()
         # If this is a new assignment or no questions exist, keep the manually set total_points
-        super().save(*args, **kwargs)
+        # The template's blob reference commits or rolls back with the row
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
 
 class Question(models.Model):
@@ -119,6 +218,42 @@ class RubricItem(models.Model):
         return f"{self.label} - {self.question.title}"
 
 
+class SubmissionQuerySet(models.QuerySet):
+    def with_grading_stats(self):
+        """Load users and page maps eagerly and annotate graded question counts"""
+        graded_count = _aggregate_subquery(
+            SubmissionGrade.objects.filter(submission=OuterRef("pk")),
+            "submission",
+            Count("pk"),
+            models.IntegerField(),
+        )
+        return self.select_related("student", "uploaded_by", "page_map").annotate(
+            graded_count=Coalesce(graded_count, 0)
+        )
+
+
+def compute_mapping_status(page_map, question_ids):
+    """Return 'complete' if every question id has at least one page in page_map"""
+    for question_id in question_ids:
+        if not page_map.get(str(question_id)):
+            return "incomplete"
+    return "complete"
+
+
+def default_page_map(default_pages, num_pages):
+    """Page map from each question's default pages, dropping pages past the end
+
+    ``default_pages`` is an iterable of (question_id, default_page_numbers).
+    """
+    return {
+        str(question_id): [
+            page for page in pages if isinstance(page, int) and 1 <= page <= num_pages
+        ]
+        for question_id, pages in default_pages
+        if pages
+    }
+
+
 class Submission(models.Model):
     """Submission model for uploaded PDFs (instructor or student)"""
 
@@ -139,10 +274,17 @@ class Submission(models.Model):
         null=True,
         blank=True,
     )
-    file = models.FileField(upload_to="submissions/")
+    file = models.FileField(
+        upload_to="submissions/", storage=get_content_addressed_storage
+    )
     num_pages = models.PositiveIntegerField()
+    file_size = models.PositiveBigIntegerField(null=True, blank=True)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
+    page_sizes = models.JSONField(default=list, blank=True)  # [[width, height], ...]
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = SubmissionQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
 
@@ -150,6 +292,11 @@ class Submission(models.Model):
         student_name = self.student.username if self.student else "Unassigned"
         return f"{student_name} - {self.assignment.title}"
 
+    def save(self, *args, **kwargs):
+        # The file's blob reference commits or rolls back with the row
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     @property
     def mapping_status(self):
         """Returns 'complete' if all questions have pages mapped, else 'incomplete'"""
@@ -157,20 +304,8 @@ class Submission(models.Model):
             return "incomplete"
 
         # Get all questions for this assignment
-        questions = self.assignment.questions.all()
-        if not questions.exists():
-            return "complete"  # No questions to map
-
-        # Check if all questions have at least one page mapped
-        for question in questions:
-            question_id = str(question.id)
-            if (
-                question_id not in self.page_map.page_map
-                or not self.page_map.page_map[question_id]
-            ):
-                return "incomplete"
-
-        return "complete"
+        question_ids = self.assignment.questions.values_list("id", flat=True)
+        return compute_mapping_status(self.page_map.page_map, question_ids)
 
 
 class SubmissionPageMap(models.Model):
@@ -186,6 +321,48 @@ class SubmissionPageMap(models.Model):
     def __str__(self):
         return f"Page map for {self.submission}"
 
+    @classmethod
+    def populate_defaults(cls, assignment, submission_ids=None, overwrite=False):
+        """Build page maps from the outline's default pages in one pass.
+
+        Submissions without a page map, or with an empty one, get a map from
+        each question's default_page_numbers, clamped to their page count.
+        ``overwrite`` replaces existing maps too. Returns (created, updated).
+        """
+        default_pages = assignment.question_default_pages()
+        if not default_pages:
+            return 0, 0
+
+        submissions = Submission.objects.filter(assignment=assignment)
+        if submission_ids is not None:
+            submissions = submissions.filter(id__in=submission_ids)
+
+        now = timezone.now()
+        to_create = []
+        to_update = []
+        for submission_id, num_pages, map_id, page_map in submissions.values_list(
+            "id", "num_pages", "page_map__id", "page_map__page_map"
+        ):
+            if map_id is not None and not overwrite and any((page_map or {}).values()):
+                continue
+            page_map = cls(
+                id=map_id,
+                submission_id=submission_id,
+                page_map=default_page_map(default_pages, num_pages),
+                updated_at=now,
+            )
+            if map_id is None:
+                to_create.append(page_map)
+            else:
+                to_update.append(page_map)
+
+        with transaction.atomic():
+            cls.objects.bulk_create(to_create, batch_size=500)
+            cls.objects.bulk_update(
+                to_update, ["page_map", "updated_at"], batch_size=500
+            )
+        return len(to_create), len(to_update)
+
 
 class StudentSubmission(models.Model):
     """Student submission model - keeping for backward compatibility"""
@@ -317,6 +494,12 @@ class SubmissionGrade(models.Model):
     class Meta:
         unique_together = ["submission", "question"]
         ordering = ["-updated_at"]
+        indexes = [
+            models.Index(
+                fields=["question", "submission"],
+                name="submissiongrade_q_sub_idx",
+            ),
+        ]
 
     def __str__(self):
         student_name = (
@@ -362,3 +545,177 @@ class SubmissionGrade(models.Model):
         if self.pk:
             self.total_points = self.calculate_total_points()
         super().save(*args, **kwargs)
+
+    @classmethod
+    def recalculate_totals(cls, question, grades):
+        """Recompute total_points set-wise for grades of one question.
+
+        Same rule as calculate_total_points: max_points plus the selected
+        items' deltas, clamped to [0, max_points]. Only rows whose total
+        actually changes are written, in one UPDATE. ``grades`` is a queryset
+        of this question's grades; returns the ids of the submissions whose
+        grade changed.
+        """
+        delta_sum = _aggregate_subquery(
+            cls.selected_items.through.objects.filter(submissiongrade=OuterRef("pk")),
+            "submissiongrade",
+            Sum("rubricitem__delta_points"),
+            models.DecimalField(max_digits=8, decimal_places=2),
+        )
+        max_points = Value(
+            question.max_points,
+            output_field=models.DecimalField(max_digits=6, decimal_places=2),
+        )
+        new_total = Greatest(
+            Value(Decimal("0")),
+            Least(max_points + Coalesce(delta_sum, Value(Decimal("0"))), max_points),
+            output_field=models.DecimalField(max_digits=6, decimal_places=2),
+        )
+
+        stale = list(
+            grades.alias(new_total=new_total)
+            .exclude(total_points=F("new_total"))
+            .values_list("id", "submission_id")
+        )
+        if stale:
+            cls.objects.filter(id__in=[grade_id for grade_id, _ in stale]).update(
+                total_points=new_total, updated_at=timezone.now()
+            )
+        return [submission_id for _, submission_id in stale]
+
+
+class SubmissionScore(models.Model):
+    """Denormalized per-submission score totals derived from SubmissionGrade rows"""
+
+    submission = models.OneToOneField(
+        Submission, on_delete=models.CASCADE, related_name="score"
+    )
+    total_score = models.DecimalField(max_digits=8, decimal_places=2, default=0.00)
+    graded_questions = models.PositiveIntegerField(default=0)
+    last_graded_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Score for {self.submission_id}: {self.total_score}"
+
+    @classmethod
+    def refresh(cls, submission_ids):
+        """Recompute score rows for the given submissions from their grades.
+
+        Callers that change grades run this inside the same transaction, so
+        the score row never lags behind its grades. The totals are written by a
+        single UPDATE whose subqueries read the grades, so concurrent
+        refreshes of one submission cannot write a stale sum over each other.
+        """
+        submission_ids = list(submission_ids)
+        if not submission_ids:
+            return 0
+
+        existing = set(
+            cls.objects.filter(submission_id__in=submission_ids).values_list(
+                "submission_id", flat=True
+            )
+        )
+        # A concurrent refresh may create the same rows first
+        cls.objects.bulk_create(
+            [
+                cls(submission_id=submission_id)
+                for submission_id in set(submission_ids) - existing
+            ],
+            ignore_conflicts=True,
+        )
+
+        grades = SubmissionGrade.objects.filter(submission=OuterRef("submission_id"))
+        total = _aggregate_subquery(
+            grades,
+            "submission",
+            Sum("total_points"),
+            models.DecimalField(max_digits=8, decimal_places=2),
+        )
+        graded = _aggregate_subquery(
+            grades, "submission", Count("pk"), models.IntegerField()
+        )
+        last = _aggregate_subquery(
+            grades, "submission", Max("updated_at"), models.DateTimeField()
+        )
+        return cls.objects.filter(submission_id__in=submission_ids).update(
+            total_score=Coalesce(
+                total,
+                Value(Decimal("0")),
+                output_field=models.DecimalField(max_digits=8, decimal_places=2),
+            ),
+            graded_questions=Coalesce(graded, 0),
+            last_graded_at=last,
+            updated_at=timezone.now(),
+        )
+
+
+class MediaBlob(models.Model):
+    """Reference count for a content-addressed file in media storage"""
+
+    name = models.CharField(max_length=255, unique=True)
+    content_hash = models.CharField(max_length=64, db_index=True)
+    size = models.PositiveBigIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
+
+class UploadSessionQuerySet(models.QuerySet):
+    def _cutoff(self):
+        return timezone.now() - timedelta(seconds=settings.UPLOAD_SESSION_EXPIRY)
+
+    def active(self):
+        """Sessions that received a chunk within UPLOAD_SESSION_EXPIRY"""
+        return self.filter(updated_at__gte=self._cutoff())
+
+    def expired(self):
+        return self.filter(updated_at__lt=self._cutoff())
+
+
+class UploadSession(models.Model):
+    """A chunked, resumable upload of one submission PDF.
+
+    Chunks are appended in order to a partial file under MEDIA_ROOT; on
+    completion the file is renamed into content-addressed storage.
+    """
+
+    PARTIAL_DIR = "uploads/partial"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    assignment = models.ForeignKey(
+        Assignment, on_delete=models.CASCADE, related_name="upload_sessions"
+    )
+    uploaded_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="upload_sessions",
+    )
+    student = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    filename = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField()
+    received_size = models.PositiveBigIntegerField(default=0)
+    num_pages = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = UploadSessionQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.filename} ({self.received_size}/{self.total_size} bytes)"
+
+    @property
+    def partial_name(self):
+        return f"{self.PARTIAL_DIR}/{self.id}.part"
+
+    @property
+    def partial_path(self):
+        return os.path.join(settings.MEDIA_ROOT, self.partial_name)
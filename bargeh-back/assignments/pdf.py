@@ -0,0 +1,136 @@
+import hashlib
+import os
+
+from pypdf import PdfReader
+
+
+def read_pdf_metadata(uploaded_file):
+    """Read size, content hash and page layout from an uploaded PDF.
+
+    The file is streamed once in chunks for the hash; the page tree is then
+    read through the cross-reference table, so page content streams are never
+    decoded. ``num_pages`` is None when the file cannot be parsed as a PDF.
+    """
+    digest = hashlib.sha256()
+    file_size = 0
+    uploaded_file.seek(0)
+    for chunk in uploaded_file.chunks():
+        digest.update(chunk)
+        file_size += len(chunk)
+
+    metadata = {
+        "file_size": file_size,
+        "content_hash": digest.hexdigest(),
+        "num_pages": None,
+        "page_sizes": [],
+    }
+
+    page_sizes = read_page_sizes(uploaded_file)
+    if page_sizes is not None:
+        metadata["page_sizes"] = page_sizes
+        metadata["num_pages"] = len(page_sizes)
+    return metadata
+
+
+def inspect_pdf_path(path):
+    """Hash and page sizes of a PDF on disk.
+
+    Runs inside pool workers, so it only takes a path and does not touch
+    Django.
+    """
+    digest = hashlib.sha256()
+    file_size = 0
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+            file_size += len(chunk)
+        page_sizes = read_page_sizes(handle)
+    return {
+        "file_size": file_size,
+        "content_hash": digest.hexdigest(),
+        "num_pages": len(page_sizes) if page_sizes is not None else None,
+        "page_sizes": page_sizes or [],
+    }
+
+
+def read_page_sizes(pdf_file):
+    """Page sizes in points as [width, height] pairs, or None if unreadable"""
+    try:
+        pdf_file.seek(0)
+        reader = PdfReader(pdf_file)
+        return [
+            [
+                round(float(page.mediabox.width), 2),
+                round(float(page.mediabox.height), 2),
+            ]
+            for page in reader.pages
+        ]
+    except Exception:
+        # Unreadable or encrypted PDFs keep the client-reported page count
+        return None
+    finally:
+        pdf_file.seek(0)
+
+
+def apply_pdf_metadata(submission, uploaded_file, fallback_num_pages=1):
+    """Fill the PDF metadata fields of ``submission`` from ``uploaded_file``.
+
+    The hash is kept on the upload, so storage does not read it a second time.
+    """
+    metadata = read_pdf_metadata(uploaded_file)
+    uploaded_file.content_digest = (metadata["content_hash"], metadata["file_size"])
+    submission.num_pages = metadata["num_pages"] or fallback_num_pages
+    submission.file_size = metadata["file_size"]
+    submission.content_hash = metadata["content_hash"]
+    submission.page_sizes = metadata["page_sizes"]
+    return metadata
+
+
+def split_pdf_pages(pdf_path, output_dir, pages_per_part):
+    """Split a PDF into consecutive parts of ``pages_per_part`` pages each.
+
+    Runs inside pool workers. pdfium loads pages on demand and copies them
+    into each part natively, so the stack is never held in memory as a
+    whole. Returns per-part metadata in page order; the last part may be
+    shorter.
+    """
+    import pypdfium2 as pdfium
+
+    parts = []
+    source = pdfium.PdfDocument(pdf_path)
+    try:
+        total_pages = len(source)
+        for start in range(0, total_pages, pages_per_part):
+            indices = list(range(start, min(start + pages_per_part, total_pages)))
+            part = pdfium.PdfDocument.new()
+            try:
+                part.import_pages(source, indices)
+                page_sizes = [
+                    [round(width, 2), round(height, 2)]
+                    for width, height in (
+                        part.get_page_size(index) for index in range(len(part))
+                    )
+                ]
+                path = os.path.join(output_dir, f"part-{len(parts) + 1}.pdf")
+                part.save(path)
+            finally:
+                part.close()
+
+            digest = hashlib.sha256()
+            with open(path, "rb") as handle:
+                for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+                    digest.update(chunk)
+            parts.append(
+                {
+                    "path": path,
+                    "first_page": start + 1,
+                    "file_size": os.path.getsize(path),
+                    "content_hash": digest.hexdigest(),
+                    "num_pages": len(indices),
+                    "page_sizes": page_sizes,
+                }
+            )
+    finally:
+        source.close()
+    return parts
+
@@ -0,0 +1,126 @@
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+PAGE_IMAGE_SIZES = ("thumb", "page")
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def render_dir_for(field_file):
+    """Directory holding the rendered page images of a stored PDF"""
+    return os.path.splitext(field_file.path)[0] + "_pages"
+
+
+def page_image_path(field_file, page_number, size):
+    return os.path.join(render_dir_for(field_file), f"{size}-{page_number}.jpg")
+
+
+def render_pdf_pages(pdf_path, output_dir, page_width, thumbnail_width, pages=None):
+    """Rasterize PDF pages into a mid-resolution image and a thumbnail each.
+
+    Runs inside pool workers, so it only takes plain arguments and does not
+    touch Django. ``pages`` is a list of 1-based page numbers (default: all).
+    Returns the number of pages rendered.
+    """
+    import pypdfium2 as pdfium
+    from PIL import Image
+
+    os.makedirs(output_dir, exist_ok=True)
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        page_numbers = pages or range(1, len(pdf) + 1)
+        rendered = 0
+        for page_number in page_numbers:
+            if page_number < 1 or page_number > len(pdf):
+                continue
+            page = pdf[page_number - 1]
+            try:
+                image = page.render(scale=page_width / page.get_width()).to_pil()
+            finally:
+                page.close()
+            image = image.convert("RGB")
+            _save_jpeg(image, os.path.join(output_dir, f"page-{page_number}.jpg"))
+
+            # Thumbnails are downscaled from the page image instead of
+            # rendering the PDF a second time
+            image.thumbnail((thumbnail_width, thumbnail_width * 4), Image.LANCZOS)
+            _save_jpeg(image, os.path.join(output_dir, f"thumb-{page_number}.jpg"))
+            rendered += 1
+        return rendered
+    finally:
+        pdf.close()
+
+
+def _save_jpeg(image, path):
+    # Write to a unique temp file then rename, so readers never see a
+    # half-written image and the pool and in-request renders of the same
+    # page cannot write into each other's file
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path), prefix=".", suffix=".jpg.tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            image.save(tmp, "JPEG", quality=80, optimize=True)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def render_args(field_file, pages=None):
+    return (
+        field_file.path,
+        render_dir_for(field_file),
+        settings.PDF_RENDER_PAGE_WIDTH,
+        settings.PDF_RENDER_THUMBNAIL_WIDTH,
+        pages,
+    )
+
+
+def get_executor():
+    """Shared, bounded process pool for page rendering"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.PDF_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def schedule_render(field_file):
+    """Queue background rendering of every page of a stored PDF"""
+    if not field_file:
+        return None
+    future = get_executor().submit(render_pdf_pages, *render_args(field_file))
+    name = field_file.name
+    future.add_done_callback(lambda done: _log_render_failure(done, name))
+    return future
+
+
+def _log_render_failure(future, name):
+    # Pages that failed here are rendered on request by render_page_now
+    if future.cancelled():
+        return
+    error = future.exception()
+    if error is not None:
+        logger.error(
+            "Background render of %s failed",
+            name,
+            exc_info=error,
+        )
+
+
+def render_page_now(field_file, page_number):
+    """Render a single page in-process, for requests that arrive before the pool"""
+    return render_pdf_pages(*render_args(field_file, pages=[page_number]))
@@ -1,4 +1,7 @@
+from django.urls import reverse
 from rest_framework import serializers
+from common.fields import SparseFieldsetMixin
+from common.metrics import TimedSerializerMixin
 from .models import (
     Assignment,
     Question,
@@ -9,10 +12,25 @@ from .models import (
     Submission,
     SubmissionPageMap,
     SubmissionGrade,
+    compute_mapping_status,
 )
 
 
-class AssignmentSerializer(serializers.ModelSerializer):
+def template_pdf_url(assignment):
+    """Permission-checked URL of an assignment's template PDF, or None"""
+    if not assignment.template_pdf:
+        return None
+    return reverse("serve-pdf", args=[assignment.id])
+
+
+def submission_file_url(submission):
+    """Permission-checked URL of a submission's PDF, or None"""
+    if not submission.file:
+        return None
+    return reverse("serve-submission-file", args=[submission.id])
+
+
+class AssignmentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     template_pdf = serializers.SerializerMethodField()
     total_submissions = serializers.SerializerMethodField()
     total_graded = serializers.SerializerMethodField()
@@ -35,6 +53,7 @@ class AssignmentSerializer(serializers.ModelSerializer):
             "regrade_enabled",
             "anonymized_grading",
             "upload_by_student",
+            "auto_map_pages",
             "total_submissions",
             "total_graded",
             "grading_progress",
@@ -49,25 +68,27 @@ class AssignmentSerializer(serializers.ModelSerializer):
         ]
 
     def get_template_pdf(self, obj):
-        if obj.template_pdf:
-            # Return the relative URL to avoid host issues
-            return obj.template_pdf.url
-        return None
+        # Relative URL of the serving endpoint, not of the media file
+        return template_pdf_url(obj)
 
     def get_total_points(self, obj):
         """Calculate total points from sum of all question points"""
-        from decimal import Decimal
+        if hasattr(obj, "question_points"):
+            return float(obj.question_points)
 
         total = sum(question.max_points for question in obj.questions.all())
         return float(total)
 
     def get_total_submissions(self, obj):
         """Get total number of submissions for this assignment"""
+        if hasattr(obj, "submission_count"):
+            return obj.submission_count
         return obj.pdf_submissions.count()
 
     def get_total_graded(self, obj):
         """Get total number of graded question-submission pairs"""
-        from .models import SubmissionGrade
+        if hasattr(obj, "graded_count"):
+            return obj.graded_count
 
         # Count total SubmissionGrade records (each represents a graded question for a submission)
         return SubmissionGrade.objects.filter(submission__assignment=obj).count()
@@ -75,7 +96,10 @@ class AssignmentSerializer(serializers.ModelSerializer):
     def get_grading_progress(self, obj):
         """Calculate overall grading progress percentage"""
         total_submissions = self.get_total_submissions(obj)
-        total_questions = obj.questions.count()
+        if hasattr(obj, "question_count"):
+            total_questions = obj.question_count
+        else:
+            total_questions = obj.questions.count()
 
         if total_submissions == 0 or total_questions == 0:
             return 0
@@ -103,6 +127,7 @@ class HomeworkCreateSerializer(serializers.ModelSerializer):
             "regrade_enabled",
             "anonymized_grading",
             "upload_by_student",
+            "auto_map_pages",
             "created_by",
         ]
         read_only_fields = ["id", "created_at", "type", "created_by"]
@@ -137,6 +162,11 @@ class HomeworkCreateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         return super().create(validated_data)
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data["template_pdf"] = template_pdf_url(instance)
+        return data
+
 
 class RubricItemSerializer(serializers.ModelSerializer):
 
@@ -152,7 +182,7 @@ class RubricItemSerializer(serializers.ModelSerializer):
         ]
 
 
-class QuestionSerializer(serializers.ModelSerializer):
+class QuestionSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     rubric_items = RubricItemSerializer(many=True, read_only=True)
 
     class Meta:
@@ -219,7 +249,7 @@ class RubricItemOutlineSerializer(serializers.ModelSerializer):
 #         return super().create(validated_data)
 
 
-class StudentSubmissionSerializer(serializers.ModelSerializer):
+class StudentSubmissionSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     # annotations = AnnotationSerializer(many=True, read_only=True)
 
     class Meta:
@@ -235,7 +265,7 @@ class StudentSubmissionSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "submitted_at"]
 
 
-class GradeSerializer(serializers.ModelSerializer):
+class GradeSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Grade
         fields = [
@@ -259,13 +289,16 @@ class GradeSerializer(serializers.ModelSerializer):
 
 
 # New serializers for submission management
-class SubmissionSerializer(serializers.ModelSerializer):
+class SubmissionSerializer(
+    SparseFieldsetMixin, TimedSerializerMixin, serializers.ModelSerializer
+):
     student_name = serializers.SerializerMethodField()
     uploaded_by_name = serializers.SerializerMethodField()
-    mapping_status = serializers.ReadOnlyField()
+    mapping_status = serializers.SerializerMethodField()
     grading_progress = serializers.SerializerMethodField()
     total_questions = serializers.SerializerMethodField()
     graded_questions = serializers.SerializerMethodField()
+    file = serializers.SerializerMethodField()
 
     class Meta:
         model = Submission
@@ -278,6 +311,8 @@ class SubmissionSerializer(serializers.ModelSerializer):
             "uploaded_by_name",
             "file",
             "num_pages",
+            "file_size",
+            "page_sizes",
             "created_at",
             "mapping_status",
             "grading_progress",
@@ -286,6 +321,8 @@ class SubmissionSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = [
             "id",
+            "file_size",
+            "page_sizes",
             "created_at",
             "mapping_status",
             "grading_progress",
@@ -293,6 +330,26 @@ class SubmissionSerializer(serializers.ModelSerializer):
             "graded_questions",
         ]
 
+    @staticmethod
+    def bulk_context(assignment):
+        """Context for serializing many submissions of one assignment.
+
+        Pair it with ``Submission.objects.with_grading_stats()`` so that
+        mapping status and grading progress are computed in memory.
+        """
+        return {"question_ids": list(assignment.questions.values_list("id", flat=True))}
+
+    def get_file(self, obj):
+        return submission_file_url(obj)
+
+    def get_mapping_status(self, obj):
+        question_ids = self.context.get("question_ids")
+        if question_ids is None:
+            return obj.mapping_status
+        if not hasattr(obj, "page_map"):
+            return "incomplete"
+        return compute_mapping_status(obj.page_map.page_map, question_ids)
+
     def get_student_name(self, obj):
         if obj.student:
             # Try to get the name field first, then fall back to first_name + last_name, then email
@@ -317,12 +374,15 @@ class SubmissionSerializer(serializers.ModelSerializer):
 
     def get_total_questions(self, obj):
         """Get total number of questions for this assignment"""
+        question_ids = self.context.get("question_ids")
+        if question_ids is not None:
+            return len(question_ids)
         return obj.assignment.questions.count()
 
     def get_graded_questions(self, obj):
         """Get number of questions that have been graded for this submission"""
-        from .models import SubmissionGrade
-
+        if hasattr(obj, "graded_count"):
+            return obj.graded_count
         return SubmissionGrade.objects.filter(submission=obj).count()
 
     def get_grading_progress(self, obj):
@@ -388,7 +448,16 @@ class SubmissionUploadSerializer(serializers.Serializer):
         return data
 
 
-class SubmissionGradeSerializer(serializers.ModelSerializer):
+class ApplyRubricItemSerializer(serializers.Serializer):
+    """Body of a bulk apply (or remove) of one rubric item"""
+
+    action = serializers.ChoiceField(choices=["add", "remove"], default="add")
+    submission_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False
+    )
+
+
+class SubmissionGradeSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     selected_item_ids = serializers.SerializerMethodField()
 
     class Meta:
@@ -404,6 +473,9 @@ class SubmissionGradeSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "total_points", "updated_at"]
 
     def get_selected_item_ids(self, obj):
+        # Unsaved grades stand in for questions that are not graded yet
+        if obj.pk is None:
+            return []
         return [item.id for item in obj.selected_items.all()]
 
     def update(self, instance, validated_data):
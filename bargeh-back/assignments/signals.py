@@ -0,0 +1,78 @@
+from django.core.files import File
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Assignment, Submission
+
+# File fields in content-addressed storage; every row holds one reference
+# to its blob, dropped when the file is replaced or the row is deleted
+# (including cascades, which send post_delete for each row)
+BLOB_FIELDS = {
+    Assignment: ("template_pdf",),
+    Submission: ("file",),
+}
+
+
+def stored_names(instance):
+    names = {}
+    for field in BLOB_FIELDS[type(instance)]:
+        # Deferred fields are skipped rather than loaded
+        value = instance.__dict__.get(field)
+        if isinstance(value, File):
+            # A file not yet written to storage holds no blob reference
+            value = value.name if getattr(value, "_committed", False) else None
+        names[field] = value
+    return names
+
+
+def new_files(instance):
+    """Fields whose file is written to storage, and referenced, by this save"""
+    return {
+        field
+        for field in BLOB_FIELDS[type(instance)]
+        if isinstance(instance.__dict__.get(field), File)
+        and not getattr(instance.__dict__[field], "_committed", False)
+    }
+
+
+def release_blob(instance, field, name):
+    storage = instance._meta.get_field(field).storage
+    transaction.on_commit(lambda: storage.delete(name))
+
+
+@receiver(post_init, sender=Assignment)
+@receiver(post_init, sender=Submission)
+def remember_blob_names(sender, instance, **kwargs):
+    instance._stored_blob_names = stored_names(instance)
+
+
+@receiver(pre_save, sender=Assignment)
+@receiver(pre_save, sender=Submission)
+def remember_new_files(sender, instance, **kwargs):
+    instance._new_blob_fields = new_files(instance)
+
+
+@receiver(post_save, sender=Assignment)
+@receiver(post_save, sender=Submission)
+def release_replaced_blobs(sender, instance, **kwargs):
+    current = stored_names(instance)
+    for field, name in instance._stored_blob_names.items():
+        if not name or field not in current:
+            continue
+        if current[field] != name:
+            release_blob(instance, field, name)
+        elif field in instance._new_blob_fields:
+            # The same content was stored again under the same name; its
+            # second reference is dropped in the saving transaction
+            instance._meta.get_field(field).storage.remove_reference(name)
+    instance._stored_blob_names = current
+
+
+@receiver(post_delete, sender=Assignment)
+@receiver(post_delete, sender=Submission)
+def release_deleted_blobs(sender, instance, **kwargs):
+    for field, name in stored_names(instance).items():
+        if name:
+            release_blob(instance, field, name)
+
@@ -0,0 +1,164 @@
+import hashlib
+import os
+import posixpath
+import shutil
+import tempfile
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.utils.deconstruct import deconstructible
+
+
+def hash_content(content):
+    """SHA-256 hex digest and byte size of a file, read in chunks"""
+    digest = hashlib.sha256()
+    size = 0
+    content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+        size += len(chunk)
+    content.seek(0)
+    return digest.hexdigest(), size
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """File system storage that keeps one reference-counted blob per content.
+
+    Files are stored as ``<upload_to>/<hash[:2]>/<hash><ext>``. Saving content
+    that is already stored only bumps its reference count, so duplicate
+    uploads cost no disk space or write I/O. ``delete`` drops one reference
+    and removes the blob (and its rendered pages) with the last one.
+
+    Content carrying a ``content_digest`` of (sha256 hex digest, size), set by
+    whoever already hashed it, is not read again for its hash.
+    """
+
+    def __init__(self, **kwargs):
+        # Identical names always hold identical bytes, so overwriting is safe
+        kwargs.setdefault("allow_overwrite", True)
+        super().__init__(**kwargs)
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is chosen from the content hash in _save()
+        return name
+
+    def blob_name(self, name, content_hash):
+        directory, filename = posixpath.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        return posixpath.join(directory, content_hash[:2], content_hash + extension)
+
+    def _register(self, name, content_hash, size):
+        MediaBlob = apps.get_model("assignments", "MediaBlob")
+        with transaction.atomic():
+            blob, created = MediaBlob.objects.select_for_update().get_or_create(
+                name=name, defaults={"content_hash": content_hash, "size": size}
+            )
+            if not created:
+                MediaBlob.objects.filter(pk=blob.pk).update(
+                    ref_count=F("ref_count") + 1
+                )
+
+    def _save(self, name, content):
+        digest = getattr(content, "content_digest", None)
+        content_hash, size = digest or hash_content(content)
+        name = self.blob_name(name, content_hash)
+        self._register(name, content_hash, size)
+
+        path = self.path(name)
+        if not self._touch(path):
+            self._write_atomically(path, content)
+        return name
+
+    def _touch(self, path):
+        """Refresh an existing blob's mtime; False when it does not exist.
+
+        A duplicate upload does not rewrite the blob, so without this an
+        old blob that was just claimed would still look old enough to
+        collect_orphaned_media --min-age.
+        """
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _write_atomically(self, path, content):
+        # Readers and dedup hits must never see a partly written blob, so
+        # the content goes to a temp file that is renamed into place
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                content.seek(0)
+                for chunk in content.chunks():
+                    tmp.write(chunk)
+            # mkstemp creates the file owner-only
+            os.chmod(tmp_path, self.file_permissions_mode or 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def save_local_file(self, name, local_path, content_hash, size):
+        """Move an already hashed file on the same file system into storage.
+
+        Used for chunked uploads: the file is renamed into place rather than
+        copied, and dropped if identical content is already stored.
+        """
+        name = self.blob_name(name, content_hash)
+        self._register(name, content_hash, size)
+
+        path = self.path(name)
+        if self._touch(path):
+            os.remove(local_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(local_path, path)
+        return name
+
+    def add_reference(self, name):
+        """Record one more database reference to an already stored blob"""
+        MediaBlob = apps.get_model("assignments", "MediaBlob")
+        updated = MediaBlob.objects.filter(name=name).update(
+            ref_count=F("ref_count") + 1
+        )
+        if not updated:
+            MediaBlob.objects.create(
+                name=name,
+                content_hash=os.path.splitext(posixpath.basename(name))[0],
+                size=self.size(name),
+            )
+
+    def remove_reference(self, name):
+        """Drop one database reference, never the last one, keeping the blob"""
+        MediaBlob = apps.get_model("assignments", "MediaBlob")
+        MediaBlob.objects.filter(name=name, ref_count__gt=1).update(
+            ref_count=F("ref_count") - 1
+        )
+
+    def delete(self, name):
+        MediaBlob = apps.get_model("assignments", "MediaBlob")
+        with transaction.atomic():
+            blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+            if blob and blob.ref_count > 1:
+                MediaBlob.objects.filter(pk=blob.pk).update(
+                    ref_count=F("ref_count") - 1
+                )
+                return
+            if blob:
+                blob.delete()
+
+        super().delete(name)
+        # Rendered page images live next to the blob and go with it
+        shutil.rmtree(os.path.splitext(self.path(name))[0] + "_pages", True)
+
+
+content_addressed_storage = ContentAddressedStorage()
+
+
+def get_content_addressed_storage():
+    return content_addressed_storage
@@ -0,0 +1,72 @@
+import io
+import os
+
+from django.core.management import call_command
+
+from common.tests.fixtures import MediaTestCase
+
+from ..models import MediaBlob, Submission
+from ..storage import content_addressed_storage
+
+
+class BenchmarkCommandTests(MediaTestCase):
+    def generate(self, *args):
+        call_command(
+            "generate_benchmark_data",
+            "--students=4",
+            "--assignments=2",
+            "--questions=2",
+            "--rubric-items=2",
+            "--pages=1",
+            *args,
+            stdout=io.StringIO(),
+        )
+
+    def test_submissions_share_one_counted_blob(self):
+        self.generate("--submitted=1")
+        blob = MediaBlob.objects.get()
+        self.assertEqual(Submission.objects.count(), 8)
+        self.assertEqual(blob.ref_count, 8)
+        self.assertEqual(
+            set(Submission.objects.values_list("file", flat=True)), {blob.name}
+        )
+
+    def test_clear_frees_the_blob(self):
+        self.generate("--submitted=1")
+        path = content_addressed_storage.path(MediaBlob.objects.get().name)
+
+        # References are released on commit; a run without submissions keeps
+        # no reference to its own blob either
+        with self.captureOnCommitCallbacks(execute=True):
+            self.generate("--clear", "--submitted=0")
+
+        self.assertFalse(Submission.objects.exists())
+        self.assertFalse(MediaBlob.objects.exists())
+        self.assertFalse(os.path.exists(path))
+
+    def test_clear_then_generate_keeps_the_count_exact(self):
+        self.generate("--submitted=1")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.generate("--clear", "--submitted=1")
+        self.assertEqual(Submission.objects.count(), 8)
+        self.assertEqual(MediaBlob.objects.get().ref_count, 8)
+
+    def test_run_without_submissions_keeps_no_blob(self):
+        self.generate("--submitted=0")
+        self.assertFalse(MediaBlob.objects.exists())
+        stored = [files for _, _, files in os.walk(content_addressed_storage.location)]
+        self.assertEqual(sum(stored, []), [])
+
+    def test_benchmark_grading(self):
+        self.generate("--submitted=1", "--courses=1")
+        out = io.StringIO()
+        call_command("benchmark_grading", "--repeat=1", stdout=out)
+        output = out.getvalue()
+        for endpoint in (
+            "course_list",
+            "list_submissions",
+            "get_question_submissions",
+            "get_student_grades",
+            "get_grade_statistics",
+        ):
+            self.assertIn(endpoint, output)
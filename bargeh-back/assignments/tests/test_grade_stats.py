@@ -0,0 +1,31 @@
+from django.test import SimpleTestCase
+
+from ..grade_stats import HISTOGRAM_BINS, describe
+
+
+class DescribeTests(SimpleTestCase):
+    def test_empty(self):
+        stats = describe([], 10)
+        self.assertEqual(stats["count"], 0)
+        self.assertEqual(stats["mean"], 0)
+        self.assertEqual(stats["histogram"]["counts"], [0] * HISTOGRAM_BINS)
+        self.assertEqual(stats["histogram"]["bin_edges"][-1], 10)
+
+    def test_statistics(self):
+        stats = describe([2, 4, 6, 8], 10)
+        self.assertEqual(stats["count"], 4)
+        self.assertEqual((stats["minimum"], stats["maximum"]), (2, 8))
+        self.assertEqual((stats["mean"], stats["median"]), (5, 5))
+        # Sample standard deviation: sqrt(20 / 3)
+        self.assertEqual(stats["std_dev"], 2.58)
+        self.assertEqual(stats["percentiles"]["p50"], 5)
+        self.assertEqual(stats["percentiles"]["p25"], 3.5)
+        self.assertEqual(stats["histogram"]["counts"], [0, 0, 1, 0, 1, 0, 1, 0, 1, 0])
+
+    def test_single_score(self):
+        self.assertEqual(describe([7], 10)["std_dev"], 0)
+
+    def test_histogram_covers_scores_above_the_maximum(self):
+        stats = describe([4, 12], 10)
+        self.assertEqual(stats["histogram"]["bin_edges"][-1], 12)
+        self.assertEqual(sum(stats["histogram"]["counts"]), 2)
@@ -0,0 +1,294 @@
+from decimal import Decimal
+from importlib import import_module
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from common.tests.fixtures import (
+    MediaTestCase,
+    create_assignment,
+    create_course,
+    create_question,
+    create_submission,
+    create_user,
+    grade,
+)
+
+from ..models import RubricItem, Submission, SubmissionGrade, SubmissionScore
+
+
+class GradedAssignmentTestCase(MediaTestCase):
+    """Three submissions with both questions graded "Wrong" (6 of 10 points)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = create_user(is_instructor=True)
+        cls.assignment = create_assignment(create_course(cls.instructor))
+        cls.questions = [create_question(cls.assignment, number) for number in (1, 2)]
+        cls.question = cls.questions[0]
+        cls.wrong = cls.question.rubric_items.get(label="Wrong")
+        cls.submissions = []
+        for _ in range(3):
+            submission = create_submission(cls.assignment, create_user())
+            for question in cls.questions:
+                grade(submission, question, [question.rubric_items.get(label="Wrong")])
+            cls.submissions.append(submission)
+        cls.ids = [submission.id for submission in cls.submissions]
+
+    def setUp(self):
+        self.client = self.client_for(self.instructor)
+
+
+class GradingSessionTests(GradedAssignmentTestCase):
+    def test_unknown_submission_is_not_found(self):
+        response = self.client.get(
+            reverse("grading-session", args=[self.assignment.id, self.question.id, 0])
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class GradingNavigationTests(GradedAssignmentTestCase):
+    def grading_data(self, submission_id, query="", status=200):
+        response = self.client.get(
+            reverse(
+                "submission-grading-data",
+                args=[self.assignment.id, self.question.id, submission_id],
+            )
+            + query
+        )
+        self.assertEqual(response.status_code, status)
+        return response.data
+
+    def test_position_and_neighbours(self):
+        data = self.grading_data(self.ids[1])
+        self.assertEqual(data["current_submission_index"], 1)
+        self.assertEqual(data["total_submissions"], len(self.ids))
+        self.assertEqual(data["previous_submission_id"], self.ids[0])
+        self.assertEqual(data["next_submission_id"], self.ids[2])
+
+    def test_counts_follow_grades_without_delay(self):
+        self.assertEqual(self.grading_data(self.ids[0])["graded_submissions"], 3)
+        SubmissionGrade.objects.filter(
+            question=self.question, submission_id=self.ids[2]
+        ).delete()
+
+        data = self.grading_data(self.ids[0])
+        self.assertEqual(data["graded_submissions"], 2)
+        self.assertEqual(data["next_ungraded_submission_id"], self.ids[2])
+
+    def test_stepping_with_a_position_runs_no_counts(self):
+        start = self.grading_data(self.ids[0])
+        self.assertEqual(start["next_submission_position"], 1)
+        self.assertIsNone(start["previous_submission_position"])
+
+        query = f"?position={start['next_submission_position']}"
+        with CaptureQueriesContext(connection) as queries:
+            data = self.grading_data(self.ids[1], query)
+        self.assertFalse([q["sql"] for q in queries if "COUNT(" in q["sql"]])
+        self.assertEqual(data["current_submission_index"], 1)
+        self.assertEqual(data["previous_submission_position"], 0)
+        self.assertEqual(data["next_submission_position"], 2)
+        self.assertEqual(data["next_submission_id"], self.ids[2])
+        self.assertNotIn("graded_submissions", data)
+
+    def test_invalid_position_is_rejected(self):
+        self.grading_data(self.ids[0], "?position=-1", status=400)
+        self.grading_data(self.ids[0], "?position=first", status=400)
+
+
+class ApplyRubricItemTests(GradedAssignmentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.correct = self.question.rubric_items.get(label="Correct")
+        self.url = reverse(
+            "apply-rubric-item", args=[self.assignment.id, self.correct.id]
+        )
+
+    def test_applies_to_every_listed_submission(self):
+        response = self.client.post(
+            self.url, {"submission_ids": self.ids[:2]}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        applied = SubmissionGrade.objects.filter(
+            question=self.question, selected_items=self.correct
+        )
+        self.assertCountEqual(
+            applied.values_list("submission_id", flat=True), self.ids[:2]
+        )
+
+    def test_rejects_invalid_bodies(self):
+        for body in (
+            {"submission_ids": ["x"]},
+            {"submission_ids": []},
+            {"submission_ids": 5},
+            {"submission_ids": self.ids[:1], "action": "zap"},
+        ):
+            with self.subTest(body):
+                response = self.client.post(self.url, body, format="json")
+                self.assertEqual(response.status_code, 400)
+
+
+class RescoreTests(GradedAssignmentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.grades = SubmissionGrade.objects.filter(question=self.question)
+
+    def totals(self):
+        return set(self.grades.values_list("total_points", flat=True))
+
+    def test_unchanged_totals_are_not_written(self):
+        self.assertEqual(
+            SubmissionGrade.recalculate_totals(self.question, self.grades), []
+        )
+        self.assertEqual(self.totals(), {Decimal("6")})
+
+    def test_totals_follow_item_deltas(self):
+        RubricItem.objects.filter(pk=self.wrong.pk).update(delta_points=-3)
+        changed = SubmissionGrade.recalculate_totals(self.question, self.grades)
+        self.assertCountEqual(changed, self.ids)
+        self.assertEqual(self.totals(), {Decimal("7")})
+
+    def test_totals_are_clamped_to_the_question_points(self):
+        RubricItem.objects.filter(pk=self.wrong.pk).update(delta_points=-25)
+        SubmissionGrade.recalculate_totals(self.question, self.grades)
+        self.assertEqual(self.totals(), {Decimal("0")})
+
+        RubricItem.objects.filter(pk=self.wrong.pk).update(delta_points=5)
+        SubmissionGrade.recalculate_totals(self.question, self.grades)
+        self.assertEqual(self.totals(), {self.question.max_points})
+
+    def test_matches_calculate_total_points(self):
+        RubricItem.objects.filter(pk=self.wrong.pk).update(delta_points=Decimal("-2.5"))
+        SubmissionGrade.recalculate_totals(self.question, self.grades)
+        for submission_grade in self.grades:
+            self.assertEqual(
+                submission_grade.total_points,
+                submission_grade.calculate_total_points(),
+            )
+
+
+class RubricItemEditTests(GradedAssignmentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse(
+            "get-rubric-items", args=[self.assignment.id, self.question.id]
+        )
+
+    def totals(self):
+        return set(
+            SubmissionGrade.objects.filter(question=self.question).values_list(
+                "total_points", flat=True
+            )
+        )
+
+    def scores(self):
+        return set(SubmissionScore.objects.values_list("total_score", flat=True))
+
+    def test_item_update_rescores_its_grades(self):
+        url = reverse("update-rubric-item", args=[self.assignment.id, self.wrong.id])
+        response = self.client.put(url, {"delta_points": "-1"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["rescored_grades"], 3)
+        self.assertEqual(self.totals(), {Decimal("9")})
+        self.assertEqual(self.scores(), {Decimal("15")})
+
+    def test_item_delete_rescores_its_grades(self):
+        url = reverse("delete-rubric-item", args=[self.assignment.id, self.wrong.id])
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.totals(), {Decimal("10")})
+        self.assertEqual(self.scores(), {Decimal("16")})
+
+    def test_replacing_with_no_items_rescores_the_grades(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.put(self.url, [], format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(callbacks, [])
+        self.assertFalse(self.question.rubric_items.exists())
+        self.assertEqual(self.totals(), {Decimal("10")})
+        self.assertEqual(self.scores(), {Decimal("16")})
+
+    def test_replacing_items(self):
+        body = [
+            {"label": "Right", "delta_points": 0},
+            {"label": "Half", "delta_points": "-5", "is_positive": False},
+        ]
+        response = self.client.put(self.url, body, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row["label"], row["order_index"]) for row in response.data],
+            [("Right", 0), ("Half", 1)],
+        )
+        self.assertEqual(self.question.rubric_items.count(), 2)
+        self.assertEqual(self.totals(), {Decimal("10")})
+
+    def test_invalid_items_leave_the_rubric_alone(self):
+        for body in (
+            {"label": "Not a list"},
+            [{"label": "Fine"}, "not an item"],
+            [{"label": "Fine"}, {"delta_points": -1}],
+            [{"label": "Bad points", "delta_points": "lots"}],
+        ):
+            with self.subTest(body):
+                response = self.client.put(self.url, body, format="json")
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.question.rubric_items.count(), 2)
+        self.assertEqual(self.totals(), {Decimal("6")})
+
+
+class SubmissionScoreTests(GradedAssignmentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.submission = self.submissions[0]
+
+    def score(self):
+        return SubmissionScore.objects.get(submission=self.submission)
+
+    def test_grade_update_refreshes_the_score_in_its_transaction(self):
+        url = reverse(
+            "update-submission-grade",
+            args=[self.assignment.id, self.submission.id, self.question.id],
+        )
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.put(url, {"selected_item_ids": []}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.score().total_score, Decimal("16"))
+        self.assertEqual(self.score().graded_questions, 2)
+
+    def test_replacing_questions_refreshes_the_score(self):
+        url = reverse("update-questions", args=[self.assignment.id])
+        body = {"questions": [{"title": "Question 1", "max_points": 10}]}
+        response = self.client.put(url, body, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.score().total_score, 0)
+        self.assertEqual(self.score().graded_questions, 0)
+
+    def test_deleting_a_submission_does_not_load_its_grades(self):
+        # Grades have no delete receivers, so the cascade reads only their ids
+        with CaptureQueriesContext(connection) as queries:
+            self.submission.delete()
+        self.assertFalse(
+            [
+                query["sql"]
+                for query in queries
+                if query["sql"].startswith("SELECT")
+                and "submissiongrade" in query["sql"]
+                and "total_points" in query["sql"]
+            ]
+        )
+        self.assertFalse(
+            SubmissionScore.objects.filter(submission_id=self.submission.id).exists()
+        )
+
+    def test_migration_backfills_missing_scores(self):
+        from django.apps import apps
+
+        backfill = import_module(
+            "assignments.migrations.0016_backfill_submission_scores"
+        ).backfill_submission_scores
+        SubmissionScore.objects.all().delete()
+        backfill(apps, None)
+        self.assertEqual(self.score().total_score, Decimal("12"))
+        self.assertEqual(self.score().graded_questions, 2)
+        self.assertEqual(SubmissionScore.objects.count(), Submission.objects.count())
@@ -0,0 +1,277 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import override_settings
+from django.urls import reverse
+
+from common.tests.fixtures import (
+    MediaTestCase,
+    blank_pdf,
+    create_assignment,
+    create_course,
+    create_question,
+    create_submission,
+    create_user,
+    enroll,
+    pdf_upload,
+)
+from courses.models import CourseMembership
+
+from ..ingest import match_student, roster_lookup
+from ..models import Submission, UploadSession
+from ..pdf import inspect_pdf_path, split_pdf_pages
+
+
+def zip_upload(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    return SimpleUploadedFile(
+        "stack.zip", buffer.getvalue(), content_type="application/zip"
+    )
+
+
+class RosterMatchingTests(MediaTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        instructor = create_user(is_instructor=True, email="teacher@example.com")
+        cls.course = create_course(instructor)
+        enroll(cls.course, instructor, CourseMembership.Role.INSTRUCTOR)
+        cls.alice = create_user(email="Alice@Example.com")
+        cls.student = create_user(email="98123456@uni.example")
+        # Two students share the local part "sam"
+        cls.sam = create_user(email="sam@one.example")
+        cls.other_sam = create_user(email="sam@two.example")
+        for student in (cls.alice, cls.student, cls.sam, cls.other_sam):
+            enroll(cls.course, student)
+        cls.lookup = roster_lookup(cls.course.id)
+
+    def test_file_names_match_emails_and_student_numbers(self):
+        for filename, student in (
+            ("alice@example.com.pdf", self.alice),
+            ("ALICE.pdf", self.alice),
+            ("98123456.pdf", self.student),
+            ("HW1 - 98123456_final.PDF", self.student),
+            ("sam@two.example.pdf", self.other_sam),
+        ):
+            with self.subTest(filename):
+                self.assertEqual(match_student(filename, self.lookup), student.id)
+
+    def test_unsafe_names_are_not_matched(self):
+        for filename in ("sam.pdf", "teacher.pdf", "scan-001.pdf", "98123.pdf"):
+            with self.subTest(filename):
+                self.assertIsNone(match_student(filename, self.lookup))
+
+
+class BulkUploadTests(MediaTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = create_user(is_instructor=True)
+        cls.course = create_course(cls.instructor)
+        cls.assignment = create_assignment(cls.course)
+        create_question(cls.assignment)
+        cls.alice = create_user(email="alice@example.com")
+        cls.bob = create_user(email="bob@example.com")
+        cls.carol = create_user(email="carol@example.com")
+        for student in (cls.alice, cls.bob, cls.carol):
+            enroll(cls.course, student)
+        # Carol has already handed in
+        create_submission(cls.assignment, cls.carol, num_pages=1)
+
+    def setUp(self):
+        self.client = self.client_for(self.instructor)
+        self.url = reverse("bulk-upload-submissions", args=[self.assignment.id])
+
+    def upload(self, data, query="", status=201):
+        response = self.client.post(self.url + query, data, format="multipart")
+        self.assertEqual(response.status_code, status)
+        return response
+
+    def archive(self):
+        return zip_upload(
+            {
+                "class/alice.pdf": blank_pdf(2),
+                "class/bob_hw1.pdf": blank_pdf(3),
+                "class/carol.pdf": blank_pdf(1),
+                "class/unknown.pdf": blank_pdf(1),
+                "class/broken.pdf": b"not a pdf",
+                "class/notes.txt": b"skipped",
+                "__MACOSX/class/._alice.pdf": b"skipped",
+            }
+        )
+
+    def test_archive_is_matched_to_the_roster(self):
+        summary = self.upload({"archive": self.archive()}).data
+
+        self.assertEqual(summary["created"], 3)
+        self.assertEqual(summary["matched"], 2)
+        self.assertEqual(summary["unmatched"], ["unknown.pdf"])
+        self.assertEqual(summary["duplicates"], ["carol.pdf"])
+        self.assertEqual([row["file"] for row in summary["failed"]], ["broken.pdf"])
+
+        created = Submission.objects.filter(id__in=summary["submission_ids"])
+        self.assertEqual(
+            {(s.student_id, s.num_pages) for s in created},
+            {(self.alice.id, 2), (self.bob.id, 3), (None, 1)},
+        )
+        self.assertEqual(
+            Submission.objects.filter(
+                assignment=self.assignment, student=self.carol
+            ).count(),
+            1,
+        )
+
+    def test_ids_are_matched_back_without_returning_inserts(self):
+        # Both unmatched files and an earlier upload share one blob
+        content = blank_pdf(1)
+        earlier = create_submission(self.assignment, num_pages=1, content=content)
+        archive = zip_upload(
+            {"alice.pdf": blank_pdf(2), "scan-1.pdf": content, "scan-2.pdf": content}
+        )
+        with mock.patch.object(
+            type(connection.features), "can_return_rows_from_bulk_insert", False
+        ), CaptureQueriesContext(connection) as queries:
+            summary = self.upload({"archive": archive}).data
+
+        table = Submission._meta.db_table
+        inserts = [
+            query
+            for query in queries
+            if query["sql"].startswith(f'INSERT INTO "{table}"')
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(len(set(summary["submission_ids"])), 3)
+        self.assertNotIn(earlier.id, summary["submission_ids"])
+        created = Submission.objects.filter(
+            id__in=summary["submission_ids"]
+        ).select_related("page_map")
+        self.assertCountEqual(
+            [(s.student_id, s.num_pages) for s in created],
+            [(self.alice.id, 2), (None, 1), (None, 1)],
+        )
+        for submission in created:
+            self.assertEqual(submission.page_map.page_map, {})
+            if submission.student_id is None:
+                self.assertEqual(submission.file.name, earlier.file.name)
+
+    def test_loose_files_and_archive_together(self):
+        summary = self.upload(
+            {
+                "archive": zip_upload({"alice.pdf": blank_pdf(1)}),
+                "files": [pdf_upload("bob.pdf"), pdf_upload("readme.txt")],
+            }
+        ).data
+        self.assertEqual(summary["created"], 2)
+        self.assertEqual(summary["matched"], 2)
+
+    def test_streamed_progress(self):
+        response = self.upload({"archive": self.archive()}, "?stream=true", 200)
+        lines = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        *events, summary = lines
+        self.assertEqual(
+            {event["file"]: event["status"] for event in events},
+            {
+                "alice.pdf": "matched",
+                "bob_hw1.pdf": "matched",
+                "carol.pdf": "duplicate",
+                "unknown.pdf": "unmatched",
+                "broken.pdf": "failed",
+            },
+        )
+        self.assertEqual(
+            sorted(event["processed"] for event in events), [1, 2, 3, 4, 5]
+        )
+        self.assertTrue(summary["done"])
+        self.assertEqual(summary["created"], 3)
+
+    def test_unread_stream_removes_the_staged_files(self):
+        partial_dir = os.path.join(settings.MEDIA_ROOT, UploadSession.PARTIAL_DIR)
+        response = self.upload({"archive": self.archive()}, "?stream=true", 200)
+        self.assertTrue(os.listdir(partial_dir))
+        # The client went away before the first chunk was sent
+        response.close()
+        self.assertEqual(os.listdir(partial_dir), [])
+        self.assertEqual(Submission.objects.count(), 1)
+
+    def test_rejected_uploads_create_nothing(self):
+        for data in (
+            {},
+            {"archive": SimpleUploadedFile("stack.zip", b"not a zip")},
+            {"archive": zip_upload({"notes.txt": b"no pdfs"})},
+        ):
+            with self.subTest(data):
+                self.upload(data, status=400)
+        with override_settings(UPLOAD_MAX_SIZE=100):
+            self.upload({"archive": self.archive()}, status=400)
+        self.assertEqual(Submission.objects.count(), 1)
+
+
+class SplitStackTests(MediaTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = create_user(is_instructor=True)
+        cls.assignment = create_assignment(create_course(cls.instructor))
+        cls.questions = [create_question(cls.assignment, number) for number in (1, 2)]
+
+    def setUp(self):
+        self.client = self.client_for(self.instructor)
+        self.url = reverse("split-submission-stack", args=[self.assignment.id])
+
+    def test_split_pdf_pages(self):
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir, True)
+        source = os.path.join(output_dir, "stack.pdf")
+        with open(source, "wb") as handle:
+            handle.write(blank_pdf(5))
+
+        parts = split_pdf_pages(source, output_dir, 2)
+
+        self.assertEqual([part["num_pages"] for part in parts], [2, 2, 1])
+        self.assertEqual([part["first_page"] for part in parts], [1, 3, 5])
+        for part in parts:
+            self.assertEqual(
+                inspect_pdf_path(part["path"])["num_pages"], part["num_pages"]
+            )
+            self.assertEqual(len(part["page_sizes"]), part["num_pages"])
+
+    def test_split_endpoint(self):
+        response = self.client.post(
+            self.url,
+            {"file": pdf_upload("stack.pdf", 5), "pages_per_submission": 2},
+            format="multipart",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["last_submission_pages"], 1)
+        created = Submission.objects.filter(
+            id__in=[row["id"] for row in response.data["submissions"]]
+        ).select_related("page_map")
+        self.assertEqual(sorted(s.num_pages for s in created), [1, 2, 2])
+        for submission in created:
+            self.assertIsNone(submission.student_id)
+            # Every question defaults to page 1
+            self.assertEqual(
+                submission.page_map.page_map,
+                {str(question.id): [1] for question in self.questions},
+            )
+
+    def test_pages_per_submission_is_required(self):
+        response = self.client.post(
+            self.url,
+            {"file": pdf_upload("stack.pdf", 5), "pages_per_submission": 0},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,80 @@
+from urllib.parse import unquote
+
+from django.urls import reverse
+
+from common.tests.fixtures import (
+    MediaTestCase,
+    create_assignment,
+    create_course,
+    create_question,
+    create_submission,
+    create_user,
+)
+
+
+class PagedListTestCase(MediaTestCase):
+    """Seven submissions, read two per keyset page"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = create_user(is_instructor=True)
+        cls.assignment = create_assignment(create_course(cls.instructor))
+        cls.question = create_question(cls.assignment)
+        cls.ids = [
+            create_submission(cls.assignment, create_user()).id for _ in range(7)
+        ]
+
+    def setUp(self):
+        self.client = self.client_for(self.instructor)
+
+    def walk(self, url, key):
+        rows = []
+        pages = 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data[key]), 2)
+            rows.extend(response.data[key])
+            url = response.data["next"]
+            pages += 1
+        self.assertEqual(pages, (len(self.ids) + 1) // 2)
+        return rows
+
+
+class QuestionSubmissionsTests(PagedListTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse(
+            "question-submissions", args=[self.assignment.id, self.question.id]
+        )
+
+    def test_rows_are_numbered_across_pages(self):
+        rows = self.walk(f"{self.url}?page_size=2", "submissions")
+        self.assertEqual([row["id"] for row in rows], self.ids)
+        self.assertEqual(
+            [row["row_number"] for row in rows], list(range(1, len(self.ids) + 1))
+        )
+
+    def test_score_filters_must_be_finite_numbers(self):
+        for value in ("NaN", "Infinity", "abc"):
+            with self.subTest(value):
+                response = self.client.get(self.url, {"min_score": value})
+                self.assertEqual(response.status_code, 400)
+
+
+class KeysetPaginationTests(PagedListTestCase):
+    def test_list_submissions_pages(self):
+        url = reverse("list-submissions", args=[self.assignment.id])
+        rows = self.walk(f"{url}?page_size=2", "results")
+        self.assertEqual([row["id"] for row in rows], self.ids)
+
+        # Without page_size or cursor everything comes back at once
+        response = self.client.get(url)
+        self.assertEqual(response.data["count"], len(self.ids))
+
+    def test_cursor_alone_uses_the_default_page_size(self):
+        url = reverse("list-submissions", args=[self.assignment.id])
+        first = self.client.get(f"{url}?page_size=2")
+        cursor = first.data["next"].split("cursor=")[1].split("&")[0]
+        response = self.client.get(url, {"cursor": unquote(cursor)})
+        self.assertEqual([row["id"] for row in response.data["results"]], self.ids[2:])
@@ -0,0 +1,280 @@
+import os
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+
+from common.tests.fixtures import (
+    MediaTestCase,
+    blank_pdf,
+    create_assignment,
+    create_course,
+    create_submission,
+    create_user,
+    enroll,
+)
+
+from ..media import MAX_RANGES, parse_range_header, serve_file
+
+
+class RangeHeaderTests(SimpleTestCase):
+    def test_single_and_open_ranges(self):
+        self.assertEqual(parse_range_header("bytes=0-9", 100), [(0, 9)])
+        self.assertEqual(parse_range_header("bytes=90-", 100), [(90, 99)])
+        self.assertEqual(parse_range_header("bytes=-10", 100), [(90, 99)])
+        self.assertEqual(parse_range_header("bytes=95-200", 100), [(95, 99)])
+        self.assertEqual(parse_range_header("bytes=-200", 100), [(0, 99)])
+
+    def test_overlapping_and_adjacent_ranges_are_merged(self):
+        self.assertEqual(
+            parse_range_header("bytes=30-39, 0-9, 5-19", 100), [(0, 19), (30, 39)]
+        )
+        self.assertEqual(parse_range_header("bytes=0-9,10-19", 100), [(0, 19)])
+
+    def test_multiple_ranges_are_sorted(self):
+        self.assertEqual(
+            parse_range_header("bytes=50-59,0-9", 100), [(0, 9), (50, 59)]
+        )
+
+    def test_contained_ranges_are_merged(self):
+        self.assertEqual(parse_range_header("bytes=0-99,10-20", 100), [(0, 99)])
+        self.assertEqual(parse_range_header("bytes=5-5,5-5", 100), [(5, 5)])
+
+    def test_suffix_ranges_merge_with_the_others(self):
+        self.assertEqual(parse_range_header("bytes=0-9,-5", 100), [(0, 9), (95, 99)])
+        self.assertEqual(parse_range_header("bytes=90-,-20", 100), [(80, 99)])
+
+    def test_whitespace_and_unit_case(self):
+        self.assertEqual(
+            parse_range_header("Bytes = 0-9 , 20-29", 100), [(0, 9), (20, 29)]
+        )
+
+    def test_unsatisfiable_ranges(self):
+        self.assertEqual(parse_range_header("bytes=100-", 100), [])
+        self.assertEqual(parse_range_header("bytes=-0", 100), [])
+        self.assertEqual(parse_range_header("bytes=100-,200-300", 100), [])
+
+    def test_unsatisfiable_parts_are_dropped(self):
+        self.assertEqual(parse_range_header("bytes=200-300,0-1", 100), [(0, 1)])
+
+    def test_empty_file_has_no_satisfiable_range(self):
+        for header in ("bytes=0-", "bytes=-5", "bytes=0-0"):
+            with self.subTest(header):
+                self.assertEqual(parse_range_header(header, 0), [])
+
+    def test_range_limit_counts_requested_ranges(self):
+        header = "bytes=" + ",".join(f"{n * 2}-{n * 2}" for n in range(MAX_RANGES))
+        self.assertEqual(len(parse_range_header(header, 100)), MAX_RANGES)
+
+    def test_ignored_headers(self):
+        for header in (
+            "items=0-9",
+            "bytes=",
+            "bytes=9-1",
+            "bytes=a-b",
+            "bytes=-",
+            "bytes=0-9,",
+            "bytes=0-9,9-1",
+            "bytes=" + ",".join(f"{n * 2}-{n * 2}" for n in range(MAX_RANGES + 1)),
+        ):
+            with self.subTest(header):
+                self.assertIsNone(parse_range_header(header, 100))
+
+
+class ServeFileTests(SimpleTestCase):
+    content = bytes(range(256)) * 4
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.path = os.path.join(media_root, "file.pdf")
+        with open(self.path, "wb") as handle:
+            handle.write(self.content)
+
+    def get(self, **headers):
+        request = RequestFactory().get("/", **headers)
+        response = serve_file(request, self.path, "application/pdf")
+        body = b"".join(
+            response.streaming_content if response.streaming else [response.content]
+        )
+        response.close()
+        return response, body
+
+    def test_single_range(self):
+        response, body = self.get(HTTP_RANGE="bytes=10-19")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 10-19/{len(self.content)}")
+        self.assertEqual(body, self.content[10:20])
+
+    def test_multipart_ranges(self):
+        response, body = self.get(HTTP_RANGE="bytes=0-3,100-103")
+        self.assertEqual(response.status_code, 206)
+        content_type, _, boundary = response["Content-Type"].partition("; boundary=")
+        self.assertEqual(content_type, "multipart/byteranges")
+        parts = body.split(f"--{boundary}".encode())
+        self.assertEqual(parts[-1], b"--\r\n")
+        self.assertEqual(len(parts), 4)
+        size = len(self.content)
+        for part, (start, end) in zip(parts[1:3], [(0, 3), (100, 103)]):
+            headers, _, data = part.partition(b"\r\n\r\n")
+            self.assertIn(
+                f"Content-Range: bytes {start}-{end}/{size}".encode(), headers
+            )
+            self.assertEqual(data, self.content[start : end + 1] + b"\r\n")
+
+    def test_overlapping_ranges_are_served_as_one_part(self):
+        response, body = self.get(HTTP_RANGE="bytes=0-9,5-19")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 0-19/{len(self.content)}")
+        self.assertEqual(body, self.content[:20])
+
+    def test_suffix_range(self):
+        size = len(self.content)
+        response, body = self.get(HTTP_RANGE="bytes=-10")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(
+            response["Content-Range"], f"bytes {size - 10}-{size - 1}/{size}"
+        )
+        self.assertEqual(response["Content-Length"], "10")
+        self.assertEqual(body, self.content[-10:])
+
+    def test_unsatisfiable_range(self):
+        for header in ("bytes=5000-", "bytes=-0", "bytes=5000-5001,6000-"):
+            with self.subTest(header):
+                response, body = self.get(HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(
+                    response["Content-Range"], f"bytes */{len(self.content)}"
+                )
+                self.assertEqual(body, b"")
+
+    def test_range_on_an_empty_file_is_unsatisfiable(self):
+        with open(self.path, "wb"):
+            pass
+        response, _ = self.get(HTTP_RANGE="bytes=-5")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */0")
+
+    def test_ignored_range_serves_the_whole_file(self):
+        response, body = self.get(HTTP_RANGE="bytes=9-1")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.content)
+
+    def test_current_if_range_serves_the_range(self):
+        response, _ = self.get()
+        for if_range in (response["ETag"], response["Last-Modified"]):
+            with self.subTest(if_range):
+                ranged, body = self.get(
+                    HTTP_RANGE="bytes=0-3", HTTP_IF_RANGE=if_range
+                )
+                self.assertEqual(ranged.status_code, 206)
+                self.assertEqual(body, self.content[:4])
+
+    def test_stale_if_range_serves_the_whole_file(self):
+        response, body = self.get(HTTP_RANGE="bytes=0-3", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.content)
+
+    def test_matching_etag_is_not_modified(self):
+        response, _ = self.get()
+        response, _ = self.get(HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_unchanged_since_is_not_modified(self):
+        response, _ = self.get(
+            HTTP_IF_MODIFIED_SINCE=http_date(os.stat(self.path).st_mtime + 1)
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_changed_file_is_served_again(self):
+        response, _ = self.get()
+        with open(self.path, "ab") as handle:
+            handle.write(b"more")
+        response, body = self.get(HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.content + b"more")
+
+    @override_settings(
+        MEDIA_SENDFILE_BACKEND="nginx", MEDIA_SENDFILE_PREFIX="/protected/"
+    )
+    def test_sendfile_leaves_the_body_to_the_proxy(self):
+        response, body = self.get(HTTP_RANGE="bytes=0-3")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Accel-Redirect"], "/protected/file.pdf")
+        self.assertEqual(body, b"")
+
+
+class ServeEndpointTests(MediaTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = create_user(is_instructor=True)
+        cls.student = create_user()
+        cls.other_student = create_user()
+        course = create_course(cls.instructor)
+        enroll(course, cls.student)
+        enroll(course, cls.other_student)
+        cls.assignment = create_assignment(
+            course, template_pdf=ContentFile(blank_pdf(1), name="template.pdf")
+        )
+        cls.submission = create_submission(cls.assignment, cls.student)
+        cls.url = reverse("serve-submission-file", args=[cls.submission.id])
+        with cls.submission.file.open("rb") as handle:
+            cls.content = handle.read()
+
+    def get(self, user, url=None, **headers):
+        response = self.client_for(user).get(url or self.url, **headers)
+        body = b"".join(response.streaming_content) if response.streaming else b""
+        response.close()
+        return response, body
+
+    def test_range_request(self):
+        response, body = self.get(self.student, HTTP_RANGE="bytes=0-99")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(body, self.content[:100])
+
+    def test_unsatisfiable_range(self):
+        response, _ = self.get(
+            self.instructor, HTTP_RANGE=f"bytes={len(self.content)}-"
+        )
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(self.content)}")
+
+    def test_revalidation(self):
+        response, body = self.get(self.student)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.content)
+        self.assertEqual(response["Cache-Control"], "private, max-age=3600")
+        response, _ = self.get(self.student, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_template_pdf(self):
+        url = reverse("serve-pdf", args=[self.assignment.id])
+        response, body = self.get(self.student, url, HTTP_RANGE="bytes=0-7")
+        self.assertEqual(response.status_code, 206)
+        with self.assignment.template_pdf.open("rb") as handle:
+            self.assertEqual(body, handle.read(8))
+
+    def test_other_students_are_refused(self):
+        response, _ = self.get(self.other_student)
+        self.assertEqual(response.status_code, 403)
+
+    def test_pdf_accept_header(self):
+        template_url = reverse("serve-pdf", args=[self.assignment.id])
+        for url in (self.url, template_url):
+            with self.subTest(url):
+                response, body = self.get(
+                    self.student, url, HTTP_ACCEPT="application/pdf"
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response["Content-Type"], "application/pdf")
+                self.assertTrue(body.startswith(b"%PDF"))
+
+    def test_errors_are_json_whatever_the_accept_header(self):
+        response, _ = self.get(self.other_student, HTTP_ACCEPT="application/pdf")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response["Content-Type"], "application/json")
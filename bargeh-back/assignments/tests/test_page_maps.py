@@ -0,0 +1,167 @@
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from common.tests.fixtures import (
+    MediaTestCase,
+    create_assignment,
+    create_course,
+    create_question,
+    create_submission,
+    create_user,
+    enroll,
+    pdf_upload,
+)
+
+from ..models import Submission, SubmissionPageMap, default_page_map
+
+
+class DefaultPageMapTests(SimpleTestCase):
+    def test_pages_past_the_end_are_dropped(self):
+        self.assertEqual(
+            default_page_map([(1, [1]), (2, [2, 3]), (3, [4])], 2),
+            {"1": [1], "2": [2], "3": []},
+        )
+
+    def test_questions_without_defaults_are_left_out(self):
+        self.assertEqual(
+            default_page_map([(1, []), (2, None), (3, [1])], 1), {"3": [1]}
+        )
+
+    def test_invalid_page_numbers_are_ignored(self):
+        self.assertEqual(default_page_map([(1, [0, "2", 1.0, 2])], 3), {"1": [2]})
+
+
+class PageMapTestCase(MediaTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = create_user(is_instructor=True)
+        cls.student = create_user()
+        cls.course = create_course(cls.instructor)
+        enroll(cls.course, cls.student)
+        cls.assignment = create_assignment(cls.course)
+        cls.first = create_question(cls.assignment, 1, default_page_numbers=[1])
+        cls.second = create_question(cls.assignment, 2, default_page_numbers=[2, 3])
+        create_question(cls.assignment, 3, default_page_numbers=[])
+
+    def add_submission(self, num_pages=3, page_map=None):
+        """A submission with ``page_map``, or with no page map at all"""
+        submission = create_submission(self.assignment, num_pages=num_pages)
+        if page_map is None:
+            submission.page_map.delete()
+        else:
+            SubmissionPageMap.objects.filter(submission=submission).update(
+                page_map=page_map
+            )
+        return submission
+
+    def page_map(self, submission):
+        return SubmissionPageMap.objects.get(submission=submission).page_map
+
+    def defaults(self, num_pages=3):
+        return {
+            str(self.first.id): [1],
+            str(self.second.id): [page for page in (2, 3) if page <= num_pages],
+        }
+
+
+class PopulateDefaultsTests(PageMapTestCase):
+    def test_only_unmapped_submissions_are_filled(self):
+        missing = self.add_submission()
+        empty = self.add_submission(page_map={str(self.first.id): []})
+        short = self.add_submission(num_pages=2, page_map={})
+        mapped = self.add_submission(page_map={str(self.first.id): [3]})
+
+        created, updated = SubmissionPageMap.populate_defaults(self.assignment)
+
+        self.assertEqual((created, updated), (1, 2))
+        self.assertEqual(self.page_map(missing), self.defaults())
+        self.assertEqual(self.page_map(empty), self.defaults())
+        self.assertEqual(self.page_map(short), self.defaults(num_pages=2))
+        self.assertEqual(self.page_map(mapped), {str(self.first.id): [3]})
+
+    def test_overwrite_replaces_existing_maps(self):
+        mapped = self.add_submission(page_map={str(self.first.id): [3]})
+        self.assertEqual(
+            SubmissionPageMap.populate_defaults(self.assignment, overwrite=True),
+            (0, 1),
+        )
+        self.assertEqual(self.page_map(mapped), self.defaults())
+
+    def test_limited_to_the_given_submissions(self):
+        chosen = self.add_submission()
+        other = self.add_submission()
+        SubmissionPageMap.populate_defaults(self.assignment, [chosen.id])
+        self.assertEqual(self.page_map(chosen), self.defaults())
+        self.assertFalse(SubmissionPageMap.objects.filter(submission=other).exists())
+
+    def test_query_count_does_not_depend_on_submissions(self):
+        def count():
+            with CaptureQueriesContext(connection) as queries:
+                SubmissionPageMap.populate_defaults(self.assignment, overwrite=True)
+            return len(queries)
+
+        self.add_submission()
+        self.add_submission(page_map={})
+        small = count()
+        for _ in range(4):
+            self.add_submission()
+            self.add_submission(page_map={})
+        self.assertEqual(count(), small)
+
+    def test_endpoint(self):
+        self.add_submission()
+        mapped = self.add_submission(page_map={str(self.first.id): [3]})
+        url = reverse("apply-default-page-maps", args=[self.assignment.id])
+
+        response = self.client_for(self.instructor).post(url, {}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data["created"], response.data["updated"]), (1, 0))
+
+        response = self.client_for(self.instructor).post(
+            url, {"overwrite": True}, format="json"
+        )
+        self.assertEqual((response.data["created"], response.data["updated"]), (0, 2))
+        self.assertEqual(self.page_map(mapped), self.defaults())
+
+        response = self.client_for(self.student).post(url, {}, format="json")
+        self.assertEqual(response.status_code, 403)
+
+
+class AutoMapPagesTests(PageMapTestCase):
+    def upload(self):
+        response = self.client_for(self.instructor).post(
+            reverse("upload-submissions", args=[self.assignment.id]),
+            {"files": [pdf_upload(num_pages=2)]},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 201)
+        return Submission.objects.get(id=response.data["submissions"][0]["id"])
+
+    def set_flags(self, auto_map_pages, variable_length=False):
+        self.assignment.auto_map_pages = auto_map_pages
+        self.assignment.variable_length = variable_length
+        self.assignment.save()
+
+    def test_uploads_are_mapped_from_the_defaults(self):
+        self.set_flags(auto_map_pages=True)
+        self.assertEqual(self.page_map(self.upload()), self.defaults(num_pages=2))
+
+    def test_uploads_start_unmapped_without_the_flag(self):
+        self.assertEqual(self.page_map(self.upload()), {})
+
+    def test_variable_length_assignments_are_not_prefilled(self):
+        self.set_flags(auto_map_pages=True, variable_length=True)
+        self.assertEqual(self.page_map(self.upload()), {})
+
+    def test_student_uploads_are_mapped_too(self):
+        self.set_flags(auto_map_pages=True)
+        response = self.client_for(self.student).post(
+            reverse("upload-student-submission", args=[self.assignment.id]),
+            {"file": pdf_upload(num_pages=3)},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 201)
+        submission = Submission.objects.get(id=response.data["id"])
+        self.assertEqual(self.page_map(submission), self.defaults())
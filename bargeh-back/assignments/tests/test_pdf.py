@@ -0,0 +1,125 @@
+import hashlib
+import io
+import os
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+from django.urls import reverse
+from pypdf import PdfWriter
+
+from common.tests.fixtures import (
+    MediaTestCase,
+    blank_pdf,
+    create_assignment,
+    create_course,
+    create_question,
+    create_submission,
+    create_user,
+    pdf_upload,
+)
+
+from ..models import Submission
+from ..pdf import apply_pdf_metadata, read_pdf_metadata
+
+
+def mixed_pdf():
+    """An A4 portrait page followed by a US Letter landscape one"""
+    writer = PdfWriter()
+    writer.add_blank_page(595, 842)
+    writer.add_blank_page(792, 612)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+class PdfMetadataTests(SimpleTestCase):
+    def test_reads_pages_size_and_hash(self):
+        content = mixed_pdf()
+        metadata = read_pdf_metadata(SimpleUploadedFile("a.pdf", content))
+        self.assertEqual(
+            metadata,
+            {
+                "file_size": len(content),
+                "content_hash": hashlib.sha256(content).hexdigest(),
+                "num_pages": 2,
+                "page_sizes": [[595.0, 842.0], [792.0, 612.0]],
+            },
+        )
+
+    def test_file_is_rewound_for_storage(self):
+        upload = SimpleUploadedFile("a.pdf", blank_pdf(1))
+        read_pdf_metadata(upload)
+        self.assertEqual(upload.tell(), 0)
+
+    def test_unreadable_file_keeps_the_fallback_page_count(self):
+        content = b"not a pdf"
+        submission = Submission()
+        with self.assertLogs("pypdf", "WARNING"):
+            metadata = apply_pdf_metadata(
+                submission, SimpleUploadedFile("a.pdf", content), fallback_num_pages=4
+            )
+        self.assertIsNone(metadata["num_pages"])
+        self.assertEqual(submission.num_pages, 4)
+        self.assertEqual(submission.page_sizes, [])
+        self.assertEqual(submission.file_size, len(content))
+        self.assertEqual(submission.content_hash, hashlib.sha256(content).hexdigest())
+
+
+class UploadMetadataTests(MediaTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = create_user(is_instructor=True)
+        cls.assignment = create_assignment(create_course(cls.instructor))
+        create_question(cls.assignment)
+
+    def setUp(self):
+        self.client = self.client_for(self.instructor)
+
+    def upload(self, upload, num_pages):
+        response = self.client.post(
+            reverse("upload-submissions", args=[self.assignment.id]),
+            {"files": [upload], "num_pages": num_pages},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 201)
+        return Submission.objects.get(id=response.data["submissions"][0]["id"])
+
+    def test_server_page_count_wins_over_the_client(self):
+        submission = self.upload(pdf_upload(num_pages=3), 99)
+        self.assertEqual(submission.num_pages, 3)
+        self.assertEqual(submission.page_sizes, [[595.0, 842.0]] * 3)
+
+    def test_upload_is_hashed_once(self):
+        content = blank_pdf(3)
+        with mock.patch(
+            "assignments.storage.hash_content", side_effect=AssertionError
+        ):
+            submission = self.upload(SimpleUploadedFile("a.pdf", content), 3)
+        content_hash = hashlib.sha256(content).hexdigest()
+        self.assertEqual(submission.content_hash, content_hash)
+        self.assertEqual(os.path.basename(submission.file.name), content_hash + ".pdf")
+        with submission.file.open("rb") as handle:
+            self.assertEqual(handle.read(), content)
+
+    def test_client_page_count_is_the_fallback(self):
+        upload = SimpleUploadedFile("scan.pdf", b"%PDF-1.4 truncated")
+        with self.assertLogs("pypdf", "WARNING"):
+            submission = self.upload(upload, 4)
+        self.assertEqual(submission.num_pages, 4)
+        self.assertEqual(submission.page_sizes, [])
+
+    def test_replacing_the_file_refreshes_the_metadata(self):
+        submission = create_submission(self.assignment, num_pages=3)
+        content = mixed_pdf()
+        response = self.client.put(
+            reverse("update-submission-file", args=[submission.id]),
+            {"file": SimpleUploadedFile("new.pdf", content)},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 200)
+        submission.refresh_from_db()
+        self.assertEqual(submission.num_pages, 2)
+        self.assertEqual(submission.page_sizes, [[595.0, 842.0], [792.0, 612.0]])
+        self.assertEqual(submission.file_size, len(content))
+        self.assertEqual(submission.content_hash, hashlib.sha256(content).hexdigest())
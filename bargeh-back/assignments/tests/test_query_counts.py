@@ -0,0 +1,225 @@
+from common.tests import query_counts
+from common.tests.fixtures import pdf_upload
+from common.tests.query_counts import Endpoint
+
+
+def assignment(d):
+    return [d.assignment.id]
+
+
+def question(d):
+    return [d.assignment.id, d.question.id]
+
+
+def submission(d):
+    return [d.submission.id]
+
+
+def graded_submission(d):
+    return [d.assignment.id, d.question.id, d.submission.id]
+
+
+def grade(d):
+    return [d.assignment.id, d.submission.id, d.question.id]
+
+
+QUESTIONS = {
+    "questions": [
+        {"title": "Question 1", "max_points": 10, "default_page_numbers": [1]},
+        {"title": "Question 2", "max_points": 5, "default_page_numbers": [2]},
+    ]
+}
+
+
+class AssignmentQueryCountTests(query_counts.QueryCountTestCase):
+    urls_module = "assignments.urls"
+    endpoints = [
+        Endpoint("api-root"),
+        Endpoint("assignment-list"),
+        Endpoint("assignment-list", user="student"),
+        Endpoint(
+            "assignment-list",
+            "post",
+            data=lambda d: {"course": d.course.id, "title": "New", "total_points": 10},
+            status=201,
+        ),
+        Endpoint("assignment-detail", args=assignment),
+        Endpoint(
+            "assignment-detail", "patch", args=assignment, data=lambda d: {"title": "X"}
+        ),
+        Endpoint("assignment-detail", "delete", args=assignment, status=204),
+        Endpoint("assignment-get-course-assignments", args=lambda d: [d.course.id]),
+        Endpoint(
+            "assignment-get-course-assignments",
+            args=lambda d: [d.course.id],
+            user="student",
+        ),
+        Endpoint("homework-assignments-list"),
+        Endpoint("homework-assignments-detail", args=assignment),
+        Endpoint("serve-pdf", args=assignment),
+        Endpoint("serve-pdf", args=assignment, user="student"),
+        Endpoint("template-page-image", args=lambda d: [d.assignment.id, 1]),
+        Endpoint("get-questions", args=assignment),
+        Endpoint(
+            "create-questions",
+            "post",
+            args=assignment,
+            data=lambda d: QUESTIONS,
+            status=201,
+        ),
+        Endpoint("update-questions", "put", args=assignment, data=lambda d: QUESTIONS),
+        Endpoint("get-student-submission", args=assignment, user="student"),
+        Endpoint(
+            "upload-student-submission",
+            "post",
+            args=assignment,
+            data=lambda d: {"file": pdf_upload()},
+            user="late_student",
+            format="multipart",
+            status=201,
+        ),
+        Endpoint(
+            "upload-student-submission",
+            "put",
+            args=assignment,
+            data=lambda d: {"file": pdf_upload()},
+            user="student",
+            format="multipart",
+        ),
+        Endpoint(
+            "upload-submissions",
+            "post",
+            args=assignment,
+            data=lambda d: {
+                "files": [pdf_upload()],
+                "student_ids": [d.late_student.id],
+            },
+            format="multipart",
+            status=201,
+        ),
+        Endpoint(
+            "bulk-upload-submissions",
+            "post",
+            args=assignment,
+            data=lambda d: {"files": [pdf_upload(f"{d.late_student.email}.pdf")]},
+            format="multipart",
+            status=201,
+        ),
+        Endpoint(
+            "split-submission-stack",
+            "post",
+            args=assignment,
+            data=lambda d: {"file": pdf_upload(num_pages=4), "pages_per_submission": 2},
+            format="multipart",
+            status=201,
+        ),
+        Endpoint(
+            "create-upload-session",
+            "post",
+            args=assignment,
+            data=lambda d: {"filename": "scan.pdf", "size": 1000},
+            status=201,
+        ),
+        Endpoint("upload-session-detail", args=lambda d: [d.upload_session().id]),
+        Endpoint(
+            "upload-session-detail",
+            "put",
+            args=lambda d: [d.upload_session().id],
+            query=lambda d: "offset=0",
+            data=lambda d: d.last_upload_session.content,
+            content_type="application/octet-stream",
+        ),
+        Endpoint(
+            "upload-session-detail",
+            "delete",
+            args=lambda d: [d.upload_session().id],
+            status=204,
+        ),
+        Endpoint(
+            "complete-upload-session",
+            "post",
+            args=lambda d: [d.upload_session(received=True).id],
+            status=201,
+        ),
+        Endpoint("list-submissions", args=assignment),
+        Endpoint(
+            "apply-default-page-maps",
+            "post",
+            args=assignment,
+            data=lambda d: {"overwrite": True},
+        ),
+        Endpoint("submission-details", args=submission),
+        Endpoint(
+            "update-page-map",
+            "put",
+            args=submission,
+            data=lambda d: {"page_map": {str(d.question.id): [2]}},
+        ),
+        Endpoint(
+            "update-submission-pages",
+            "patch",
+            args=submission,
+            data=lambda d: {"num_pages": 2},
+        ),
+        Endpoint("serve-submission-file", args=submission),
+        Endpoint("serve-submission-file", args=submission, user="student"),
+        Endpoint("submission-page-image", args=lambda d: [d.submission.id, 1]),
+        Endpoint("delete-submission", "delete", args=submission, status=204),
+        Endpoint(
+            "update-submission-file",
+            "put",
+            args=submission,
+            data=lambda d: {"file": pdf_upload()},
+            format="multipart",
+        ),
+        Endpoint("question-grading-stats", args=question),
+        Endpoint("question-submissions", args=question),
+        Endpoint(
+            "question-submissions",
+            args=question,
+            query=lambda d: "page_size=2&fields=student_name,question_score",
+        ),
+        Endpoint("submission-grading-data", args=graded_submission),
+        Endpoint("grading-session", args=graded_submission),
+        Endpoint("get-rubric-items", args=question),
+        Endpoint(
+            "create-rubric-item",
+            "post",
+            args=question,
+            data=lambda d: {"label": "Partial", "delta_points": -2},
+            status=201,
+        ),
+        Endpoint(
+            "update-rubric-item",
+            "put",
+            args=lambda d: [d.assignment.id, d.rubric_item.id],
+            data=lambda d: {"delta_points": -3},
+        ),
+        Endpoint(
+            "apply-rubric-item",
+            "post",
+            args=lambda d: [d.assignment.id, d.rubric_item.id],
+            data=lambda d: {
+                "action": "add",
+                "submission_ids": list(
+                    d.assignment.pdf_submissions.values_list("id", flat=True)
+                ),
+            },
+        ),
+        Endpoint(
+            "delete-rubric-item",
+            "delete",
+            args=lambda d: [d.assignment.id, d.rubric_item.id],
+            status=204,
+        ),
+        Endpoint("get-submission-grade", args=grade),
+        Endpoint(
+            "update-submission-grade",
+            "put",
+            args=grade,
+            data=lambda d: {"selected_item_ids": [d.rubric_item.id]},
+        ),
+        Endpoint("grade-statistics", args=assignment),
+        Endpoint("student-grades", args=assignment),
+        Endpoint("student-grades", args=assignment, query=lambda d: "page_size=2"),
+    ]
@@ -0,0 +1,200 @@
+import io
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from common.tests.fixtures import (
+    MediaTestCase,
+    blank_pdf,
+    create_assignment,
+    create_course,
+    create_submission,
+    create_user,
+    enroll,
+    pdf_upload,
+)
+
+from ..rendering import page_image_path, render_pdf_pages
+
+
+class RenderPdfPagesTests(SimpleTestCase):
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir, True)
+        self.pdf_path = os.path.join(self.output_dir, "stack.pdf")
+        with open(self.pdf_path, "wb") as handle:
+            handle.write(blank_pdf(3))
+
+    def image_size(self, name):
+        with Image.open(os.path.join(self.output_dir, "pages", name)) as image:
+            self.assertEqual(image.format, "JPEG")
+            return image.size
+
+    def test_renders_a_page_image_and_a_thumbnail_per_page(self):
+        output_dir = os.path.join(self.output_dir, "pages")
+        self.assertEqual(render_pdf_pages(self.pdf_path, output_dir, 200, 40), 3)
+        self.assertCountEqual(
+            os.listdir(output_dir),
+            [f"{size}-{n}.jpg" for size in ("page", "thumb") for n in (1, 2, 3)],
+        )
+        # pdfium may round the scaled width up by a pixel; A4 keeps its
+        # aspect ratio at both widths
+        for name, width in (("page-1.jpg", 200), ("thumb-1.jpg", 40)):
+            with self.subTest(name):
+                size = self.image_size(name)
+                self.assertAlmostEqual(size[0], width, delta=1)
+                self.assertAlmostEqual(size[1] / size[0], 842 / 595, delta=0.03)
+
+    def test_only_requested_pages_in_range_are_rendered(self):
+        output_dir = os.path.join(self.output_dir, "pages")
+        rendered = render_pdf_pages(
+            self.pdf_path, output_dir, 200, 40, pages=[2, 0, 9]
+        )
+        self.assertEqual(rendered, 1)
+        self.assertCountEqual(os.listdir(output_dir), ["page-2.jpg", "thumb-2.jpg"])
+
+
+@override_settings(PDF_RENDER_PAGE_WIDTH=200, PDF_RENDER_THUMBNAIL_WIDTH=40)
+class PageImageTests(MediaTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = create_user(is_instructor=True)
+        cls.student = create_user()
+        cls.course = create_course(cls.instructor)
+        enroll(cls.course, cls.student)
+        cls.assignment = create_assignment(
+            cls.course, template_pdf=ContentFile(blank_pdf(1), name="template.pdf")
+        )
+        cls.submission = create_submission(cls.assignment, cls.student, num_pages=2)
+
+    def get(self, user, page_number, size=None, submission=None, **headers):
+        url = reverse(
+            "submission-page-image",
+            args=[(submission or self.submission).id, page_number],
+        )
+        return self.client_for(user).get(
+            url, {"size": size} if size else {}, **headers
+        )
+
+    def test_missing_page_is_rendered_on_request(self):
+        path = page_image_path(self.submission.file, 2, "thumb")
+        self.assertFalse(os.path.exists(path))
+
+        response = self.get(self.student, 2, "thumb")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        body = b"".join(response.streaming_content)
+        response.close()
+        with Image.open(io.BytesIO(body)) as image:
+            self.assertEqual(image.width, 40)
+        self.assertTrue(os.path.exists(path))
+
+    def test_rendered_page_is_cached_by_the_client(self):
+        response = self.get(self.instructor, 1)
+        response.close()
+        repeat = self.client_for(self.instructor).get(
+            reverse("submission-page-image", args=[self.submission.id, 1]),
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+        self.assertEqual(repeat.status_code, 304)
+
+    def test_image_accept_header(self):
+        response = self.get(self.student, 1, "thumb", HTTP_ACCEPT="image/jpeg")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        response.close()
+
+        response = self.client_for(self.student).get(
+            reverse("template-page-image", args=[self.assignment.id, 1]),
+            {"size": "thumb"},
+            HTTP_ACCEPT="image/jpeg",
+        )
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+    def test_template_pages(self):
+        response = self.client_for(self.student).get(
+            reverse("template-page-image", args=[self.assignment.id, 1]),
+            {"size": "thumb"},
+        )
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+    def test_rejected_requests(self):
+        other_student = create_user()
+        enroll(self.course, other_student)
+        for user, page_number, size, expected in (
+            (self.instructor, 1, "huge", 400),
+            (self.instructor, 3, None, 404),
+            (other_student, 1, None, 403),
+        ):
+            with self.subTest(page=page_number, size=size):
+                response = self.get(user, page_number, size)
+                self.assertEqual(response.status_code, expected)
+
+    def test_uploads_schedule_a_background_render(self):
+        with mock.patch("assignments.views.schedule_render") as schedule:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client_for(self.instructor).post(
+                    reverse("upload-submissions", args=[self.assignment.id]),
+                    {"files": [pdf_upload()]},
+                    format="multipart",
+                )
+        self.assertEqual(response.status_code, 201)
+        schedule.assert_called_once()
+        self.assertEqual(
+            schedule.call_args.args[0].instance.id,
+            response.data["submissions"][0]["id"],
+        )
+
+
+@override_settings(PDF_RENDER_PAGE_WIDTH=200, PDF_RENDER_THUMBNAIL_WIDTH=40)
+class RenderPdfPagesCommandTests(MediaTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        instructor = create_user(is_instructor=True)
+        cls.assignment = create_assignment(
+            create_course(instructor),
+            template_pdf=ContentFile(blank_pdf(1), name="template.pdf"),
+        )
+        cls.submission = create_submission(cls.assignment, num_pages=2)
+        # Another assignment's files are left alone; a different page count
+        # keeps its blob apart from the first submission's
+        cls.other = create_submission(
+            create_assignment(cls.assignment.course), num_pages=4
+        )
+
+    def render(self, *args):
+        out = io.StringIO()
+        # Threads instead of the spawned process pool keep the test fast
+        with ThreadPoolExecutor(1) as executor, mock.patch(
+            "assignments.management.commands.render_pdf_pages.get_executor",
+            return_value=executor,
+        ):
+            call_command("render_pdf_pages", *args, stdout=out)
+        return out.getvalue()
+
+    def test_renders_the_assignment_files(self):
+        output = self.render("--assignment", str(self.assignment.id))
+        self.assertIn("rendered 3 pages (0 files failed)", output)
+        self.assertTrue(
+            os.path.exists(page_image_path(self.assignment.template_pdf, 1, "page"))
+        )
+        self.assertTrue(
+            os.path.exists(page_image_path(self.submission.file, 2, "thumb"))
+        )
+        self.assertFalse(os.path.exists(page_image_path(self.other.file, 1, "page")))
+
+    def test_unreadable_files_are_counted_as_failed(self):
+        os.remove(self.submission.file.path)
+        output = self.render("--assignment", str(self.assignment.id))
+        self.assertIn("Render failed", output)
+        self.assertIn("rendered 1 pages (1 files failed)", output)
@@ -0,0 +1,161 @@
+import io
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import transaction
+from django.utils import timezone
+
+from common.tests.fixtures import (
+    MediaTestCase,
+    blank_pdf,
+    create_assignment,
+    create_course,
+    create_submission,
+    create_upload_session,
+    create_user,
+)
+
+from ..ingest import create_submissions
+from ..models import MediaBlob, Submission, UploadSession
+from ..pdf import inspect_pdf_path
+from ..storage import content_addressed_storage
+
+
+class BlobReferenceTests(MediaTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = create_user(is_instructor=True)
+        cls.assignment = create_assignment(create_course(cls.instructor))
+        cls.content = blank_pdf(4)
+
+    def setUp(self):
+        self.submission = self.add_submission(self.content)
+        self.name = self.submission.file.name
+
+    def add_submission(self, content):
+        return Submission.objects.create(
+            assignment=self.assignment,
+            file=ContentFile(content, name="stack.pdf"),
+            num_pages=4,
+        )
+
+    def ref_count(self, name=None):
+        return MediaBlob.objects.get(name=name or self.name).ref_count
+
+    def test_identical_uploads_share_one_blob(self):
+        other = self.add_submission(self.content)
+        self.assertEqual(other.file.name, self.name)
+        self.assertEqual(self.ref_count(), 2)
+        self.assertEqual(MediaBlob.objects.filter(name=self.name).count(), 1)
+
+    def test_replacing_with_the_same_content_keeps_the_count(self):
+        self.add_submission(self.content)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.submission.file = ContentFile(self.content, name="again.pdf")
+            self.submission.save()
+        self.assertEqual(self.submission.file.name, self.name)
+        self.assertEqual(self.ref_count(), 2)
+
+    def test_replacing_with_new_content_releases_the_old_blob(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.submission.file = ContentFile(blank_pdf(5), name="new.pdf")
+            self.submission.save()
+        self.assertFalse(MediaBlob.objects.filter(name=self.name).exists())
+        self.assertFalse(content_addressed_storage.exists(self.name))
+        self.assertEqual(self.ref_count(self.submission.file.name), 1)
+
+    def test_deleting_a_row_releases_its_reference(self):
+        self.add_submission(self.content)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.submission.delete()
+        self.assertEqual(self.ref_count(), 1)
+        self.assertTrue(content_addressed_storage.exists(self.name))
+
+    def test_rolled_back_save_keeps_the_count(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                self.add_submission(self.content)
+                raise RuntimeError
+        self.assertEqual(self.ref_count(), 1)
+
+    def test_failed_ingest_registers_no_references(self):
+        staging_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, staging_dir, True)
+        path = os.path.join(staging_dir, "stack.pdf")
+        with open(path, "wb") as handle:
+            handle.write(self.content)
+        staged = [("stack.pdf", path, None, inspect_pdf_path(path))]
+
+        with mock.patch(
+            "assignments.ingest.insert_submissions", side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                create_submissions(self.assignment, self.instructor, staged)
+        self.assertEqual(self.ref_count(), 1)
+
+
+class CollectOrphanedMediaTests(MediaTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = create_user(is_instructor=True)
+        cls.assignment = create_assignment(create_course(cls.instructor))
+        cls.submission = create_submission(cls.assignment)
+
+    def setUp(self):
+        self.orphan = content_addressed_storage.save(
+            "submissions/orphan.pdf", ContentFile(b"orphan")
+        )
+        self.kept = self.submission.file.name
+        self.kept_pages = self.make_pages_dir(self.kept)
+        self.orphan_pages = self.make_pages_dir("submissions/deleted.pdf")
+
+    def make_pages_dir(self, name):
+        path = content_addressed_storage.path(os.path.splitext(name)[0] + "_pages")
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, "page-1.jpg"), "wb") as handle:
+            handle.write(b"jpeg")
+        return path
+
+    def collect(self, *args):
+        out = io.StringIO()
+        call_command("collect_orphaned_media", "--min-age", "0", *args, stdout=out)
+        return out.getvalue()
+
+    def test_dry_run_only_reports(self):
+        output = self.collect()
+        self.assertIn(f"Orphan: {self.orphan}", output)
+        self.assertNotIn(f"Orphan: {self.kept}\n", output)
+        self.assertTrue(content_addressed_storage.exists(self.orphan))
+        self.assertTrue(os.path.isdir(self.orphan_pages))
+
+    def test_delete(self):
+        self.collect("--delete")
+        self.assertFalse(content_addressed_storage.exists(self.orphan))
+        self.assertFalse(MediaBlob.objects.filter(name=self.orphan).exists())
+        self.assertFalse(os.path.exists(self.orphan_pages))
+        self.assertTrue(content_addressed_storage.exists(self.kept))
+        self.assertTrue(os.path.isdir(self.kept_pages))
+
+    def test_expired_upload_sessions_are_aborted(self):
+        active = create_upload_session(self.assignment, self.instructor, received=True)
+        expired = create_upload_session(
+            self.assignment, self.instructor, received=True
+        )
+        UploadSession.objects.filter(id=expired.id).update(
+            updated_at=timezone.now()
+            - timedelta(seconds=settings.UPLOAD_SESSION_EXPIRY + 1)
+        )
+
+        self.collect("--delete")
+
+        self.assertTrue(os.path.exists(active.partial_path))
+        self.assertFalse(os.path.exists(expired.partial_path))
+        self.assertEqual(
+            list(UploadSession.objects.values_list("id", flat=True)), [active.id]
+        )
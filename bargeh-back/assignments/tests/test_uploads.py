@@ -0,0 +1,122 @@
+import hashlib
+import io
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from common.tests.fixtures import (
+    MediaTestCase,
+    create_assignment,
+    create_course,
+    create_question,
+    create_upload_session,
+    create_user,
+)
+
+from ..models import Submission, UploadSession
+from ..uploads import write_chunk
+
+
+class ChunkedUploadTests(MediaTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = create_user(is_instructor=True)
+        cls.student = create_user()
+        cls.assignment = create_assignment(create_course(cls.instructor))
+        create_question(cls.assignment)
+
+    def setUp(self):
+        self.session = create_upload_session(
+            self.assignment, self.instructor, self.student
+        )
+        self.client = self.client_for(self.instructor)
+        self.url = reverse("upload-session-detail", args=[self.session.id])
+
+    def put(self, offset, data):
+        return self.client.put(
+            f"{self.url}?offset={offset}",
+            data,
+            content_type="application/octet-stream",
+        )
+
+    def test_upload_resumes_from_received_size(self):
+        content = self.session.content
+        self.assertEqual(self.put(0, content[:100]).data["received_size"], 100)
+
+        # A retried chunk is refused with the offset to resume from
+        response = self.put(0, content[:100])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["received_size"], 100)
+        self.assertEqual(self.client.get(self.url).data["received_size"], 100)
+
+        response = self.put(100, content[100:])
+        self.assertEqual(response.data["received_size"], len(content))
+
+        response = self.client.post(
+            reverse("complete-upload-session", args=[self.session.id])
+        )
+        self.assertEqual(response.status_code, 201)
+        submission = Submission.objects.get(id=response.data["id"])
+        self.assertEqual(submission.content_hash, hashlib.sha256(content).hexdigest())
+        self.assertEqual(submission.num_pages, 2)
+        with submission.file.open("rb") as handle:
+            self.assertEqual(handle.read(), content)
+        self.assertFalse(UploadSession.objects.filter(id=self.session.id).exists())
+        self.assertFalse(os.path.exists(self.session.partial_path))
+
+    def test_chunk_past_the_declared_size_is_refused(self):
+        response = self.put(0, self.session.content + b"extra")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["received_size"], 0)
+        self.assertFalse(os.path.exists(self.session.partial_path))
+
+    def test_chunk_is_read_before_the_session_is_locked(self):
+        depth = len(connection.atomic_blocks)
+        depths = []
+
+        class Stream(io.BytesIO):
+            def read(self, size=-1):
+                depths.append(len(connection.atomic_blocks))
+                return super().read(size)
+
+        write_chunk(self.session, 0, Stream(self.session.content[:100]))
+        self.assertEqual(set(depths), {depth})
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.received_size, 100)
+
+    def test_completion_hashes_the_assembled_file(self):
+        # Chunks written by other workers leave no state in this process
+        session = create_upload_session(
+            self.assignment, self.instructor, self.student, received=True
+        )
+        response = self.client.post(
+            reverse("complete-upload-session", args=[session.id])
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            Submission.objects.get(id=response.data["id"]).content_hash,
+            hashlib.sha256(session.content).hexdigest(),
+        )
+
+    def test_offset_must_be_an_integer(self):
+        self.assertEqual(self.put("abc", b"x").status_code, 400)
+
+    def test_incomplete_upload_cannot_be_completed(self):
+        self.put(0, self.session.content[:100])
+        response = self.client.post(
+            reverse("complete-upload-session", args=[self.session.id])
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Submission.objects.exists())
+
+    def test_expired_session_is_gone(self):
+        UploadSession.objects.filter(id=self.session.id).update(
+            updated_at=timezone.now()
+            - timedelta(seconds=settings.UPLOAD_SESSION_EXPIRY + 1)
+        )
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.assertEqual(self.put(0, b"x").status_code, 404)
@@ -0,0 +1,163 @@
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from .models import Submission, SubmissionPageMap, UploadSession
+from .pdf import read_page_sizes
+from .rendering import schedule_render
+from .storage import content_addressed_storage
+
+COPY_BUFFER_SIZE = 64 * 1024
+
+
+class ChunkError(Exception):
+    """A chunk that does not fit the upload session"""
+
+    def __init__(self, message, received_size):
+        super().__init__(message)
+        self.received_size = received_size
+
+
+def write_chunk(session, offset, stream):
+    """
+    Append a chunk read from ``stream`` at ``offset`` to the partial file.
+
+    Only the next expected offset is accepted, which keeps the partial file
+    contiguous; clients resume by asking for ``received_size``. The chunk is
+    read from the network into a spool file first, with no transaction open.
+    Only appending it and advancing ``received_size`` run under the session
+    row lock, so a slow client pins no connection or lock, and a second
+    request for the same offset (a client retry, say) is refused instead of
+    writing into the same file. Returns the new ``received_size``.
+    """
+    if offset != session.received_size:
+        raise ChunkError(
+            f"Expected offset {session.received_size}, got {offset}",
+            session.received_size,
+        )
+
+    directory = os.path.dirname(session.partial_path)
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.TemporaryFile(dir=directory) as spool:
+        written = _spool_chunk(session, offset, stream, spool)
+
+        with transaction.atomic():
+            try:
+                locked = (
+                    UploadSession.objects.select_for_update(
+                        nowait=connection.features.has_select_for_update_nowait
+                    )
+                    .only("received_size", "total_size")
+                    .get(pk=session.pk)
+                )
+            except DatabaseError:
+                raise ChunkError(
+                    "Another chunk of this upload is being written",
+                    session.received_size,
+                )
+            session.received_size = locked.received_size
+            if offset != session.received_size:
+                raise ChunkError(
+                    f"Expected offset {session.received_size}, got {offset}",
+                    session.received_size,
+                )
+
+            spool.seek(0)
+            with open(session.partial_path, "r+b" if offset else "wb") as partial:
+                partial.seek(offset)
+                partial.truncate()
+                shutil.copyfileobj(spool, partial, COPY_BUFFER_SIZE)
+            received_size = offset + written
+            UploadSession.objects.filter(pk=session.pk).update(
+                received_size=received_size, updated_at=timezone.now()
+            )
+
+    session.received_size = received_size
+    return received_size
+
+
+def _spool_chunk(session, offset, stream, spool):
+    remaining = session.total_size - offset
+    written = 0
+    while True:
+        data = stream.read(COPY_BUFFER_SIZE)
+        if not data:
+            break
+        written += len(data)
+        if written > remaining:
+            raise ChunkError(
+                f"Chunk runs past the declared size of {session.total_size} bytes",
+                offset,
+            )
+        spool.write(data)
+    return written
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as partial:
+        for data in iter(lambda: partial.read(1024 * 1024), b""):
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def finalize_upload(session):
+    """Move a fully received upload into storage and create its submission.
+
+    A complete partial file takes no more chunks, so it is hashed and read
+    from disk before the session row is locked. The lock is then held for
+    the move, so the upload cannot be completed twice.
+    """
+    if session.received_size != session.total_size:
+        raise ChunkError("Upload is incomplete", session.received_size)
+    try:
+        content_hash = file_hash(session.partial_path)
+        with open(session.partial_path, "rb") as partial:
+            page_sizes = read_page_sizes(partial)
+    except FileNotFoundError:
+        # Moved into storage by a concurrent completion
+        raise UploadSession.DoesNotExist
+
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().get(pk=session.pk)
+        if session.received_size != session.total_size:
+            raise ChunkError("Upload is incomplete", session.received_size)
+
+        name = content_addressed_storage.save_local_file(
+            Submission._meta.get_field("file").upload_to + session.filename,
+            session.partial_path,
+            content_hash,
+            session.total_size,
+        )
+
+        submission = Submission(
+            assignment_id=session.assignment_id,
+            uploaded_by_id=session.uploaded_by_id,
+            student_id=session.student_id,
+            num_pages=len(page_sizes) if page_sizes else session.num_pages,
+            file_size=session.total_size,
+            content_hash=content_hash,
+            page_sizes=page_sizes or [],
+        )
+        submission.file.name = name
+        submission.save()
+        SubmissionPageMap.objects.create(
+            submission=submission,
+            page_map=session.assignment.initial_page_map(submission.num_pages),
+        )
+        session.delete()
+        transaction.on_commit(lambda: schedule_render(submission.file))
+
+    return submission
+
+
+def abort_upload(session):
+    try:
+        os.remove(session.partial_path)
+    except FileNotFoundError:
+        pass
+    session.delete()
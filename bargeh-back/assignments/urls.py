@@ -3,14 +3,20 @@ from rest_framework.routers import DefaultRouter
 from . import views
 
 router = DefaultRouter()
-router.register(r"", views.AssignmentViewSet, basename="assignment")
+# "homework" must come first, the empty prefix's detail route would match it
 router.register(
     r"homework", views.HomeworkAssignmentViewSet, basename="homework-assignments"
 )
+router.register(r"", views.AssignmentViewSet, basename="assignment")
 
 urlpatterns = [
     path("", include(router.urls)),
     path("<int:assignment_id>/pdf/", views.serve_pdf, name="serve-pdf"),
+    path(
+        "<int:assignment_id>/pdf/pages/<int:page_number>/",
+        views.serve_template_page_image,
+        name="template-page-image",
+    ),
     # Question management URLs
     path("<int:assignment_id>/questions/", views.get_questions, name="get-questions"),
     path(
@@ -39,11 +45,41 @@ urlpatterns = [
         views.upload_submissions,
         name="upload-submissions",
     ),
+    path(
+        "<int:assignment_id>/submissions/bulk-upload/",
+        views.bulk_upload_submissions,
+        name="bulk-upload-submissions",
+    ),
+    path(
+        "<int:assignment_id>/submissions/split/",
+        views.split_submission_stack,
+        name="split-submission-stack",
+    ),
+    path(
+        "<int:assignment_id>/submissions/uploads/",
+        views.create_upload_session,
+        name="create-upload-session",
+    ),
+    path(
+        "submissions/uploads/<uuid:upload_id>/",
+        views.upload_session_detail,
+        name="upload-session-detail",
+    ),
+    path(
+        "submissions/uploads/<uuid:upload_id>/complete/",
+        views.complete_upload_session,
+        name="complete-upload-session",
+    ),
     path(
         "<int:assignment_id>/submissions/",
         views.list_submissions,
         name="list-submissions",
     ),
+    path(
+        "<int:assignment_id>/submissions/page-maps/defaults/",
+        views.apply_default_page_maps,
+        name="apply-default-page-maps",
+    ),
     path(
         "submissions/<int:submission_id>/",
         views.get_submission_details,
@@ -59,6 +95,16 @@ urlpatterns = [
         views.update_submission_pages,
         name="update-submission-pages",
     ),
+    path(
+        "submissions/<int:submission_id>/file/",
+        views.serve_submission_file,
+        name="serve-submission-file",
+    ),
+    path(
+        "submissions/<int:submission_id>/pages/<int:page_number>/",
+        views.serve_submission_page_image,
+        name="submission-page-image",
+    ),
     path(
         "submissions/<int:submission_id>/delete/",
         views.delete_submission,
@@ -85,6 +131,11 @@ urlpatterns = [
         views.get_submission_grading_data,
         name="submission-grading-data",
     ),
+    path(
+        "<int:assignment_id>/questions/<int:question_id>/submissions/<int:submission_id>/grading-session/",
+        views.get_grading_session,
+        name="grading-session",
+    ),
     # Rubric items management URLs
     path(
         "<int:assignment_id>/questions/<int:question_id>/rubric-items/",
@@ -101,6 +152,11 @@ urlpatterns = [
         views.update_rubric_item,
         name="update-rubric-item",
     ),
+    path(
+        "<int:assignment_id>/rubric-items/<int:rubric_item_id>/apply/",
+        views.apply_rubric_item,
+        name="apply-rubric-item",
+    ),
     path(
         "<int:assignment_id>/rubric-items/<int:rubric_item_id>/delete/",
         views.delete_rubric_item,
@@ -1,18 +1,38 @@
 from django.shortcuts import get_object_or_404
-from django.http import HttpResponse, Http404, FileResponse
+from django.http import HttpResponse, Http404, StreamingHttpResponse
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models import (
+    Exists,
+    F,
+    FilteredRelation,
+    OuterRef,
+    Q,
+    Window,
+)
+from django.db.models.functions import RowNumber
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import (
+    api_view,
+    content_negotiation_class,
+    permission_classes,
+)
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.viewsets import ModelViewSet
 from rest_framework import generics
 from rest_framework.decorators import action
+import json
+import logging
 import os
-import mimetypes
+import shutil
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+from common.fields import requested_fields, select_fields
+from common.pagination import KeysetCursorPagination
+from users.models import display_name_expression
 from .models import (
     Assignment,
     Submission,
@@ -20,8 +40,28 @@ from .models import (
     Question,
     RubricItem,
     SubmissionGrade,
+    SubmissionScore,
+    UploadSession,
+)
+from .grade_stats import assignment_statistics
+from .ingest import (
+    IngestError,
+    StagedStream,
+    ingest_pdfs,
+    split_stack,
+    stage_uploads,
+)
+from .media import FileContentNegotiation, serve_file
+from .pdf import apply_pdf_metadata, read_page_sizes
+from .rendering import (
+    PAGE_IMAGE_SIZES,
+    page_image_path,
+    render_page_now,
+    schedule_render,
 )
+from .uploads import ChunkError, abort_upload, finalize_upload, write_chunk
 from .serializers import (
+    ApplyRubricItemSerializer,
     AssignmentSerializer,
     HomeworkCreateSerializer,
     SubmissionSerializer,
@@ -30,8 +70,11 @@ from .serializers import (
     QuestionSerializer,
     RubricItemSerializer,
     SubmissionGradeSerializer,
+    submission_file_url,
 )
 
+logger = logging.getLogger(__name__)
+
 
 class AssignmentViewSet(ModelViewSet):
     """ViewSet for managing assignments"""
@@ -43,10 +86,14 @@ class AssignmentViewSet(ModelViewSet):
 
         # Instructors see all assignments (full access)
         if user.is_instructor:
-            return Assignment.objects.all()
+            return Assignment.objects.with_grading_stats()
 
         # Students see assignments from courses they're enrolled in
-        return Assignment.objects.filter(course__memberships__user=user).distinct()
+        return (
+            Assignment.objects.filter(course__memberships__user=user)
+            .distinct()
+            .with_grading_stats()
+        )
 
     def get_serializer_class(self):
         if hasattr(self, "action") and self.action == "create":
@@ -55,7 +102,13 @@ class AssignmentViewSet(ModelViewSet):
 
     def perform_create(self, serializer):
         # Set the created_by field to the current user
-        serializer.save(created_by=self.request.user)
+        assignment = serializer.save(created_by=self.request.user)
+        transaction.on_commit(lambda: schedule_render(assignment.template_pdf))
+
+    def perform_update(self, serializer):
+        assignment = serializer.save()
+        if "template_pdf" in serializer.validated_data:
+            transaction.on_commit(lambda: schedule_render(assignment.template_pdf))
 
     @action(detail=False, methods=["get"], url_path="course/(?P<course_id>[^/.]+)")
     def get_course_assignments(self, request, course_id=None):
@@ -70,9 +123,12 @@ class AssignmentViewSet(ModelViewSet):
             # Students see assignments from courses they're enrolled in
             queryset = queryset.filter(course__memberships__user=user)
 
+        # Totals are annotated so the listing costs one query regardless of size
+        assignments = list(queryset.with_grading_stats())
+
         # Serialize and return
-        serializer = self.get_serializer(queryset, many=True)
-        return Response({"results": serializer.data, "count": queryset.count()})
+        serializer = self.get_serializer(assignments, many=True)
+        return Response({"results": serializer.data, "count": len(assignments)})
 
 
 class HomeworkAssignmentViewSet(ModelViewSet):
@@ -85,12 +141,14 @@ class HomeworkAssignmentViewSet(ModelViewSet):
 
         # Instructors see all homework assignments
         if user.is_instructor:
-            return Assignment.objects.filter(type="homework")
+            return Assignment.objects.filter(type="homework").with_grading_stats()
 
         # Students see homework assignments from courses they're enrolled in
-        return Assignment.objects.filter(
-            type="homework", course__memberships__user=user
-        ).distinct()
+        return (
+            Assignment.objects.filter(type="homework", course__memberships__user=user)
+            .distinct()
+            .with_grading_stats()
+        )
 
     def get_serializer_class(self):
         if hasattr(self, "action") and self.action == "create":
@@ -99,57 +157,140 @@ class HomeworkAssignmentViewSet(ModelViewSet):
 
     def perform_create(self, serializer):
         # Set the created_by field to the current user and ensure it's homework type
-        serializer.save(created_by=self.request.user, type="homework")
+        assignment = serializer.save(created_by=self.request.user, type="homework")
+        transaction.on_commit(lambda: schedule_render(assignment.template_pdf))
+
+    def perform_update(self, serializer):
+        assignment = serializer.save()
+        if "template_pdf" in serializer.validated_data:
+            transaction.on_commit(lambda: schedule_render(assignment.template_pdf))
+
+
+def can_view_assignment(user, assignment):
+    """Instructors see every assignment, students only their courses'"""
+    if user.is_instructor:
+        return True
+    return assignment.course.memberships.filter(user=user).exists()
+
+
+def can_view_submission(user, submission):
+    """Instructors see every submission, students only their own"""
+    return user.is_instructor or submission.student_id == user.id
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@content_negotiation_class(FileContentNegotiation)
 def serve_pdf(request, assignment_id):
     """
-    Serve PDF files with proper headers for iframe embedding
+    Serve an assignment's template PDF with range and conditional request support
     """
-    from .models import Assignment
-
-    try:
-        assignment = get_object_or_404(Assignment, id=assignment_id)
+    assignment = get_object_or_404(Assignment, id=assignment_id)
 
-        if not assignment.template_pdf:
-            raise Http404("No PDF file found for this assignment")
+    if not can_view_assignment(request.user, assignment):
+        return Response(
+            {"error": "You are not enrolled in this course"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    if not assignment.template_pdf:
+        raise Http404("No PDF file found for this assignment")
 
-        # Get the file path
-        file_path = os.path.join(settings.MEDIA_ROOT, str(assignment.template_pdf))
+    response = serve_file(
+        request,
+        assignment.template_pdf.path,
+        "application/pdf",
+        filename=os.path.basename(assignment.template_pdf.name),
+    )
+    response["X-Frame-Options"] = "SAMEORIGIN"  # Allow iframe embedding
+    return response
 
-        if not os.path.exists(file_path):
-            raise Http404("PDF file not found on disk")
 
-        # Get the file's MIME type
-        content_type, _ = mimetypes.guess_type(file_path)
-        if not content_type:
-            content_type = "application/pdf"
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@content_negotiation_class(FileContentNegotiation)
+def serve_submission_file(request, submission_id):
+    """
+    Serve a submission's PDF with range and conditional request support
+    """
+    submission = get_object_or_404(Submission, id=submission_id)
 
-        # Use FileResponse for better performance and range request support
-        response = FileResponse(
-            open(file_path, "rb"), content_type=content_type, as_attachment=False
+    if not can_view_submission(request.user, submission):
+        return Response(
+            {"error": "You can only view your own submissions"},
+            status=status.HTTP_403_FORBIDDEN,
         )
-
-        # Set headers for better PDF serving
-        response["Content-Disposition"] = (
-            f'inline; filename="{os.path.basename(file_path)}"'
+    if not submission.file:
+        raise Http404("No PDF file found for this submission")
+
+    response = serve_file(
+        request,
+        submission.file.path,
+        "application/pdf",
+        filename=os.path.basename(submission.file.name),
+    )
+    response["X-Frame-Options"] = "SAMEORIGIN"
+    return response
+
+
+def page_image_response(request, field_file, page_number, size):
+    """Serve a rendered page image, rendering that single page if needed"""
+    if size not in PAGE_IMAGE_SIZES:
+        return Response(
+            {"error": f"size must be one of: {', '.join(PAGE_IMAGE_SIZES)}"},
+            status=status.HTTP_400_BAD_REQUEST,
         )
-        response["Accept-Ranges"] = (
-            "bytes"  # Enable range requests for smooth seeking/zooming
+    if not field_file:
+        raise Http404("No PDF file found")
+
+    image_path = page_image_path(field_file, page_number, size)
+    if not os.path.exists(image_path):
+        # The background pool has not reached this file yet
+        if not os.path.exists(field_file.path) or not render_page_now(
+            field_file, page_number
+        ):
+            raise Http404("Page not found")
+
+    return serve_file(request, image_path, "image/jpeg")
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@content_negotiation_class(FileContentNegotiation)
+def serve_template_page_image(request, assignment_id, page_number):
+    """Serve a rendered page of an assignment template (?size=thumb|page)"""
+    assignment = get_object_or_404(Assignment, id=assignment_id)
+
+    if not can_view_assignment(request.user, assignment):
+        return Response(
+            {"error": "You are not enrolled in this course"},
+            status=status.HTTP_403_FORBIDDEN,
         )
-        response["Cache-Control"] = "public, max-age=3600"  # Cache for 1 hour
-        response["X-Frame-Options"] = "SAMEORIGIN"  # Allow iframe embedding
 
-        return response
+    return page_image_response(
+        request,
+        assignment.template_pdf,
+        page_number,
+        request.query_params.get("size", "page"),
+    )
 
-    except Exception as e:
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@content_negotiation_class(FileContentNegotiation)
+def serve_submission_page_image(request, submission_id, page_number):
+    """Serve a rendered page of a submission (?size=thumb|page)"""
+    submission = get_object_or_404(Submission, id=submission_id)
+
+    if not can_view_submission(request.user, submission):
         return Response(
-            {"error": f"Error serving PDF: {str(e)}"},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            {"error": "You can only view your own submissions"},
+            status=status.HTTP_403_FORBIDDEN,
         )
 
+    return page_image_response(
+        request, submission.file, page_number, request.query_params.get("size", "page")
+    )
+
 
 # Submission management views
 @api_view(["POST"])
@@ -177,6 +318,9 @@ def upload_submissions(request, assignment_id):
             )
 
         created_submissions = []
+        default_pages = (
+            assignment.question_default_pages() if assignment.prefills_page_maps else []
+        )
 
         for i, file in enumerate(files):
             # Get student if provided
@@ -184,19 +328,14 @@ def upload_submissions(request, assignment_id):
             if i < len(student_ids) and student_ids[i]:
                 try:
                     student = User.objects.get(id=student_ids[i])
-                    print(
-                        f"Found student: {student.name or student.email} (ID: {student.id})"
-                    )
                 except User.DoesNotExist:
-                    print(f"Student with ID {student_ids[i]} not found")
+                    logger.warning(
+                        "Student %s not found, skipping file %s", student_ids[i], i
+                    )
                     continue  # Skip this file if student not found
 
-            print(
-                f"Creating submission for student: {student.name if student else 'None'}"
-            )
-
-            # Get page count from request if provided, otherwise default to 1
-            # The frontend will update this after PDF loads
+            # Page count reported by the client is only a fallback for files
+            # the server cannot parse
             num_pages = request.data.get("num_pages", 1)
             if isinstance(num_pages, str):
                 try:
@@ -205,18 +344,29 @@ def upload_submissions(request, assignment_id):
                     num_pages = 1
 
             # Create submission
-            submission = Submission.objects.create(
+            submission = Submission(
                 assignment=assignment,
                 uploaded_by=request.user,
                 student=student,
                 file=file,
-                num_pages=num_pages,
             )
+            apply_pdf_metadata(submission, file, fallback_num_pages=num_pages)
+            submission.save()
 
-            print(f"Created submission with student: {submission.student}")
+            logger.info(
+                "Created submission %s for assignment %s (student %s)",
+                submission.id,
+                assignment_id,
+                submission.student_id,
+            )
 
-            # Create empty page map
-            SubmissionPageMap.objects.create(submission=submission, page_map={})
+            SubmissionPageMap.objects.create(
+                submission=submission,
+                page_map=assignment.initial_page_map(
+                    submission.num_pages, default_pages
+                ),
+            )
+            transaction.on_commit(lambda f=submission.file: schedule_render(f))
 
             created_submissions.append(submission)
 
@@ -237,6 +387,348 @@ def upload_submissions(request, assignment_id):
         )
 
 
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def bulk_upload_submissions(request, assignment_id):
+    """
+    Create submissions from a ZIP archive ("archive") and/or many PDFs ("files").
+
+    File names are matched to roster emails or email local parts (student
+    numbers). With ?stream=true one NDJSON progress line is streamed per
+    file, followed by the summary.
+    """
+    if not request.user.is_instructor:
+        return Response(
+            {"error": "Only instructors can upload submissions"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    try:
+        assignment = get_object_or_404(Assignment, id=assignment_id)
+
+        archive = request.FILES.get("archive")
+        files = request.FILES.getlist("files")
+        if archive is None and not files:
+            return Response(
+                {"error": "No archive or files provided"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            staging_dir, staged = stage_uploads(archive, files)
+        except IngestError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if not staged:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            return Response(
+                {"error": "No PDF files found"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        events = ingest_pdfs(assignment, request.user, staged, staging_dir)
+
+        if request.query_params.get("stream") == "true":
+
+            def stream():
+                try:
+                    for event in events:
+                        yield json.dumps(event) + "\n"
+                except Exception as e:
+                    yield json.dumps({"error": f"Error ingesting files: {e}"}) + "\n"
+
+            return StreamingHttpResponse(
+                StagedStream(stream(), staging_dir),
+                content_type="application/x-ndjson",
+            )
+
+        summary = None
+        for summary in events:
+            pass
+        return Response(summary, status=status.HTTP_201_CREATED)
+
+    except Exception as e:
+        return Response(
+            {"error": f"Error ingesting files: {str(e)}"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def split_submission_stack(request, assignment_id):
+    """
+    Split one scanned PDF of the whole class into per-student submissions.
+
+    The stack is either uploaded as "file" or given as the "upload_id" of a
+    fully received chunked upload. Each submission gets "pages_per_submission"
+    pages, or as many pages as the template PDF with "mode": "template".
+    """
+    if not request.user.is_instructor:
+        return Response(
+            {"error": "Only instructors can upload submissions"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    try:
+        assignment = get_object_or_404(Assignment, id=assignment_id)
+
+        if assignment.variable_length:
+            return Response(
+                {"error": "Variable-length assignments cannot be split by page count"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if request.data.get("mode") == "template":
+            if not assignment.template_pdf:
+                return Response(
+                    {"error": "Assignment has no template PDF"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            with assignment.template_pdf.open("rb") as template:
+                page_sizes = read_page_sizes(template)
+            pages_per_submission = len(page_sizes) if page_sizes else 0
+        else:
+            try:
+                pages_per_submission = int(request.data.get("pages_per_submission"))
+            except (TypeError, ValueError):
+                pages_per_submission = 0
+        if pages_per_submission < 1:
+            return Response(
+                {"error": "pages_per_submission must be a positive integer"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        session = None
+        staging_dir = None
+        upload_id = request.data.get("upload_id")
+        stack = request.FILES.get("file")
+        if upload_id:
+            session = get_object_or_404(
+                UploadSession,
+                id=upload_id,
+                uploaded_by=request.user,
+                assignment=assignment,
+            )
+            if session.received_size != session.total_size:
+                return Response(
+                    {"error": "Upload is incomplete"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            stack_path = session.partial_path
+        elif stack is not None:
+            if hasattr(stack, "temporary_file_path"):
+                stack_path = stack.temporary_file_path()
+            else:
+                staging_dir, staged = stage_uploads(files=[stack])
+                if not staged:
+                    shutil.rmtree(staging_dir, ignore_errors=True)
+                    return Response(
+                        {"error": "file must be a PDF"},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+                stack_path = staged[0][1]
+        else:
+            return Response(
+                {"error": "Provide a file or an upload_id"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            submissions = split_stack(
+                assignment, request.user, stack_path, pages_per_submission
+            )
+        finally:
+            if staging_dir:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+        if session is not None:
+            abort_upload(session)
+
+        remainder = submissions[-1].num_pages if submissions else 0
+        # Re-read with the annotations the bulk context relies on
+        submissions = (
+            Submission.objects.filter(
+                id__in=[submission.id for submission in submissions]
+            )
+            .with_grading_stats()
+            .order_by("id")
+        )
+        return Response(
+            {
+                "message": f"Split into {len(submissions)} submissions",
+                "pages_per_submission": pages_per_submission,
+                # A short last part usually means a missing or extra page
+                "last_submission_pages": remainder,
+                "submissions": SubmissionSerializer(
+                    submissions,
+                    many=True,
+                    context=SubmissionSerializer.bulk_context(assignment),
+                ).data,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    except Exception as e:
+        return Response(
+            {"error": f"Error splitting PDF: {str(e)}"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+def upload_session_data(session):
+    return {
+        "upload_id": str(session.id),
+        "filename": session.filename,
+        "total_size": session.total_size,
+        "received_size": session.received_size,
+        "chunk_size": settings.UPLOAD_CHUNK_SIZE,
+    }
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def create_upload_session(request, assignment_id):
+    """Start a chunked, resumable upload of one submission PDF"""
+    from users.models import User
+
+    if not request.user.is_instructor:
+        return Response(
+            {"error": "Only instructors can upload submissions"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    try:
+        assignment = get_object_or_404(Assignment, id=assignment_id)
+
+        filename = os.path.basename(str(request.data.get("filename", "")))
+        if not filename:
+            return Response(
+                {"error": "filename is required"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            total_size = int(request.data.get("size"))
+        except (TypeError, ValueError):
+            total_size = 0
+        if not 0 < total_size <= settings.UPLOAD_MAX_SIZE:
+            return Response(
+                {
+                    "error": f"size must be between 1 and {settings.UPLOAD_MAX_SIZE} bytes"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        student = None
+        student_id = request.data.get("student_id")
+        if student_id:
+            student = User.objects.filter(id=student_id).first()
+            if student is None:
+                return Response(
+                    {"error": f"Student with ID {student_id} not found"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        try:
+            num_pages = int(request.data.get("num_pages", 1))
+        except (TypeError, ValueError):
+            num_pages = 1
+
+        session = UploadSession.objects.create(
+            assignment=assignment,
+            uploaded_by=request.user,
+            student=student,
+            filename=filename,
+            total_size=total_size,
+            num_pages=max(num_pages, 1),
+        )
+        return Response(upload_session_data(session), status=status.HTTP_201_CREATED)
+
+    except Exception as e:
+        return Response(
+            {"error": f"Error starting upload: {str(e)}"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["GET", "PUT", "DELETE"])
+@permission_classes([IsAuthenticated])
+def upload_session_detail(request, upload_id):
+    """
+    GET: upload progress, to find where to resume
+    PUT: raw chunk body written at ?offset=<received_size>
+    DELETE: abort the upload
+    """
+    session = get_object_or_404(
+        UploadSession.objects.active(), id=upload_id, uploaded_by=request.user
+    )
+
+    if request.method == "GET":
+        return Response(upload_session_data(session))
+
+    if request.method == "DELETE":
+        abort_upload(session)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    try:
+        offset = int(request.query_params.get("offset", ""))
+    except ValueError:
+        return Response(
+            {"error": "offset must be an integer"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        write_chunk(session, offset, request)
+    except ChunkError as e:
+        return Response(
+            {"error": str(e), "received_size": e.received_size},
+            status=status.HTTP_409_CONFLICT,
+        )
+    except Exception as e:
+        return Response(
+            {"error": f"Error writing chunk: {str(e)}"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+    return Response(upload_session_data(session))
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def complete_upload_session(request, upload_id):
+    """Finish a fully received upload and create its submission"""
+    session = get_object_or_404(
+        UploadSession.objects.active(), id=upload_id, uploaded_by=request.user
+    )
+
+    if session.received_size != session.total_size:
+        return Response(
+            {
+                "error": "Upload is incomplete",
+                "received_size": session.received_size,
+                "total_size": session.total_size,
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        submission = finalize_upload(session)
+        return Response(
+            SubmissionSerializer(submission).data, status=status.HTTP_201_CREATED
+        )
+
+    except UploadSession.DoesNotExist:
+        # Completed by a concurrent request
+        raise Http404
+    except ChunkError as e:
+        return Response(
+            {"error": str(e), "received_size": e.received_size},
+            status=status.HTTP_409_CONFLICT,
+        )
+    except Exception as e:
+        return Response(
+            {"error": f"Error completing upload: {str(e)}"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def list_submissions(request, assignment_id):
@@ -249,17 +741,26 @@ def list_submissions(request, assignment_id):
 
     try:
         assignment = get_object_or_404(Assignment, id=assignment_id)
-        submissions = Submission.objects.filter(assignment=assignment)
-
-        print(f"Found {submissions.count()} submissions for assignment {assignment_id}")
-        for submission in submissions:
-            print(
-                f"Submission {submission.id}: student={submission.student}, student_name={submission.student.name if submission.student else 'None'}"
-            )
-
-        serializer = SubmissionSerializer(submissions, many=True)
-        print(f"Serialized data: {serializer.data}")
-        return Response({"results": serializer.data, "count": submissions.count()})
+        submissions = Submission.objects.filter(
+            assignment=assignment
+        ).with_grading_stats()
+
+        # Keyset pages on ?page_size= / ?cursor=; everything otherwise
+        paginator = KeysetCursorPagination()
+        page = paginator.paginate_queryset(submissions, request)
+        submissions = page if page is not None else list(submissions)
+
+        serializer = SubmissionSerializer(
+            submissions,
+            many=True,
+            context={
+                **SubmissionSerializer.bulk_context(assignment),
+                "fields": requested_fields(request),
+            },
+        )
+        if page is not None:
+            return Response({"results": serializer.data, **paginator.get_links()})
+        return Response({"results": serializer.data, "count": len(submissions)})
 
     except Exception as e:
         return Response(
@@ -350,15 +851,19 @@ def upload_student_submission(request, assignment_id):
 
         if request.method == "POST":
             # Create new submission
-            submission = Submission.objects.create(
+            submission = Submission(
                 assignment=assignment,
                 student=request.user,
                 file=file,
-                num_pages=1,  # Will be updated when PDF is processed
             )
+            apply_pdf_metadata(submission, file)
+            submission.save()
+            transaction.on_commit(lambda: schedule_render(submission.file))
 
-            # Create empty page map
-            SubmissionPageMap.objects.create(submission=submission, page_map={})
+            SubmissionPageMap.objects.create(
+                submission=submission,
+                page_map=assignment.initial_page_map(submission.num_pages),
+            )
 
             serializer = SubmissionSerializer(submission)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -366,8 +871,9 @@ def upload_student_submission(request, assignment_id):
         else:  # PUT request
             # Update existing submission
             existing_submission.file = file
-            existing_submission.num_pages = 1  # Will be updated when PDF is processed
+            apply_pdf_metadata(existing_submission, file)
             existing_submission.save()
+            transaction.on_commit(lambda: schedule_render(existing_submission.file))
 
             serializer = SubmissionSerializer(existing_submission)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -397,13 +903,13 @@ def update_submission_pages(request, submission_id):
         if num_pages is not None:
             submission.num_pages = int(num_pages)
             submission.save()
-            print(f"Updated submission {submission_id} to have {num_pages} pages")
+            logger.info("Updated submission %s to %s pages", submission_id, num_pages)
 
         serializer = SubmissionSerializer(submission)
         return Response(serializer.data)
 
     except Exception as e:
-        print(f"Error updating submission pages: {str(e)}")
+        logger.exception("Error updating pages of submission %s", submission_id)
         return Response(
             {"error": f"Error updating submission: {str(e)}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -432,9 +938,8 @@ def get_submission_details(request, submission_id):
         try:
             page_map_obj = SubmissionPageMap.objects.get(submission=submission)
             page_map_data = page_map_obj.page_map
-            print(f"Found page map for submission {submission_id}: {page_map_data}")
         except SubmissionPageMap.DoesNotExist:
-            print(f"No page map found for submission {submission_id}")
+            logger.debug("No page map for submission %s", submission_id)
             page_map_data = {}
 
         # Get assignment questions for reference
@@ -497,12 +1002,16 @@ def update_page_map(request, submission_id):
         if not created:
             page_map.page_map = page_map_data
             page_map.save()
-            print(
-                f"Updated existing page map for submission {submission_id}: {page_map.page_map}"
+            logger.debug(
+                "Updated page map of submission %s: %s",
+                submission_id,
+                page_map.page_map,
             )
         else:
-            print(
-                f"Created new page map for submission {submission_id}: {page_map.page_map}"
+            logger.debug(
+                "Created page map of submission %s: %s",
+                submission_id,
+                page_map.page_map,
             )
 
         return Response(
@@ -516,6 +1025,38 @@ def update_page_map(request, submission_id):
         )
 
 
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def apply_default_page_maps(request, assignment_id):
+    """Map every unmapped submission's pages from the questions' default pages"""
+    if not request.user.is_instructor:
+        return Response(
+            {"error": "Only instructors can update page maps"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    try:
+        assignment = get_object_or_404(Assignment, id=assignment_id)
+        overwrite = str(request.data.get("overwrite", "")).lower() in ("true", "1")
+
+        created, updated = SubmissionPageMap.populate_defaults(
+            assignment, overwrite=overwrite
+        )
+        return Response(
+            {
+                "message": f"Mapped pages for {created + updated} submissions",
+                "created": created,
+                "updated": updated,
+            }
+        )
+
+    except Exception as e:
+        return Response(
+            {"error": f"Error applying default page maps: {str(e)}"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
 @api_view(["DELETE"])
 @permission_classes([IsAuthenticated])
 def delete_submission(request, submission_id):
@@ -533,21 +1074,12 @@ def delete_submission(request, submission_id):
         try:
             page_map = SubmissionPageMap.objects.get(submission=submission)
             page_map.delete()
-            print(f"Deleted page map for submission {submission_id}")
         except SubmissionPageMap.DoesNotExist:
-            print(f"No page map found for submission {submission_id}")
-
-        # Delete the submission file if it exists
-        if submission.file:
-            try:
-                submission.file.delete(save=False)
-                print(f"Deleted file for submission {submission_id}")
-            except Exception as e:
-                print(f"Error deleting file for submission {submission_id}: {e}")
+            logger.debug("No page map for submission %s", submission_id)
 
-        # Delete the submission
+        # Its file reference is released by the post_delete signal
         submission.delete()
-        print(f"Deleted submission {submission_id}")
+        logger.info("Deleted submission %s", submission_id)
 
         return Response(
             {"message": "Submission deleted successfully"},
@@ -555,7 +1087,7 @@ def delete_submission(request, submission_id):
         )
 
     except Exception as e:
-        print(f"Error deleting submission: {str(e)}")
+        logger.exception("Error deleting submission %s", submission_id)
         return Response(
             {"error": f"Error deleting submission: {str(e)}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -590,30 +1122,21 @@ def update_submission_file(request, submission_id):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Delete old file if it exists
-        if submission.file:
-            try:
-                submission.file.delete(save=False)
-                print(f"Deleted old file for submission {submission_id}")
-            except Exception as e:
-                print(f"Error deleting old file for submission {submission_id}: {e}")
-
-        # Update submission with new file
+        # Update submission with new file and its page count and metadata;
+        # the old file's reference is released when the save commits
         submission.file = new_file
-
-        # Calculate new page count (default to 1, will be updated by frontend)
-        submission.num_pages = 1
+        apply_pdf_metadata(submission, new_file)
 
         submission.save()
-        print(f"Updated file for submission {submission_id}")
+        transaction.on_commit(lambda: schedule_render(submission.file))
+        logger.info("Replaced file of submission %s", submission_id)
 
         # Delete existing page map since the file changed
         try:
             page_map = SubmissionPageMap.objects.get(submission=submission)
             page_map.delete()
-            print(f"Deleted page map for submission {submission_id} due to file change")
         except SubmissionPageMap.DoesNotExist:
-            print(f"No page map found for submission {submission_id}")
+            logger.debug("No page map for submission %s", submission_id)
 
         # Return updated submission data
         serializer = SubmissionSerializer(submission)
@@ -622,7 +1145,7 @@ def update_submission_file(request, submission_id):
         )
 
     except Exception as e:
-        print(f"Error updating submission file: {str(e)}")
+        logger.exception("Error replacing file of submission %s", submission_id)
         return Response(
             {"error": f"Error updating submission file: {str(e)}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -671,13 +1194,52 @@ def get_question_grading_stats(request, assignment_id, question_id):
         )
 
     except Exception as e:
-        print(f"Error getting question grading stats: {str(e)}")
+        logger.exception("Error getting grading stats of question %s", question_id)
         return Response(
             {"error": f"Error getting grading statistics: {str(e)}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
 
+def score_param(request, name):
+    """A finite Decimal from the query string, None when absent.
+
+    Raises InvalidOperation for anything else, including NaN and Infinity.
+    """
+    value = request.query_params.get(name)
+    if value in (None, ""):
+        return None
+    score = Decimal(value)
+    if not score.is_finite():
+        raise InvalidOperation(value)
+    return score
+
+
+def submission_positions(assignment, submission_ids):
+    """1-based position of each submission in the assignment's id order.
+
+    Positions count every submission of the assignment, so they stay stable
+    across pages and filters. Only the ids from the first to the last
+    requested one are numbered, after one indexed count of those before.
+    """
+    if not submission_ids:
+        return {}
+    first, last = min(submission_ids), max(submission_ids)
+    submissions = Submission.objects.filter(assignment=assignment)
+    offset = submissions.filter(id__lt=first).count()
+    numbered = (
+        submissions.filter(id__gte=first, id__lte=last)
+        .annotate(position=Window(RowNumber(), order_by=F("id").asc()))
+        .values_list("id", "position")
+    )
+    wanted = set(submission_ids)
+    return {
+        submission_id: offset + position
+        for submission_id, position in numbered
+        if submission_id in wanted
+    }
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def get_question_submissions(request, assignment_id, question_id):
@@ -692,68 +1254,177 @@ def get_question_submissions(request, assignment_id, question_id):
         assignment = get_object_or_404(Assignment, id=assignment_id)
         question = get_object_or_404(Question, id=question_id, assignment=assignment)
 
-        # Get all submissions for this assignment, ordered by ID to match grading data
+        fields = requested_fields(request)
+
+        # One LEFT JOIN against this question's grades
         submissions = (
             Submission.objects.filter(assignment=assignment)
-            .select_related("student", "uploaded_by")
+            .annotate(
+                question_grade=FilteredRelation(
+                    "grades", condition=Q(grades__question=question)
+                ),
+                student_name=display_name_expression("student__"),
+                question_score=F("question_grade__total_points"),
+                graded_at=F("question_grade__updated_at"),
+            )
             .order_by("id")
         )
 
-        # Get actual submission grades from the rubric system
-        submissions_data = []
-        for i, submission in enumerate(submissions, 1):
-            # Query the SubmissionGrade model to get actual calculated scores
-            try:
-                submission_grade = SubmissionGrade.objects.get(
-                    submission=submission, question=question
-                )
-                is_graded = True
-                score = float(submission_grade.total_points)
-                graded_by = "سیستم نمره‌دهی"  # Since it's calculated automatically
-            except SubmissionGrade.DoesNotExist:
-                is_graded = False
-                score = None
-                graded_by = None
-
-            # Get student name using the same logic as the serializer
-            student_name = "Unassigned"
-            if submission.student:
-                if submission.student.name:
-                    student_name = submission.student.name
-                elif submission.student.first_name or submission.student.last_name:
-                    student_name = f"{submission.student.first_name or ''} {submission.student.last_name or ''}".strip()
-                else:
-                    student_name = submission.student.email
+        # Optional filters: ?ungraded=true, ?min_score=, ?max_score=
+        if request.query_params.get("ungraded") in ("1", "true", "True"):
+            submissions = submissions.filter(question_grade__isnull=True)
+        try:
+            min_score = score_param(request, "min_score")
+            max_score = score_param(request, "max_score")
+        except InvalidOperation:
+            return Response(
+                {"error": "min_score and max_score must be numbers"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if min_score is not None:
+            submissions = submissions.filter(question_score__gte=min_score)
+        if max_score is not None:
+            submissions = submissions.filter(question_score__lte=max_score)
+
+        submissions = submissions.values(
+            "id", "student_name", "question_score", "graded_at"
+        )
 
+        paginator = KeysetCursorPagination()
+        page = paginator.paginate_queryset(submissions, request)
+        rows = list(page if page is not None else submissions)
+        if fields is None or "row_number" in fields:
+            positions = submission_positions(assignment, [row["id"] for row in rows])
+        else:
+            positions = {}
+
+        submissions_data = []
+        for row in rows:
+            is_graded = row["graded_at"] is not None
             submissions_data.append(
-                {
-                    "id": submission.id,
-                    "submission_id": submission.id,
-                    "row_number": i,  # Add row number to match the order
-                    "student_name": student_name,
-                    "graded_by": graded_by,
-                    "score": score,
-                    "is_graded": is_graded,
-                    "graded_at": None,
-                }
+                select_fields(
+                    {
+                        "id": row["id"],
+                        "submission_id": row["id"],
+                        "row_number": positions.get(row["id"]),
+                        "student_name": row["student_name"],
+                        # Since it's calculated automatically
+                        "graded_by": "سیستم نمره‌دهی" if is_graded else None,
+                        "score": float(row["question_score"]) if is_graded else None,
+                        "is_graded": is_graded,
+                        "graded_at": row["graded_at"] if is_graded else None,
+                    },
+                    fields,
+                )
             )
 
-        return Response(
-            {
-                "question_id": question.id,
-                "question_title": question.title,
-                "submissions": submissions_data,
-            }
-        )
+        response_data = {
+            "question_id": question.id,
+            "question_title": question.title,
+            "submissions": submissions_data,
+        }
+        if page is not None:
+            response_data.update(paginator.get_links())
+        return Response(response_data)
 
     except Exception as e:
-        print(f"Error getting question submissions: {str(e)}")
+        logger.exception("Error listing submissions of question %s", question_id)
         return Response(
             {"error": f"Error getting question submissions: {str(e)}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
 
+def requested_position(request):
+    """The ``?position=`` a client carried over from the previous step, or None"""
+    value = request.query_params.get("position")
+    if value is None:
+        return None
+    position = int(value)
+    if position < 0:
+        raise ValueError(position)
+    return position
+
+
+def grading_navigation(
+    assignment, question, submission, prefetch_count=1, position=None
+):
+    """Neighbour ids and grading position for one submission/question pair.
+
+    Neighbours are found with indexed keyset lookups (id < / id >), so a step
+    costs the same at any class size. The position and the progress counts
+    are COUNTs over the class, so they are only run when a grading session
+    starts (no ``position``). Each response gives the neighbours' positions;
+    a client stepping to one passes it back as ``position`` and keeps its
+    own progress count from then on.
+    """
+    assignment_submissions = Submission.objects.filter(assignment=assignment)
+    previous_submission_id = (
+        assignment_submissions.filter(id__lt=submission.id)
+        .order_by("-id")
+        .values_list("id", flat=True)
+        .first()
+    )
+    upcoming_ids = list(
+        assignment_submissions.filter(id__gt=submission.id)
+        .order_by("id")
+        .values_list("id", flat=True)[: max(1, prefetch_count)]
+    )
+
+    # Next submission without a grade for this question, wrapping around to
+    # the start of the list; served by the (question, submission) index
+    ungraded_submissions = (
+        assignment_submissions.exclude(id=submission.id)
+        .filter(
+            ~Exists(
+                SubmissionGrade.objects.filter(
+                    question=question, submission=OuterRef("pk")
+                )
+            )
+        )
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    next_ungraded_submission_id = (
+        ungraded_submissions.filter(id__gt=submission.id).first()
+        or ungraded_submissions.first()
+    )
+
+    navigation = {
+        "previous_submission_id": previous_submission_id,
+        "next_submission_id": upcoming_ids[0] if upcoming_ids else None,
+        "next_ungraded_submission_id": next_ungraded_submission_id,
+        "upcoming_submission_ids": upcoming_ids[:prefetch_count],
+    }
+    if position is None:
+        position = assignment_submissions.filter(id__lt=submission.id).count()
+        navigation["total_submissions"] = assignment_submissions.count()
+        navigation["graded_submissions"] = SubmissionGrade.objects.filter(
+            question=question
+        ).count()
+    navigation["current_index"] = position
+    navigation["previous_position"] = position - 1 if previous_submission_id else None
+    navigation["next_position"] = position + 1 if upcoming_ids else None
+    return navigation
+
+
+def grading_progress(navigation):
+    """Progress fields of a grading response; empty once a session is under way"""
+    if "total_submissions" not in navigation:
+        return {}
+    total_submissions = navigation["total_submissions"]
+    graded_submissions = navigation["graded_submissions"]
+    return {
+        "total_submissions": total_submissions,
+        "graded_submissions": graded_submissions,
+        "progress_percentage": (
+            0
+            if total_submissions == 0
+            else int((graded_submissions / total_submissions) * 100)
+        ),
+    }
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def get_submission_grading_data(request, assignment_id, question_id, submission_id):
@@ -764,28 +1435,26 @@ def get_submission_grading_data(request, assignment_id, question_id, submission_
             status=status.HTTP_403_FORBIDDEN,
         )
 
+    try:
+        position = requested_position(request)
+    except ValueError:
+        return Response(
+            {"error": "position must be a non-negative integer"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
     try:
         assignment = get_object_or_404(Assignment, id=assignment_id)
         question = get_object_or_404(Question, id=question_id, assignment=assignment)
         submission = get_object_or_404(
-            Submission, id=submission_id, assignment=assignment
+            Submission.objects.select_related("student"),
+            id=submission_id,
+            assignment=assignment,
         )
 
-        # Get all submissions for this question to calculate position
-        all_submissions = Submission.objects.filter(assignment=assignment).order_by(
-            "id"
+        navigation = grading_navigation(
+            assignment, question, submission, position=position
         )
-        submission_ids = list(all_submissions.values_list("id", flat=True))
-        current_index = submission_ids.index(submission.id)
-
-        # Get previous and next submission IDs
-        previous_submission_id = None
-        next_submission_id = None
-
-        if current_index > 0:
-            previous_submission_id = submission_ids[current_index - 1]
-        if current_index < len(submission_ids) - 1:
-            next_submission_id = submission_ids[current_index + 1]
 
         # Get student name using the same logic as the serializer
         student_name = "Unassigned"
@@ -801,32 +1470,29 @@ def get_submission_grading_data(request, assignment_id, question_id, submission_
         page_number = 1  # Default
         try:
             page_map = SubmissionPageMap.objects.get(submission=submission)
-            print(f"Found page map for submission {submission_id}: {page_map.page_map}")
             if hasattr(page_map, "page_map") and page_map.page_map:
                 # Find the page for this question
                 # page_map.page_map is a dict like {question_id: [page_numbers]}
                 if str(question_id) in page_map.page_map:
                     pages = page_map.page_map[str(question_id)]
-                    print(f"Found pages for question {question_id}: {pages}")
                     if pages and len(pages) > 0:
                         page_number = pages[0]  # Use the first page for this question
-                        print(f"Using page number: {page_number}")
                 else:
-                    print(f"Question {question_id} not found in page map")
+                    logger.debug(
+                        "Question %s not in page map of submission %s",
+                        question_id,
+                        submission_id,
+                    )
         except SubmissionPageMap.DoesNotExist:
-            print(f"No page map found for submission {submission_id}")
+            logger.debug("No page map for submission %s", submission_id)
             pass
 
-        # Get grading statistics
-        total_submissions = all_submissions.count()
-        graded_submissions = (
-            0  # This would be: Grade.objects.filter(question=question).count()
-        )
-        progress_percentage = (
-            0
-            if total_submissions == 0
-            else int((graded_submissions / total_submissions) * 100)
-        )
+        # Grading statistics, only when the session starts
+        progress = grading_progress(navigation)
+        if progress:
+            progress["total_submissions_for_question"] = progress[
+                "total_submissions"
+            ]
 
         return Response(
             {
@@ -835,26 +1501,136 @@ def get_submission_grading_data(request, assignment_id, question_id, submission_
                 "question_id": question.id,
                 "question_title": question.title,
                 "question_points": float(question.max_points),
-                "total_submissions": total_submissions,
-                "graded_submissions": graded_submissions,
-                "progress_percentage": progress_percentage,
-                "current_submission_index": current_index,
-                "total_submissions_for_question": total_submissions,
+                **progress,
+                "current_submission_index": navigation["current_index"],
+                "previous_submission_position": navigation["previous_position"],
+                "next_submission_position": navigation["next_position"],
                 "page_number": page_number,
-                "file_url": submission.file.url if submission.file else None,
-                "previous_submission_id": previous_submission_id,
-                "next_submission_id": next_submission_id,
+                "file_url": submission_file_url(submission),
+                "previous_submission_id": navigation["previous_submission_id"],
+                "next_submission_id": navigation["next_submission_id"],
+                "next_ungraded_submission_id": navigation[
+                    "next_ungraded_submission_id"
+                ],
             }
         )
 
     except Exception as e:
-        print(f"Error getting submission grading data: {str(e)}")
+        logger.exception("Error getting grading data of submission %s", submission_id)
         return Response(
             {"error": f"Error getting grading data: {str(e)}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
 
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def get_grading_session(request, assignment_id, question_id, submission_id):
+    """Everything the grading page needs for one submission/question pair.
+
+    Bundles the submission, its page map, the assignment outline with rubric
+    items, the current grade and navigation (plus the ids of the next
+    ``?prefetch=`` submissions) so grading costs one round trip per action.
+    Progress counts are included until the client passes ``?position=``
+    (see grading_navigation).
+    """
+    if not request.user.is_instructor:
+        return Response(
+            {"error": "Only instructors can view grading data"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    try:
+        prefetch_count = min(max(int(request.query_params.get("prefetch", 5)), 0), 20)
+    except ValueError:
+        return Response(
+            {"error": "prefetch must be an integer"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        position = requested_position(request)
+    except ValueError:
+        return Response(
+            {"error": "position must be a non-negative integer"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    # Outside the try below so unknown ids stay 404s
+    question = get_object_or_404(
+        Question.objects.select_related("assignment"),
+        id=question_id,
+        assignment_id=assignment_id,
+    )
+    assignment = question.assignment
+    submission = get_object_or_404(
+        Submission.objects.with_grading_stats(),
+        id=submission_id,
+        assignment=assignment,
+    )
+
+    try:
+        questions = list(
+            Question.objects.filter(assignment=assignment)
+            .order_by("order_index")
+            .prefetch_related("rubric_items")
+        )
+        question_ids = [q.id for q in questions]
+        submission_data = SubmissionSerializer(
+            submission, context={"question_ids": question_ids}
+        ).data
+
+        page_map = (
+            submission.page_map.page_map if hasattr(submission, "page_map") else {}
+        )
+        pages = page_map.get(str(question.id)) or []
+
+        grade = (
+            SubmissionGrade.objects.filter(submission=submission, question=question)
+            .prefetch_related("selected_items")
+            .first()
+        )
+
+        navigation = grading_navigation(
+            assignment,
+            question,
+            submission,
+            prefetch_count=prefetch_count,
+            position=position,
+        )
+
+        return Response(
+            {
+                "submission": submission_data,
+                "page_map": page_map,
+                "page_number": pages[0] if pages else 1,
+                "question": QuestionSerializer(
+                    next(q for q in questions if q.id == question.id)
+                ).data,
+                "questions": QuestionSerializer(questions, many=True).data,
+                "grade": SubmissionGradeSerializer(grade).data if grade else None,
+                **grading_progress(navigation),
+                "current_submission_index": navigation["current_index"],
+                "previous_submission_position": navigation["previous_position"],
+                "next_submission_position": navigation["next_position"],
+                "previous_submission_id": navigation["previous_submission_id"],
+                "next_submission_id": navigation["next_submission_id"],
+                "next_ungraded_submission_id": navigation[
+                    "next_ungraded_submission_id"
+                ],
+                "prefetch_submission_ids": navigation["upcoming_submission_ids"],
+            }
+        )
+
+    except Exception as e:
+        logger.exception(
+            "Error getting grading session of submission %s", submission_id
+        )
+        return Response(
+            {"error": f"Error getting grading session: {str(e)}"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
 # Question management views
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
@@ -915,20 +1691,26 @@ def update_questions(request, assignment_id):
         assignment = get_object_or_404(Assignment, id=assignment_id)
         questions_data = request.data.get("questions", [])
 
-        print(f"Updating questions for assignment {assignment_id}")
-        print(f"Received questions data: {questions_data}")
+        logger.debug(
+            "Replacing questions of assignment %s: %s", assignment_id, questions_data
+        )
 
         # Delete existing questions
         existing_count = Question.objects.filter(assignment=assignment).count()
-        print(f"Deleting {existing_count} existing questions")
-        Question.objects.filter(assignment=assignment).delete()
+        with transaction.atomic():
+            # Their grades go with them, so the submission totals are refreshed
+            graded = set(
+                SubmissionGrade.objects.filter(
+                    question__assignment=assignment
+                ).values_list("submission_id", flat=True)
+            )
+            Question.objects.filter(assignment=assignment).delete()
+            SubmissionScore.refresh(graded)
 
         # Create new questions
         created_questions = []
 
         for i, question_data in enumerate(questions_data):
-            print(f"Creating question {i+1}: {question_data}")
-
             # Ensure max_points is a valid decimal
             max_points = question_data.get("max_points", 10)
             if isinstance(max_points, str):
@@ -943,18 +1725,20 @@ def update_questions(request, assignment_id):
                 default_page_numbers=question_data.get("default_page_numbers", []),
             )
             created_questions.append(question)
-            print(
-                f"Created question with ID: {question.id}, max_points: {question.max_points}"
-            )
 
-        print(f"Successfully created {len(created_questions)} questions")
+        logger.info(
+            "Replaced %s questions of assignment %s with %s",
+            existing_count,
+            assignment_id,
+            len(created_questions),
+        )
 
         # Serialize and return
         serializer = QuestionSerializer(created_questions, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     except Exception as e:
-        print(f"Error updating questions: {str(e)}")
+        logger.exception("Error updating questions of assignment %s", assignment_id)
         return Response(
             {"error": f"Error updating questions: {str(e)}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -971,19 +1755,11 @@ def get_questions(request, assignment_id):
             "order_index"
         )
 
-        print(f"Fetching questions for assignment {assignment_id}")
-        print(f"Found {questions.count()} questions")
-        for q in questions:
-            print(
-                f"Question: {q.title}, Points: {q.max_points}, Pages: {q.default_page_numbers}"
-            )
-
         serializer = QuestionSerializer(questions, many=True)
-        print(f"Serialized data: {serializer.data}")
         return Response(serializer.data)
 
     except Exception as e:
-        print(f"Error fetching questions: {str(e)}")
+        logger.exception("Error fetching questions of assignment %s", assignment_id)
         return Response(
             {"error": f"Error fetching questions: {str(e)}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -991,10 +1767,16 @@ def get_questions(request, assignment_id):
 
 
 # Rubric Items Management Endpoints
-@api_view(["GET"])
+@api_view(["GET", "PUT"])
 @permission_classes([IsAuthenticated])
 def get_rubric_items(request, assignment_id, question_id):
-    """Get rubric items for a question"""
+    """
+    GET: rubric items for a question
+    PUT: replace the question's rubric items
+    """
+    if request.method == "PUT":
+        return update_rubric_items(request, question_id)
+
     try:
         question = get_object_or_404(Question, id=question_id)
         rubric_items = RubricItem.objects.filter(question=question).order_by(
@@ -1016,15 +1798,8 @@ def get_rubric_items(request, assignment_id, question_id):
 def create_rubric_item(request, assignment_id, question_id):
     """Create a new rubric item for a question"""
     try:
-        print(f"Creating rubric item for question {question_id}")
-        print(f"Request data: {request.data}")
-        print(f"Request content type: {request.content_type}")
-        print(f"Request method: {request.method}")
-        print(f"Request headers: {dict(request.headers)}")
-
         # Check if request data is empty
         if not request.data:
-            print("Request data is empty!")
             return Response(
                 {"error": "No data provided"},
                 status=status.HTTP_400_BAD_REQUEST,
@@ -1057,17 +1832,21 @@ def create_rubric_item(request, assignment_id, question_id):
             "is_positive": request.data.get("is_positive", True),
         }
 
-        print(f"Rubric item data: {rubric_item_data}")
-
         serializer = RubricItemSerializer(data=rubric_item_data)
         if serializer.is_valid():
             rubric_item = serializer.save()
-            print(f"Created rubric item: {rubric_item}")
+            logger.info(
+                "Created rubric item %s on question %s", rubric_item.id, question_id
+            )
             return Response(
                 RubricItemSerializer(rubric_item).data, status=status.HTTP_201_CREATED
             )
         else:
-            print(f"Serializer errors: {serializer.errors}")
+            logger.debug(
+                "Invalid rubric item for question %s: %s",
+                question_id,
+                serializer.errors,
+            )
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     except Exception as e:
@@ -1077,6 +1856,16 @@ def create_rubric_item(request, assignment_id, question_id):
         )
 
 
+def rescore_grades_with_item(rubric_item):
+    """Recompute the grades that selected ``rubric_item`` and their submission totals"""
+    rescored = SubmissionGrade.recalculate_totals(
+        rubric_item.question,
+        SubmissionGrade.objects.filter(selected_items=rubric_item),
+    )
+    SubmissionScore.refresh(rescored)
+    return rescored
+
+
 @api_view(["PUT"])
 @permission_classes([IsAuthenticated])
 def update_rubric_item(request, assignment_id, rubric_item_id):
@@ -1093,10 +1882,17 @@ def update_rubric_item(request, assignment_id, rubric_item_id):
 
         serializer = RubricItemSerializer(rubric_item, data=request.data, partial=True)
         if serializer.is_valid():
-            rubric_item = serializer.save()
-            return Response(
-                RubricItemSerializer(rubric_item).data, status=status.HTTP_200_OK
-            )
+            old_delta = rubric_item.delta_points
+            with transaction.atomic():
+                rubric_item = serializer.save()
+                rescored = []
+                if rubric_item.delta_points != old_delta:
+                    # Only grades that selected this item can have moved
+                    rescored = rescore_grades_with_item(rubric_item)
+
+            data = RubricItemSerializer(rubric_item).data
+            data["rescored_grades"] = len(rescored)
+            return Response(data, status=status.HTTP_200_OK)
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -1121,7 +1917,20 @@ def delete_rubric_item(request, assignment_id, rubric_item_id):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        rubric_item.delete()
+        with transaction.atomic():
+            question = rubric_item.question
+            affected = list(
+                SubmissionGrade.objects.filter(selected_items=rubric_item).values_list(
+                    "id", flat=True
+                )
+            )
+            rubric_item.delete()
+            if affected:
+                SubmissionScore.refresh(
+                    SubmissionGrade.recalculate_totals(
+                        question, SubmissionGrade.objects.filter(id__in=affected)
+                    )
+                )
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     except Exception as e:
@@ -1131,8 +1940,6 @@ def delete_rubric_item(request, assignment_id, rubric_item_id):
         )
 
 
-@api_view(["PUT"])
-@permission_classes([IsAuthenticated])
 def update_rubric_items(request, question_id):
     """Replace the full set of rubric items for a question"""
     try:
@@ -1154,39 +1961,45 @@ def update_rubric_items(request, question_id):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Delete existing rubric items
-        RubricItem.objects.filter(question=question).delete()
-
-        # Create new rubric items
-        created_items = []
-        for i, item_data in enumerate(rubric_items_data):
-            # Validate required fields
-            if not item_data.get("label"):
-                return Response(
-                    {"error": f"Rubric item {i+1} must have a label"},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
+        if not all(isinstance(item_data, dict) for item_data in rubric_items_data):
+            return Response(
+                {"error": "Each rubric item must be an object"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-            # Validate points_delta
-            points_delta = item_data.get("points_delta", 0)
-            if not isinstance(points_delta, (int, float)):
-                return Response(
-                    {"error": f"Rubric item {i+1} points_delta must be a number"},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
+        # Validate every item before the existing ones are touched
+        serializer = RubricItemSerializer(
+            data=[
+                {"order_index": i, **item_data, "question": question.id}
+                for i, item_data in enumerate(rubric_items_data)
+            ],
+            many=True,
+        )
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-            rubric_item = RubricItem.objects.create(
-                question=question,
-                label=item_data["label"],
-                description=item_data.get("description", ""),
-                points_delta=points_delta,
-                order_index=item_data.get("order_index", i),
-                is_active=item_data.get("is_active", True),
+        with transaction.atomic():
+            # Deleting the items drops their selections, so the grades that
+            # picked any of them have to be rescored
+            affected = list(
+                SubmissionGrade.objects.filter(selected_items__question=question)
+                .values_list("id", flat=True)
+                .distinct()
             )
-            created_items.append(rubric_item)
+            RubricItem.objects.filter(question=question).delete()
+            serializer.save()
+            rescored = []
+            if affected:
+                rescored = SubmissionGrade.recalculate_totals(
+                    question, SubmissionGrade.objects.filter(id__in=affected)
+                )
+                SubmissionScore.refresh(rescored)
 
-        # Serialize and return
-        serializer = RubricItemSerializer(created_items, many=True)
+        logger.info(
+            "Replaced rubric items on question %s, rescored %s grades",
+            question_id,
+            len(rescored),
+        )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     except Exception as e:
@@ -1205,11 +2018,14 @@ def get_submission_grade(request, assignment_id, submission_id, question_id):
         submission = get_object_or_404(Submission, id=submission_id)
         question = get_object_or_404(Question, id=question_id)
 
-        # Get or create the submission grade
-        submission_grade, created = SubmissionGrade.objects.get_or_create(
+        # An ungraded question is shown at full points without saving a
+        # grade, so opening a submission does not count it as graded
+        submission_grade = SubmissionGrade.objects.filter(
+            submission=submission, question=question
+        ).first() or SubmissionGrade(
             submission=submission,
             question=question,
-            defaults={"total_points": question.max_points},
+            total_points=question.max_points,
         )
 
         serializer = SubmissionGradeSerializer(submission_grade)
@@ -1230,13 +2046,6 @@ def update_submission_grade(request, assignment_id, submission_id, question_id):
         submission = get_object_or_404(Submission, id=submission_id)
         question = get_object_or_404(Question, id=question_id)
 
-        # Get or create the submission grade
-        submission_grade, created = SubmissionGrade.objects.get_or_create(
-            submission=submission,
-            question=question,
-            defaults={"total_points": question.max_points},
-        )
-
         # Get selected item IDs from request
         selected_item_ids = request.data.get("selected_item_ids", [])
 
@@ -1247,8 +2056,8 @@ def update_submission_grade(request, assignment_id, submission_id, question_id):
             )
 
         # Validate that all selected items belong to the question and are active
-        valid_items = question.rubric_items.filter(
-            id__in=selected_item_ids, is_active=True
+        valid_items = list(
+            question.rubric_items.filter(id__in=selected_item_ids, is_active=True)
         )
 
         if len(valid_items) != len(selected_item_ids):
@@ -1257,11 +2066,20 @@ def update_submission_grade(request, assignment_id, submission_id, question_id):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Update the selected items
-        submission_grade.selected_items.set(valid_items)
+        with transaction.atomic():
+            # Get or create the submission grade
+            submission_grade, created = SubmissionGrade.objects.get_or_create(
+                submission=submission,
+                question=question,
+                defaults={"total_points": question.max_points},
+            )
+
+            # Update the selected items
+            submission_grade.selected_items.set(valid_items)
 
-        # Save to trigger total_points recalculation
-        submission_grade.save()
+            # Save to trigger total_points recalculation
+            submission_grade.save()
+            SubmissionScore.refresh([submission.id])
 
         # Return updated grade
         serializer = SubmissionGradeSerializer(submission_grade)
@@ -1274,74 +2092,148 @@ def update_submission_grade(request, assignment_id, submission_id, question_id):
         )
 
 
-@api_view(["GET"])
+@api_view(["POST"])
 @permission_classes([IsAuthenticated])
-def get_grade_statistics(request, assignment_id):
-    """Get grade statistics for an assignment"""
+def apply_rubric_item(request, assignment_id, rubric_item_id):
+    """
+    Apply (or with "action": "remove", unapply) one rubric item to many submissions.
+
+    Missing grades are created, the selected-items links are bulk inserted or
+    deleted, and totals are recomputed in one UPDATE, all in one transaction.
+    """
+    if not request.user.is_instructor:
+        return Response(
+            {"error": "Only instructors can grade submissions"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
     try:
-        assignment = get_object_or_404(Assignment, id=assignment_id)
+        rubric_item = get_object_or_404(
+            RubricItem.objects.select_related("question"),
+            id=rubric_item_id,
+            question__assignment_id=assignment_id,
+        )
+        question = rubric_item.question
 
-        # Only allow instructors to view grade statistics
-        if not request.user.is_instructor:
+        serializer = ApplyRubricItemSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        action = serializer.validated_data["action"]
+        submission_ids = serializer.validated_data["submission_ids"]
+        if action == "add" and not rubric_item.is_active:
             return Response(
-                {"error": "Only instructors can view grade statistics"},
-                status=status.HTTP_403_FORBIDDEN,
+                {"error": "Rubric item is inactive"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        valid_ids = set(
+            Submission.objects.filter(
+                assignment_id=assignment_id, id__in=submission_ids
+            ).values_list("id", flat=True)
+        )
+        if len(valid_ids) != len(set(submission_ids)):
+            return Response(
+                {"error": "Some submissions do not belong to this assignment"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Get all submissions for this assignment
-        submissions = Submission.objects.filter(assignment=assignment)
+        Through = SubmissionGrade.selected_items.through
+        with transaction.atomic():
+            grade_ids = dict(
+                SubmissionGrade.objects.filter(
+                    question=question, submission_id__in=valid_ids
+                ).values_list("submission_id", "id")
+            )
+            created = 0
+            missing = set()
+            if action == "add":
+                missing = valid_ids - grade_ids.keys()
+                if missing:
+                    SubmissionGrade.objects.bulk_create(
+                        [
+                            SubmissionGrade(
+                                submission_id=submission_id,
+                                question=question,
+                                total_points=question.max_points,
+                            )
+                            for submission_id in missing
+                        ],
+                        ignore_conflicts=True,
+                    )
+                    created = len(missing)
+                    # Read ids back: ignore_conflicts and MySQL return none
+                    grade_ids = dict(
+                        SubmissionGrade.objects.filter(
+                            question=question, submission_id__in=valid_ids
+                        ).values_list("submission_id", "id")
+                    )
 
-        # Get all grades for these submissions
-        grades = SubmissionGrade.objects.filter(
-            submission__in=submissions
-        ).select_related("submission")
+                linked = set(
+                    Through.objects.filter(
+                        rubricitem=rubric_item,
+                        submissiongrade_id__in=grade_ids.values(),
+                    ).values_list("submissiongrade_id", flat=True)
+                )
+                changed = [
+                    grade_id
+                    for grade_id in grade_ids.values()
+                    if grade_id not in linked
+                ]
+                Through.objects.bulk_create(
+                    [
+                        Through(submissiongrade_id=grade_id, rubricitem=rubric_item)
+                        for grade_id in changed
+                    ],
+                    ignore_conflicts=True,
+                )
+            else:
+                links = Through.objects.filter(
+                    rubricitem=rubric_item, submissiongrade_id__in=grade_ids.values()
+                )
+                changed = list(links.values_list("submissiongrade_id", flat=True))
+                links.delete()
 
-        if not grades.exists():
-            return Response(
-                {
-                    "minimum": 0,
-                    "median": 0,
-                    "maximum": 0,
-                    "mean": 0,
-                    "std_dev": 0,
-                    "total_students": submissions.count(),
-                    "graded_students": 0,
-                }
+            rescored = SubmissionGrade.recalculate_totals(
+                question, SubmissionGrade.objects.filter(id__in=changed)
             )
+            # New grades change the graded-question counts even at full marks
+            SubmissionScore.refresh(set(rescored) | missing)
 
-        # Calculate statistics
-        total_scores = [
-            grade.total_points for grade in grades if grade.total_points is not None
-        ]
+        return Response(
+            {
+                "message": (
+                    f"Rubric item applied to {len(changed)} submissions"
+                    if action == "add"
+                    else f"Rubric item removed from {len(changed)} submissions"
+                ),
+                "rubric_item_id": rubric_item.id,
+                "action": action,
+                "changed": len(changed),
+                "grades_created": created,
+            }
+        )
+
+    except Exception as e:
+        return Response(
+            {"error": f"Error applying rubric item: {str(e)}"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def get_grade_statistics(request, assignment_id):
+    """Grade statistics over per-student totals, with a per-question breakdown"""
+    try:
+        assignment = get_object_or_404(Assignment, id=assignment_id)
 
-        if not total_scores:
+        # Only allow instructors to view grade statistics
+        if not request.user.is_instructor:
             return Response(
-                {
-                    "minimum": 0,
-                    "median": 0,
-                    "maximum": 0,
-                    "mean": 0,
-                    "std_dev": 0,
-                    "total_students": submissions.count(),
-                    "graded_students": 0,
-                }
+                {"error": "Only instructors can view grade statistics"},
+                status=status.HTTP_403_FORBIDDEN,
             )
 
-        import statistics
-
-        stats = {
-            "minimum": min(total_scores),
-            "maximum": max(total_scores),
-            "mean": round(statistics.mean(total_scores), 2),
-            "median": round(statistics.median(total_scores), 2),
-            "std_dev": round(
-                statistics.stdev(total_scores) if len(total_scores) > 1 else 0, 2
-            ),
-            "total_students": submissions.count(),
-            "graded_students": len(total_scores),
-        }
-
-        return Response(stats)
+        return Response(assignment_statistics(assignment))
 
     except Exception as e:
         return Response(
@@ -1364,48 +2256,76 @@ def get_student_grades(request, assignment_id):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        # Get all submissions for this assignment
+        fields = requested_fields(request)
+
+        # Totals come from the materialized score table; the per-question
+        # breakdown is loaded for the whole assignment (or page) in one query
         submissions = Submission.objects.filter(assignment=assignment).select_related(
-            "student"
+            "student", "score"
         )
+        paginator = KeysetCursorPagination()
+        page = paginator.paginate_queryset(submissions, request)
+        if page is not None:
+            submissions = page
+
+        grades_by_submission = defaultdict(list)
+        if fields is None or "grades" in fields:
+            grades = SubmissionGrade.objects.filter(
+                submission__assignment=assignment
+            ).select_related("question")
+            if page is not None:
+                grades = grades.filter(submission__in=[s.id for s in page])
+            for grade in grades:
+                grades_by_submission[grade.submission_id].append(grade)
+
+        max_score = assignment.total_points or 0
 
         student_grades = []
         for submission in submissions:
-            # Get the total grade for this submission
-            grades = SubmissionGrade.objects.filter(submission=submission)
-            total_score = sum(
-                grade.total_points for grade in grades if grade.total_points is not None
-            )
-            max_score = assignment.total_points or 0
+            grades = grades_by_submission.get(submission.id, [])
+            score = getattr(submission, "score", None)
+            total_score = score.total_score if score else 0
 
             # Check if submission is graded (has any grades)
-            is_graded = grades.exists()
+            is_graded = bool(score and score.graded_questions)
 
+            student = submission.student
             student_grades.append(
-                {
-                    "id": submission.id,
-                    "student_name": f"{submission.student.first_name or ''} {submission.student.last_name or ''}".strip()
-                    or submission.student.email,
-                    "email": submission.student.email,
-                    "total_score": total_score,
-                    "max_score": max_score,
-                    "is_graded": is_graded,
-                    "is_viewed": False,  # This would need to be tracked separately
-                    "graded_at": (
-                        submission.created_at.isoformat() if is_graded else None
-                    ),
-                    "grades": [
-                        {
-                            "question_id": grade.question.id,
-                            "question_title": grade.question.title,
-                            "points": grade.total_points or 0,
-                            "max_points": grade.question.max_points,
-                        }
-                        for grade in grades
-                    ],
-                }
+                select_fields(
+                    {
+                        "id": submission.id,
+                        "student_name": (
+                            f"{student.first_name or ''} {student.last_name or ''}".strip()
+                            or student.email
+                            if student
+                            else "Unassigned"
+                        ),
+                        "email": student.email if student else None,
+                        "total_score": total_score,
+                        "max_score": max_score,
+                        "is_graded": is_graded,
+                        "is_viewed": False,  # This would need to be tracked separately
+                        "graded_at": (
+                            score.last_graded_at.isoformat()
+                            if is_graded and score.last_graded_at
+                            else None
+                        ),
+                        "grades": [
+                            {
+                                "question_id": grade.question.id,
+                                "question_title": grade.question.title,
+                                "points": grade.total_points or 0,
+                                "max_points": grade.question.max_points,
+                            }
+                            for grade in grades
+                        ],
+                    },
+                    fields,
+                )
             )
 
+        if page is not None:
+            return Response({"grades": student_grades, **paginator.get_links()})
         return Response({"grades": student_grades})
 
     except Exception as e:
@@ -49,6 +49,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "common.log.RequestIdMiddleware",
+    "common.metrics.RequestMetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -167,6 +169,56 @@ STATIC_URL = "static/"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Protected media can be handed off to the front proxy instead of streamed by
+# Django: None, "nginx" (X-Accel-Redirect) or "apache" (X-Sendfile).
+# For nginx, MEDIA_SENDFILE_PREFIX must be an internal location aliasing MEDIA_ROOT.
+MEDIA_SENDFILE_BACKEND = None
+MEDIA_SENDFILE_PREFIX = "/protected-media/"
+
+# Chunked, resumable submission uploads
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # suggested chunk size, bytes
+UPLOAD_MAX_SIZE = 1024 * 1024 * 1024  # largest accepted file, bytes
+# Sessions without a chunk for this long are abandoned; collect_orphaned_media
+# --delete removes them with their partial files
+UPLOAD_SESSION_EXPIRY = 24 * 60 * 60  # seconds
+
+# Background rendering of PDF pages into thumbnails and page images
+PDF_RENDER_WORKERS = 2
+PDF_RENDER_PAGE_WIDTH = 1000  # pixels
+PDF_RENDER_THUMBNAIL_WIDTH = 160  # pixels
+
+# Per-request SQL/latency metrics (common.metrics.RequestMetricsMiddleware)
+REQUEST_METRICS_SAMPLE_RATE = 1.0  # fraction of requests instrumented
+REQUEST_METRICS_SLOW_MS = 1000  # always logged as a warning above this
+REQUEST_METRICS_SERVER_TIMING = DEBUG  # expose timings in a response header
+
+# Log records carry the request id set by common.log.RequestIdMiddleware.
+# Debug output of the assignments views is off at INFO; set it to DEBUG to trace
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "filters": {
+        "request_id": {"()": "common.log.RequestIdFilter"},
+    },
+    "formatters": {
+        "structured": {
+            "format": "%(asctime)s %(levelname)s %(name)s "
+            "request_id=%(request_id)s %(message)s",
+        },
+    },
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+            "filters": ["request_id"],
+            "formatter": "structured",
+        },
+    },
+    "loggers": {
+        "bargeh": {"handlers": ["console"], "level": "INFO"},
+        "assignments": {"handlers": ["console"], "level": "INFO"},
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
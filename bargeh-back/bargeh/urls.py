@@ -17,8 +17,6 @@ Including another URLconf
 
 from django.contrib import admin
 from django.urls import path, include
-from django.conf import settings
-from django.conf.urls.static import static
 from .admin import admin_site
 
 urlpatterns = [
@@ -28,6 +26,5 @@ urlpatterns = [
     path("api/assignments/", include("assignments.urls")),
 ]
 
-# Serve media files during development
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Media is not served directly: PDFs and page images go through the
+# permission-checked endpoints in assignments.urls
@@ -0,0 +1,32 @@
+def requested_fields(request):
+    """Field names from ``?fields=a,b,c``, or None when all fields are wanted.
+
+    ``id`` is always included so clients can keep paging and linking.
+    """
+    raw = request.query_params.get("fields") if request is not None else None
+    if not raw:
+        return None
+    fields = {name.strip() for name in raw.split(",") if name.strip()}
+    return fields | {"id"} if fields else None
+
+
+def select_fields(data, fields):
+    """Keep only the requested keys of a dict built by hand in a view"""
+    if fields is None:
+        return data
+    return {key: value for key, value in data.items() if key in fields}
+
+
+class SparseFieldsetMixin:
+    """Serializer mixin that drops fields not listed in ``context["fields"]``.
+
+    Dropped SerializerMethodFields are never evaluated, so leaving out an
+    expensive field also skips its queries.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get("fields")
+        if fields:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
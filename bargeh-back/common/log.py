@@ -0,0 +1,48 @@
+import contextvars
+import logging
+import re
+import uuid
+
+REQUEST_ID_HEADER = "X-Request-ID"
+# Ids forwarded by a proxy are reused only if they look like an id
+REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+_request_id = contextvars.ContextVar("request_id", default="-")
+
+
+def current_request_id():
+    return _request_id.get()
+
+
+class RequestIdFilter(logging.Filter):
+    """Add ``request_id`` to every record so formatters can include it"""
+
+    def filter(self, record):
+        record.request_id = _request_id.get()
+        return True
+
+
+class RequestIdMiddleware:
+    """
+    Tag each request with an id for its log records.
+
+    The id from an incoming X-Request-ID header is kept, otherwise a new one is
+    generated; either way it is echoed back in the response header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_id = request.META.get("HTTP_X_REQUEST_ID", "")
+        if not REQUEST_ID_RE.match(request_id):
+            request_id = uuid.uuid4().hex
+        request.request_id = request_id
+
+        token = _request_id.set(request_id)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_id.reset(token)
+        response[REQUEST_ID_HEADER] = request_id
+        return response
@@ -0,0 +1,157 @@
+import contextvars
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger("bargeh.requests")
+
+_current = contextvars.ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """SQL, serializer and render timings collected for one request"""
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.serialize_time = 0.0
+        self.render_time = 0.0
+        self.serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.sql_count += 1
+
+
+def current_metrics():
+    """Metrics of the request being handled, or None when it is not sampled"""
+    return _current.get()
+
+
+class TimedSerializerMixin:
+    """Serializer mixin that adds its representation time to the request metrics.
+
+    Only the outermost timed serializer is measured, so nested serializers are
+    not counted twice. Queries run while serializing also show up under SQL.
+    """
+
+    def to_representation(self, instance):
+        metrics = _current.get()
+        if metrics is None or metrics.serializer_depth:
+            return super().to_representation(instance)
+        metrics.serializer_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            metrics.serialize_time += time.perf_counter() - start
+            metrics.serializer_depth -= 1
+
+
+class RequestMetricsMiddleware:
+    """
+    Record SQL count/time, serializer, render and total time per request.
+
+    A REQUEST_METRICS_SAMPLE_RATE fraction of requests is instrumented and
+    logged to ``bargeh.requests``; any request slower than
+    REQUEST_METRICS_SLOW_MS is logged as a warning whether or not it was
+    sampled. Sampled responses get a Server-Timing header when
+    REQUEST_METRICS_SERVER_TIMING is on. For streaming responses the times
+    cover producing the response, not sending its body.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "REQUEST_METRICS_SAMPLE_RATE", 1.0)
+        self.slow_ms = getattr(settings, "REQUEST_METRICS_SLOW_MS", 1000)
+        self.server_timing = getattr(
+            settings, "REQUEST_METRICS_SERVER_TIMING", settings.DEBUG
+        )
+        self.timing_origins = set(getattr(settings, "CORS_ALLOWED_ORIGINS", ()))
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            response = self.get_response(request)
+            total_ms = (time.perf_counter() - start) * 1000
+            if total_ms >= self.slow_ms:
+                self.log(request, response, total_ms, None)
+            return response
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        if self.server_timing:
+            response["Server-Timing"] = server_timing_header(metrics, total_ms)
+            origin = request.META.get("HTTP_ORIGIN")
+            if origin in self.timing_origins:
+                response["Timing-Allow-Origin"] = origin
+        self.log(request, response, total_ms, metrics)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after this hook returns
+        metrics = _current.get()
+        if metrics is not None:
+            start = time.perf_counter()
+
+            def rendered(response):
+                metrics.render_time += time.perf_counter() - start
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def log(self, request, response, total_ms, metrics):
+        slow = total_ms >= self.slow_ms
+        level = logging.WARNING if slow else logging.INFO
+        if not logger.isEnabledFor(level):
+            return
+
+        match = request.resolver_match
+        fields = {
+            "method": request.method,
+            "route": match.route if match else request.path,
+            "status": response.status_code,
+            "total_ms": round(total_ms, 1),
+        }
+        if metrics is not None:
+            fields.update(
+                sql_count=metrics.sql_count,
+                sql_ms=round(metrics.sql_time * 1000, 1),
+                serialize_ms=round(metrics.serialize_time * 1000, 1),
+                render_ms=round(metrics.render_time * 1000, 1),
+            )
+        fields["slow"] = slow
+        logger.log(
+            level,
+            " ".join(f"{key}={value}" for key, value in fields.items()),
+            extra={"metrics": fields},
+        )
+
+
+def server_timing_header(metrics, total_ms):
+    return ", ".join(
+        [
+            f'db;dur={metrics.sql_time * 1000:.1f};desc="{metrics.sql_count} queries"',
+            f"serialize;dur={metrics.serialize_time * 1000:.1f}",
+            f"render;dur={metrics.render_time * 1000:.1f}",
+            f"total;dur={total_ms:.1f}",
+        ]
+    )
@@ -0,0 +1,25 @@
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetCursorPagination(CursorPagination):
+    """Opt-in keyset pagination on the primary key.
+
+    Pages are fetched with an indexed ``id >`` / ``id <`` lookup instead of an
+    OFFSET, so deep pages cost the same as the first one. Endpoints that used to
+    return everything keep doing so unless ``page_size`` or ``cursor`` is sent.
+    """
+
+    ordering = "id"
+    page_size = None
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    default_page_size = 50
+
+    def get_page_size(self, request):
+        page_size = super().get_page_size(request)
+        if page_size is None and self.cursor_query_param in request.query_params:
+            return self.default_page_size
+        return page_size
+
+    def get_links(self):
+        return {"next": self.get_next_link(), "previous": self.get_previous_link()}
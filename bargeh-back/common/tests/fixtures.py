@@ -0,0 +1,173 @@
+"""Factories and a TestCase with isolated media, shared by the apps' tests"""
+
+import io
+import itertools
+import logging
+import os
+import shutil
+import tempfile
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from assignments.models import (
+    Assignment,
+    Question,
+    RubricItem,
+    Submission,
+    SubmissionGrade,
+    SubmissionPageMap,
+    SubmissionScore,
+    UploadSession,
+)
+from courses.models import Course, CourseMembership
+
+User = get_user_model()
+
+PASSWORD = "test-pass-1234"
+_sequence = itertools.count(1)
+
+
+def blank_pdf(num_pages, width=595, height=842):
+    """Bytes of a PDF with ``num_pages`` empty A4 pages"""
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument.new()
+    try:
+        for _ in range(num_pages):
+            pdf.new_page(width, height)
+        buffer = io.BytesIO()
+        pdf.save(buffer)
+    finally:
+        pdf.close()
+    return buffer.getvalue()
+
+
+def pdf_upload(name="upload.pdf", num_pages=2):
+    return SimpleUploadedFile(
+        name, blank_pdf(num_pages), content_type="application/pdf"
+    )
+
+
+def create_user(**fields):
+    number = next(_sequence)
+    fields.setdefault("email", f"user{number}@example.com")
+    fields.setdefault("first_name", "User")
+    fields.setdefault("last_name", str(number))
+    return User.objects.create_user(password=PASSWORD, **fields)
+
+
+def create_course(owner, **fields):
+    fields.setdefault("title", "Course")
+    return Course.objects.create(
+        owner=owner, invite_code=uuid.uuid4().hex[:8].upper(), **fields
+    )
+
+
+def enroll(course, user, role=CourseMembership.Role.STUDENT):
+    return CourseMembership.objects.create(user=user, course=course, role=role)
+
+
+def create_assignment(course, **fields):
+    fields.setdefault("title", "Homework 1")
+    fields.setdefault("created_by", course.owner)
+    return Assignment.objects.create(course=course, **fields)
+
+
+def create_question(assignment, number=1, max_points=10, default_page_numbers=(1,)):
+    """A question with a "Correct" (0) and a "Wrong" (-4) rubric item"""
+    question = Question.objects.create(
+        assignment=assignment,
+        title=f"Question {number}",
+        number=number,
+        order_index=number,
+        max_points=max_points,
+        default_page_numbers=list(default_page_numbers),
+    )
+    RubricItem.objects.bulk_create(
+        [
+            RubricItem(question=question, label="Correct", delta_points=0),
+            RubricItem(
+                question=question, label="Wrong", delta_points=-4, order_index=1
+            ),
+        ]
+    )
+    return question
+
+
+def create_submission(assignment, student=None, num_pages=2, content=None, **fields):
+    """A submission of a blank PDF, with every question mapped to page 1"""
+    submission = Submission.objects.create(
+        assignment=assignment,
+        student=student,
+        file=ContentFile(content or blank_pdf(num_pages), name="submission.pdf"),
+        num_pages=num_pages,
+        page_sizes=[[595.0, 842.0]] * num_pages,
+        **fields,
+    )
+    SubmissionPageMap.objects.create(
+        submission=submission,
+        page_map={
+            str(question_id): [1]
+            for question_id in assignment.questions.values_list("id", flat=True)
+        },
+    )
+    return submission
+
+
+def grade(submission, question, items=()):
+    """Grade ``question`` of ``submission`` with ``items`` and refresh its score"""
+    submission_grade = SubmissionGrade.objects.create(
+        submission=submission, question=question, total_points=question.max_points
+    )
+    submission_grade.selected_items.set(items)
+    submission_grade.save()
+    SubmissionScore.refresh([submission.id])
+    return submission_grade
+
+
+def create_upload_session(assignment, uploaded_by, student=None, received=False):
+    """An upload session, optionally with its whole file already received"""
+    content = blank_pdf(2)
+    session = UploadSession.objects.create(
+        assignment=assignment,
+        uploaded_by=uploaded_by,
+        student=student,
+        filename="chunked.pdf",
+        total_size=len(content),
+        received_size=len(content) if received else 0,
+    )
+    if received:
+        os.makedirs(os.path.dirname(session.partial_path), exist_ok=True)
+        with open(session.partial_path, "wb") as partial:
+            partial.write(content)
+    session.content = content
+    return session
+
+
+class MediaTestCase(TestCase):
+    """TestCase writing media to a temporary root, with fast password hashing"""
+
+    @classmethod
+    def setUpClass(cls):
+        media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, media_root, True)
+        cls.enterClassContext(
+            override_settings(
+                MEDIA_ROOT=media_root,
+                PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+            )
+        )
+        # Request log lines would bury the test output
+        logging.disable(logging.INFO)
+        cls.addClassCleanup(logging.disable, logging.NOTSET)
+        super().setUpClass()
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
@@ -0,0 +1,236 @@
+from importlib import import_module
+
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, reverse
+from rest_framework.test import APIClient
+
+from assignments.models import Assignment, RubricItem
+from courses.models import CourseMembership
+
+from .fixtures import (
+    MediaTestCase,
+    blank_pdf,
+    create_assignment,
+    create_course,
+    create_question,
+    create_submission,
+    create_upload_session,
+    create_user,
+    enroll,
+    grade,
+)
+
+
+def url_names(urls_module):
+    """Names of every route in a urls module, including router and included ones"""
+    names = set()
+    patterns = list(import_module(urls_module).urlpatterns)
+    while patterns:
+        pattern = patterns.pop()
+        if isinstance(pattern, URLResolver):
+            patterns.extend(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+class Dataset:
+    """
+    A course with an instructor, students, an assignment with questions,
+    rubric items, submissions, page maps and grades: one row of everything
+    the endpoints touch.
+
+    ``grow()`` adds rows of every kind the endpoints list, while the objects
+    the endpoints are pointed at (``course``, ``assignment``, ``question``,
+    ``submission``...) stay the same.
+    """
+
+    def __init__(self, students=2):
+        # Submissions share one blob, so deleting one keeps the file on disk
+        self.submission_pdf = blank_pdf(2)
+        self.instructor = create_user(is_instructor=True)
+        self.student = create_user()
+        # Enrolled but has not submitted yet
+        self.late_student = create_user()
+        # Not enrolled anywhere, for enrollment endpoints
+        self.outsider = create_user()
+
+        self.course = create_course(self.instructor, code="C1")
+        self.other_course = create_course(
+            self.instructor, title="Other course", code="C2"
+        )
+        enroll(self.course, self.instructor, CourseMembership.Role.INSTRUCTOR)
+        self.student_membership = enroll(self.course, self.student)
+        enroll(self.course, self.late_student)
+
+        self.assignment = create_assignment(
+            self.course,
+            template_pdf=ContentFile(blank_pdf(3), name="template.pdf"),
+            total_points=20,
+            is_published=True,
+        )
+        self.questions = [
+            create_question(self.assignment, number) for number in (1, 2)
+        ]
+        self.question = self.questions[0]
+        self.rubric_item = self.question.rubric_items.order_by("order_index").first()
+        # A spare item no grade uses, for the delete endpoint
+        self.unused_rubric_item = RubricItem.objects.create(
+            question=self.question, label="Unused", delta_points=-1, order_index=9
+        )
+        self.submission = self.add_submission(self.student)
+        self.add_students(students)
+
+    def add_submission(self, student):
+        submission = create_submission(
+            self.assignment,
+            student,
+            content=self.submission_pdf,
+            uploaded_by=self.instructor,
+        )
+        for question in self.questions:
+            grade(submission, question, [question.rubric_items.get(label="Wrong")])
+        return submission
+
+    def add_students(self, count):
+        for _ in range(count):
+            student = create_user()
+            enroll(self.course, student)
+            self.add_submission(student)
+
+    def grow(self, students=6, courses=3):
+        """Add students, submissions, grades, rubric items, courses and assignments"""
+        self.add_students(students)
+        for question in self.questions:
+            RubricItem.objects.create(
+                question=question, label="Extra", delta_points=-1, order_index=5
+            )
+        for number in range(courses):
+            course = create_course(self.instructor, title=f"Extra course {number}")
+            enroll(course, self.instructor, CourseMembership.Role.INSTRUCTOR)
+            enroll(course, self.student)
+            Assignment.objects.create(
+                course=self.course,
+                title=f"Extra homework {number}",
+                created_by=self.instructor,
+                total_points=10,
+            )
+
+    def upload_session(self, received=False):
+        session = create_upload_session(
+            self.assignment, self.instructor, self.student, received=received
+        )
+        self.last_upload_session = session
+        return session
+
+
+class Endpoint:
+    """
+    One request to measure.
+
+    ``args``, ``data`` and ``query`` are callables taking the Dataset; they run
+    inside the rolled-back transaction before the queries are captured, so
+    they may create the rows the request needs. ``user`` names the Dataset
+    attribute to authenticate as, or None for an anonymous request.
+    """
+
+    def __init__(
+        self,
+        url_name,
+        method="get",
+        args=None,
+        data=None,
+        query=None,
+        user="instructor",
+        format="json",
+        content_type=None,
+        status=200,
+    ):
+        self.url_name = url_name
+        self.method = method
+        self.args = args
+        self.data = data
+        self.query = query
+        self.user = user
+        self.format = format
+        self.content_type = content_type
+        self.status = status
+
+    def __str__(self):
+        return f"{self.method.upper()} {self.url_name}"
+
+    def request(self, client, dataset):
+        url = reverse(self.url_name, args=self.args(dataset) if self.args else None)
+        if self.query:
+            url += "?" + self.query(dataset)
+        data = self.data(dataset) if self.data else None
+        if self.content_type:
+            kwargs = {"content_type": self.content_type}
+        else:
+            kwargs = {"format": self.format}
+
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(client, self.method)(url, data, **kwargs)
+            # Streamed bodies run queries while they are consumed
+            if getattr(response, "streaming", False):
+                b"".join(response.streaming_content)
+        response.close()
+        return response, len(queries)
+
+
+class QueryCountTestCase(MediaTestCase):
+    """
+    Every endpoint must run the same number of queries on a small dataset and
+    on the same dataset after ``grow()``, so per-row (N+1) queries fail here.
+
+    Subclasses list their app's routes in ``endpoints`` and name the urls
+    module they cover; a route without an Endpoint fails the coverage test.
+    """
+
+    urls_module = None
+    endpoints = ()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = Dataset()
+
+    def measure(self, endpoint):
+        client = APIClient()
+        if endpoint.user:
+            client.force_authenticate(getattr(self.dataset, endpoint.user))
+
+        # The first request warms per-process caches (content types, rendered
+        # pages) so only the second one is counted; both are rolled back
+        for _ in range(2):
+            with transaction.atomic():
+                response, count = endpoint.request(client, self.dataset)
+                transaction.set_rollback(True)
+            self.assertEqual(
+                response.status_code,
+                endpoint.status,
+                f"{endpoint} returned {response.status_code}: "
+                f"{getattr(response, 'data', b'')!s:.300}",
+            )
+        return count
+
+    def test_query_count_does_not_grow(self):
+        small = [self.measure(endpoint) for endpoint in self.endpoints]
+        self.dataset.grow()
+        large = [self.measure(endpoint) for endpoint in self.endpoints]
+
+        for endpoint, before, after in zip(self.endpoints, small, large):
+            with self.subTest(str(endpoint)):
+                self.assertEqual(
+                    after,
+                    before,
+                    f"{endpoint} ran {before} queries on the small dataset "
+                    f"and {after} on the large one",
+                )
+
+    def test_every_url_is_measured(self):
+        if self.urls_module is None:
+            self.skipTest("No urls module")
+        measured = {endpoint.url_name for endpoint in self.endpoints}
+        self.assertEqual(url_names(self.urls_module) - measured, set())
@@ -0,0 +1,70 @@
+import logging
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from common.log import (
+    REQUEST_ID_HEADER,
+    RequestIdFilter,
+    RequestIdMiddleware,
+    current_request_id,
+)
+
+
+class RequestIdMiddlewareTests(SimpleTestCase):
+    def handle(self, **headers):
+        seen = {}
+
+        def view(request):
+            seen["request"] = request.request_id
+            seen["context"] = current_request_id()
+            return HttpResponse()
+
+        response = RequestIdMiddleware(view)(RequestFactory().get("/", **headers))
+        return response, seen
+
+    def test_new_id_is_generated_and_echoed(self):
+        response, seen = self.handle()
+        request_id = response[REQUEST_ID_HEADER]
+        self.assertRegex(request_id, r"^[0-9a-f]{32}$")
+        self.assertEqual(seen, {"request": request_id, "context": request_id})
+        self.assertEqual(current_request_id(), "-")
+
+    def test_forwarded_id_is_kept(self):
+        response, seen = self.handle(HTTP_X_REQUEST_ID="edge-42.a_b")
+        self.assertEqual(response[REQUEST_ID_HEADER], "edge-42.a_b")
+        self.assertEqual(seen["context"], "edge-42.a_b")
+
+    def test_unsafe_forwarded_ids_are_replaced(self):
+        for forwarded in ("bad id", "x" * 65, "a\r\nSet-Cookie: x=1", ""):
+            with self.subTest(forwarded):
+                response, _ = self.handle(HTTP_X_REQUEST_ID=forwarded)
+                self.assertNotEqual(response[REQUEST_ID_HEADER], forwarded)
+                self.assertRegex(response[REQUEST_ID_HEADER], r"^[0-9a-f]{32}$")
+
+    def test_id_is_reset_when_the_view_fails(self):
+        def view(request):
+            raise RuntimeError
+
+        with self.assertRaises(RuntimeError):
+            RequestIdMiddleware(view)(RequestFactory().get("/"))
+        self.assertEqual(current_request_id(), "-")
+
+
+class RequestIdFilterTests(SimpleTestCase):
+    def record(self):
+        return logging.LogRecord("bargeh", logging.INFO, __file__, 1, "msg", (), None)
+
+    def test_records_carry_the_current_request_id(self):
+        def view(request):
+            record = self.record()
+            self.assertTrue(RequestIdFilter().filter(record))
+            return HttpResponse(record.request_id)
+
+        response = RequestIdMiddleware(view)(RequestFactory().get("/"))
+        self.assertEqual(response.content.decode(), response[REQUEST_ID_HEADER])
+
+    def test_records_outside_a_request(self):
+        record = self.record()
+        RequestIdFilter().filter(record)
+        self.assertEqual(record.request_id, "-")
@@ -0,0 +1,110 @@
+import re
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from common.metrics import RequestMetrics, TimedSerializerMixin, _current
+
+from .fixtures import create_user
+
+SERVER_TIMING_RE = re.compile(
+    r'^db;dur=[\d.]+;desc="(\d+) queries", serialize;dur=[\d.]+, '
+    r"render;dur=[\d.]+, total;dur=[\d.]+$"
+)
+
+
+@override_settings(
+    REQUEST_METRICS_SAMPLE_RATE=1.0,
+    REQUEST_METRICS_SLOW_MS=60_000,
+    REQUEST_METRICS_SERVER_TIMING=True,
+    CORS_ALLOWED_ORIGINS=["https://app.example"],
+)
+class RequestMetricsMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user()
+
+    def get(self, **headers):
+        """The response and the records logged to bargeh.requests for it"""
+        # The middleware reads its settings when the client builds the handler
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with self.assertLogs("bargeh.requests", "INFO") as logs:
+            response = client.get(reverse("course-list"), **headers)
+        return response, logs.records
+
+    def test_server_timing_counts_the_request_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response, _ = self.get()
+        self.assertTrue(queries)
+        match = SERVER_TIMING_RE.match(response["Server-Timing"])
+        self.assertIsNotNone(match, response["Server-Timing"])
+        self.assertEqual(int(match.group(1)), len(queries))
+
+    def test_timing_is_exposed_to_allowed_origins_only(self):
+        response, _ = self.get(HTTP_ORIGIN="https://app.example")
+        self.assertEqual(response["Timing-Allow-Origin"], "https://app.example")
+        response, _ = self.get(HTTP_ORIGIN="https://other.example")
+        self.assertNotIn("Timing-Allow-Origin", response)
+
+    @override_settings(REQUEST_METRICS_SERVER_TIMING=False)
+    def test_header_can_be_turned_off(self):
+        response, _ = self.get()
+        self.assertNotIn("Server-Timing", response)
+
+    def test_sampled_requests_are_logged(self):
+        _, (record,) = self.get()
+        self.assertEqual(record.levelname, "INFO")
+        self.assertEqual(record.metrics["method"], "GET")
+        self.assertEqual(record.metrics["route"], "api/courses/")
+        self.assertEqual(record.metrics["status"], 200)
+        self.assertFalse(record.metrics["slow"])
+        self.assertIn("sql_count", record.metrics)
+
+    @override_settings(REQUEST_METRICS_SLOW_MS=0)
+    def test_slow_requests_are_warnings(self):
+        _, (record,) = self.get()
+        self.assertEqual(record.levelname, "WARNING")
+        self.assertTrue(record.metrics["slow"])
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=0.0, REQUEST_METRICS_SLOW_MS=0)
+    def test_unsampled_requests_are_only_logged_when_slow(self):
+        response, (record,) = self.get()
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(record.levelname, "WARNING")
+        self.assertNotIn("sql_count", record.metrics)
+
+
+class TimedSerializerMixinTests(SimpleTestCase):
+    class Serializer:
+        def __init__(self, child=None):
+            self.child = child
+
+        def to_representation(self, instance):
+            if self.child:
+                return [self.child.to_representation(instance)]
+            return instance
+
+    class TimedSerializer(TimedSerializerMixin, Serializer):
+        pass
+
+    def test_nested_serializers_are_timed_once(self):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        self.addCleanup(_current.reset, token)
+        serializer = self.TimedSerializer(self.TimedSerializer())
+
+        # Only the outer serializer reads the clock
+        with mock.patch("common.metrics.time.perf_counter", side_effect=[1.0, 3.5]):
+            self.assertEqual(serializer.to_representation("row"), ["row"])
+        self.assertEqual(metrics.serialize_time, 2.5)
+        self.assertEqual(metrics.serializer_depth, 0)
+
+    def test_unsampled_requests_are_not_timed(self):
+        with mock.patch("common.metrics.time.perf_counter") as perf_counter:
+            self.TimedSerializer().to_representation("row")
+        perf_counter.assert_not_called()
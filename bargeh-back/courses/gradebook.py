@@ -0,0 +1,163 @@
+import json
+
+import numpy as np
+
+from assignments.models import Question, SubmissionGrade
+from users.models import display_name_expression
+from .models import CourseMembership
+
+
+class Gradebook:
+    """
+    Students × questions score matrix for a course, backed by a NumPy array.
+
+    Built from four flat queries (assignments, questions, roster, grades).
+    Ungraded cells are NaN; questions are ordered by assignment so each
+    assignment's columns form a contiguous slice.
+    """
+
+    def __init__(self, course):
+        self.assignments = list(
+            course.assignments.order_by("created_at", "id").values_list("id", "title")
+        )
+        assignment_order = {
+            assignment_id: index
+            for index, (assignment_id, _) in enumerate(self.assignments)
+        }
+        self.questions = sorted(
+            Question.objects.filter(assignment__course=course).values_list(
+                "id", "assignment_id", "number", "title", "max_points", "order_index"
+            ),
+            key=lambda q: (assignment_order[q[1]], q[5], q[2]),
+        )
+        self.students = list(
+            CourseMembership.objects.filter(
+                course=course, role=CourseMembership.Role.STUDENT
+            )
+            .annotate(display_name=display_name_expression("user__", default=""))
+            .order_by("display_name", "user__email")
+            .values_list("user_id", "display_name", "user__email")
+        )
+
+        column = {question[0]: index for index, question in enumerate(self.questions)}
+        row = {student[0]: index for index, student in enumerate(self.students)}
+        self.scores = np.full((len(self.students), len(self.questions)), np.nan)
+
+        # Later submissions win when a student has more than one
+        grades = (
+            SubmissionGrade.objects.filter(
+                submission__assignment__course=course,
+                submission__student__isnull=False,
+            )
+            .order_by("submission__created_at", "submission_id")
+            .values_list("submission__student_id", "question_id", "total_points")
+        )
+        for student_id, question_id, points in grades.iterator(chunk_size=5000):
+            if student_id in row:
+                self.scores[row[student_id], column[question_id]] = points
+
+        # Contiguous [start, stop) column range of each assignment
+        self.assignment_columns = []
+        start = 0
+        for assignment_id, _ in self.assignments:
+            stop = start
+            while (
+                stop < len(self.questions) and self.questions[stop][1] == assignment_id
+            ):
+                stop += 1
+            self.assignment_columns.append((start, stop))
+            start = stop
+
+        graded = ~np.isnan(self.scores)
+        filled = np.where(graded, self.scores, 0.0)
+        shape = (len(self.students), len(self.assignments))
+        self.assignment_totals = np.zeros(shape)
+        self.assignment_graded = np.zeros(shape, dtype=bool)
+        for index, (start, stop) in enumerate(self.assignment_columns):
+            self.assignment_totals[:, index] = filled[:, start:stop].sum(axis=1)
+            self.assignment_graded[:, index] = graded[:, start:stop].any(axis=1)
+        self.totals = filled.sum(axis=1)
+
+    def _total(self, index):
+        # Students with nothing graded have no total, like their assignments
+        if not self.assignment_graded[index].any():
+            return None
+        return round(float(self.totals[index]), 2)
+
+    def header(self):
+        header = ["Student", "Email"]
+        for (assignment_id, title), (start, stop) in zip(
+            self.assignments, self.assignment_columns
+        ):
+            header.extend(
+                f"{title} - Q{question[2]}" for question in self.questions[start:stop]
+            )
+            header.append(f"{title} - Total")
+        header.append("Total")
+        return header
+
+    def rows(self):
+        """Flat rows for CSV/XLSX, one student at a time; blank means ungraded"""
+        yield self.header()
+        for index, (_, name, email) in enumerate(self.students):
+            row = [name, email]
+            for assignment_index, (start, stop) in enumerate(self.assignment_columns):
+                row.extend(_cell(value) for value in self.scores[index, start:stop])
+                row.append(
+                    round(float(self.assignment_totals[index, assignment_index]), 2)
+                    if self.assignment_graded[index, assignment_index]
+                    else None
+                )
+            row.append(self._total(index))
+            yield row
+
+    def stream_json(self):
+        """JSON document yielded piece by piece, one student per chunk"""
+        # Column metadata is small; its closing brace is swapped for the
+        # opening of the students array
+        yield json.dumps(
+            {
+                "assignments": [
+                    {
+                        "id": assignment_id,
+                        "title": title,
+                        "question_ids": [
+                            question[0] for question in self.questions[start:stop]
+                        ],
+                    }
+                    for (assignment_id, title), (start, stop) in zip(
+                        self.assignments, self.assignment_columns
+                    )
+                ],
+                "questions": [
+                    {
+                        "id": question_id,
+                        "assignment_id": assignment_id,
+                        "number": number,
+                        "title": title,
+                        "max_points": float(max_points),
+                    }
+                    for question_id, assignment_id, number, title, max_points, _ in self.questions
+                ],
+            }
+        )[:-1] + ', "students": ['
+        for index, (user_id, name, email) in enumerate(self.students):
+            student = {
+                "id": user_id,
+                "name": name,
+                "email": email,
+                "scores": [_cell(value) for value in self.scores[index]],
+                "assignment_totals": [
+                    round(float(total), 2) if graded else None
+                    for total, graded in zip(
+                        self.assignment_totals[index], self.assignment_graded[index]
+                    )
+                ],
+                "total": self._total(index),
+            }
+            yield ("," if index else "") + json.dumps(student)
+        yield "]}"
+
+
+def _cell(value):
+    return None if np.isnan(value) else round(float(value), 2)
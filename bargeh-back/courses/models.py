@@ -2,6 +2,31 @@ from django.db import models
 from users.models import User
 
 
+class CourseQuerySet(models.QuerySet):
+    def with_counts(self):
+        """Load the owner eagerly and annotate student and assignment counts.
+
+        Each count is a correlated subquery so the two joins do not multiply
+        each other's rows or collide with filters on memberships.
+        """
+        return self.select_related("owner").annotate(
+            students_count=_related_count(
+                "memberships",
+                models.Q(memberships__role=CourseMembership.Role.STUDENT),
+            ),
+            assignments_count=_related_count("assignments"),
+        )
+
+
+def _related_count(relation, filter=None):
+    return models.Subquery(
+        Course.objects.filter(pk=models.OuterRef("pk"))
+        .annotate(count=models.Count(relation, filter=filter))
+        .values("count"),
+        output_field=models.IntegerField(),
+    )
+
+
 class Course(models.Model):
     class Term(models.TextChoices):
         FALL = "fall", "پاییز"
@@ -24,6 +49,8 @@ class Course(models.Model):
     year = models.IntegerField(default=1403)  # Persian year
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = CourseQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.code} - {self.title}"
 
@@ -56,6 +83,23 @@ class Course(models.Model):
         return self.memberships.filter(user=user).exists()
 
 
+class CourseMembershipQuerySet(models.QuerySet):
+    def with_submission_count(self):
+        """Load members eagerly and annotate their submissions in the course"""
+        return self.select_related("user", "course").annotate(
+            submission_count=models.Count(
+                "user__student_submissions",
+                filter=models.Q(
+                    user__student_submissions__assignment__course=models.F("course")
+                ),
+            )
+        )
+
+    def roles_by_course(self, user):
+        """{course_id: role} for every course the user is a member of"""
+        return dict(self.filter(user=user).values_list("course_id", "role"))
+
+
 class CourseMembership(models.Model):
     class Role(models.TextChoices):
         INSTRUCTOR = "instructor", "Instructor"
@@ -69,6 +113,8 @@ class CourseMembership(models.Model):
     role = models.CharField(max_length=12, choices=Role.choices)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = CourseMembershipQuerySet.as_manager()
+
     class Meta:
         unique_together = ("user", "course")
 
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from .models import Course, CourseMembership
 from users.serializers import UserProfileSerializer
+from common.fields import SparseFieldsetMixin
+from common.metrics import TimedSerializerMixin
 
 
 class CourseCreateSerializer(serializers.ModelSerializer):
@@ -73,7 +75,7 @@ class CourseUpdateSerializer(serializers.ModelSerializer):
         return value
 
 
-class CourseSerializer(serializers.ModelSerializer):
+class CourseSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     instructor_detail = UserProfileSerializer(source="owner", read_only=True)
     enrolled_students_count = serializers.SerializerMethodField()
     is_enrolled = serializers.SerializerMethodField()
@@ -99,23 +101,34 @@ class CourseSerializer(serializers.ModelSerializer):
         fields = "__all__"
         read_only_fields = ("instructor", "created_at", "invite_code")
 
-    def get_enrolled_students_count(self, obj):
+    def _student_count(self, obj):
+        # Annotated by Course.objects.with_counts()
+        if hasattr(obj, "students_count"):
+            return obj.students_count
         return obj.memberships.filter(role=CourseMembership.Role.STUDENT).count()
 
-    def get_is_enrolled(self, obj):
+    def _membership_role(self, obj):
+        """The requesting user's role in the course, or None if not a member"""
         request = self.context.get("request")
-        if request and request.user.is_authenticated:
-            return obj.memberships.filter(user=request.user).exists()
-        return False
+        if not (request and request.user.is_authenticated):
+            return None
+        # Views listing courses put the map in the context; otherwise it is
+        # loaded once here and shared by every course in this serializer
+        roles = self.context.get("membership_roles")
+        if roles is None:
+            roles = CourseMembership.objects.roles_by_course(request.user)
+            self.context["membership_roles"] = roles
+        return roles.get(obj.pk)
+
+    def get_enrolled_students_count(self, obj):
+        return self._student_count(obj)
+
+    def get_is_enrolled(self, obj):
+        return self._membership_role(obj) is not None
 
     def get_user_role(self, obj):
         """Get the user's role in this course"""
-        request = self.context.get("request")
-        if request and request.user.is_authenticated:
-            membership = obj.memberships.filter(user=request.user).first()
-            if membership:
-                return membership.role
-        return None
+        return self._membership_role(obj)
 
     def get_instructor(self, obj):
         if obj.owner:
@@ -123,7 +136,7 @@ class CourseSerializer(serializers.ModelSerializer):
         return "Unknown Instructor"
 
     def get_students(self, obj):
-        return obj.memberships.filter(role=CourseMembership.Role.STUDENT).count()
+        return self._student_count(obj)
 
     def get_rating(self, obj):
         return 4.5  # Default rating
@@ -141,12 +154,12 @@ class CourseSerializer(serializers.ModelSerializer):
         return "https://images.unsplash.com/photo-1633356122544-f134324a6cee?w=400&h=250&fit=crop"  # Default image
 
     def get_enrolled(self, obj):
-        request = self.context.get("request")
-        if request and request.user.is_authenticated:
-            return obj.memberships.filter(user=request.user).exists()
-        return False
+        return self._membership_role(obj) is not None
 
     def get_assignments(self, obj):
+        # Annotated by Course.objects.with_counts()
+        if hasattr(obj, "assignments_count"):
+            return obj.assignments_count
         return obj.assignments.count()  # Actual assignments count
 
     def get_term(self, obj):
@@ -174,7 +187,9 @@ class CourseSerializer(serializers.ModelSerializer):
         return course
 
 
-class CourseMembershipSerializer(serializers.ModelSerializer):
+class CourseMembershipSerializer(
+    SparseFieldsetMixin, TimedSerializerMixin, serializers.ModelSerializer
+):
     user = UserProfileSerializer(read_only=True)
     submission_count = serializers.SerializerMethodField()
 
@@ -188,6 +203,10 @@ class CourseMembershipSerializer(serializers.ModelSerializer):
         if obj.role != CourseMembership.Role.STUDENT:
             return 0
 
+        # Annotated by CourseMembership.objects.with_submission_count()
+        if hasattr(obj, "submission_count"):
+            return obj.submission_count
+
         from assignments.models import Submission
 
         return Submission.objects.filter(
@@ -0,0 +1,116 @@
+import csv
+import io
+import json
+
+from django.urls import reverse
+
+from common.tests.fixtures import (
+    MediaTestCase,
+    create_assignment,
+    create_course,
+    create_question,
+    create_submission,
+    create_user,
+    enroll,
+    grade,
+)
+from courses.models import CourseMembership
+
+
+class GradebookTests(MediaTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = create_user(is_instructor=True)
+        cls.student = create_user()
+        # Enrolled but has not submitted
+        cls.late_student = create_user()
+        cls.course = create_course(cls.instructor)
+        enroll(cls.course, cls.instructor, CourseMembership.Role.INSTRUCTOR)
+        enroll(cls.course, cls.student)
+        enroll(cls.course, cls.late_student)
+
+        cls.assignment = create_assignment(cls.course, total_points=20)
+        cls.questions = [create_question(cls.assignment, number) for number in (1, 2)]
+        submission = create_submission(cls.assignment, cls.student)
+        # The second question is left ungraded
+        question = cls.questions[0]
+        grade(submission, question, [question.rubric_items.get(label="Wrong")])
+
+    def setUp(self):
+        self.client = self.client_for(self.instructor)
+        self.url = reverse("course-gradebook", args=[self.course.id])
+
+    def export(self, fmt):
+        response = self.client.get(self.url, {"export": fmt})
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_json(self):
+        gradebook = json.loads(self.export("json"))
+        self.assertEqual(
+            gradebook["assignments"],
+            [
+                {
+                    "id": self.assignment.id,
+                    "title": self.assignment.title,
+                    "question_ids": [question.id for question in self.questions],
+                }
+            ],
+        )
+        self.assertEqual(
+            [question["max_points"] for question in gradebook["questions"]],
+            [10.0, 10.0],
+        )
+
+        students = {student["id"]: student for student in gradebook["students"]}
+        self.assertEqual(len(students), 2)
+        student = students[self.student.id]
+        self.assertEqual(student["scores"], [6.0, None])
+        self.assertEqual(student["assignment_totals"], [6.0])
+        self.assertEqual(student["total"], 6.0)
+
+        late = students[self.late_student.id]
+        self.assertEqual(late["scores"], [None, None])
+        self.assertEqual(late["assignment_totals"], [None])
+        self.assertIsNone(late["total"])
+
+    def test_csv(self):
+        content = self.export("csv")
+        self.assertTrue(content.startswith("\ufeff"))
+        header, *rows = csv.reader(io.StringIO(content[1:]))
+        self.assertEqual(
+            header,
+            [
+                "Student",
+                "Email",
+                "Homework 1 - Q1",
+                "Homework 1 - Q2",
+                "Homework 1 - Total",
+                "Total",
+            ],
+        )
+
+        rows = {row[1]: row[2:] for row in rows}
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[self.student.email], ["6.0", "", "6.0", "6.0"])
+        self.assertEqual(rows[self.late_student.email], ["", "", "", ""])
+
+    def test_csv_cells_are_not_read_as_formulas(self):
+        self.student.first_name = "=HYPERLINK(1)"
+        self.student.save(update_fields=["first_name"])
+        content = self.export("csv")
+        rows = {row[1]: row for row in csv.reader(io.StringIO(content[1:]))}
+        self.assertTrue(rows[self.student.email][0].startswith("'=HYPERLINK(1)"))
+
+    def test_only_instructors_see_the_gradebook(self):
+        teaching_assistant = create_user()
+        enroll(self.course, teaching_assistant, CourseMembership.Role.TA)
+        for user, expected in (
+            (teaching_assistant, 403),
+            (self.student, 403),
+            # Instructors see every course, as in the rest of the API
+            (create_user(is_instructor=True), 200),
+        ):
+            with self.subTest(user=user.email):
+                response = self.client_for(user).get(self.url)
+                self.assertEqual(response.status_code, expected)
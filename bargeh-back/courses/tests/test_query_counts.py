@@ -0,0 +1,59 @@
+from common.tests import query_counts
+from common.tests.query_counts import Endpoint
+
+
+def course(d):
+    return [d.course.id]
+
+
+class CourseQueryCountTests(query_counts.QueryCountTestCase):
+    urls_module = "courses.urls"
+    endpoints = [
+        Endpoint("course-list"),
+        Endpoint("course-list", user="student"),
+        Endpoint(
+            "course-list",
+            "post",
+            data=lambda d: {"title": "New course", "code": "NEW"},
+            status=201,
+        ),
+        Endpoint("course-detail", args=course),
+        Endpoint("course-detail", args=course, user="student"),
+        Endpoint(
+            "course-detail", "patch", args=course, data=lambda d: {"title": "Renamed"}
+        ),
+        # A course with assignments cannot be deleted
+        Endpoint(
+            "course-detail", "delete", args=lambda d: [d.other_course.id], status=204
+        ),
+        Endpoint(
+            "enroll-course",
+            "post",
+            data=lambda d: {"invite_code": d.course.invite_code},
+            user="outsider",
+        ),
+        Endpoint(
+            "enroll-by-code",
+            "post",
+            data=lambda d: {"invite_code": d.course.invite_code},
+            user="outsider",
+            status=201,
+        ),
+        Endpoint("unenroll-from-course", "delete", args=course, user="student"),
+        Endpoint("roster-list", args=course),
+        Endpoint("roster-list", args=course, query=lambda d: "fields=user,role"),
+        Endpoint("course-gradebook", args=course),
+        Endpoint("course-gradebook", args=course, query=lambda d: "export=csv"),
+        Endpoint(
+            "remove-student-from-course",
+            "delete",
+            args=lambda d: [d.course.id, d.student_membership.id],
+        ),
+        Endpoint(
+            "add-user-to-course",
+            "post",
+            args=course,
+            data=lambda d: {"email": d.outsider.email},
+            status=201,
+        ),
+    ]
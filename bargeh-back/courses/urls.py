@@ -14,6 +14,7 @@ urlpatterns = [
     path(
         "<int:course_id>/roster/", views.CourseRosterView.as_view(), name="roster-list"
     ),
+    path("<int:course_id>/gradebook/", views.course_gradebook, name="course-gradebook"),
     path(
         "<int:course_id>/roster/<int:membership_id>/remove/",
         views.RemoveStudentFromCourseView.as_view(),
@@ -1,10 +1,15 @@
 from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.http import StreamingHttpResponse
 from django.db import models
 from django.contrib.auth import get_user_model
+from common.export import stream_csv, stream_xlsx
+from common.fields import requested_fields
+from common.pagination import KeysetCursorPagination
+from .gradebook import Gradebook
 from .models import Course, CourseMembership
 
 User = get_user_model()
@@ -16,8 +21,6 @@ from .serializers import (
     EnrollCourseSerializer,
     EnrollByCodeSerializer,
 )
-from common.permissions import IsAuthenticated
-from rest_framework.permissions import IsAuthenticated, AllowAny
 
 
 class CourseListCreateView(generics.ListCreateAPIView):
@@ -28,16 +31,28 @@ class CourseListCreateView(generics.ListCreateAPIView):
 
         # Instructors see all courses (full access)
         if user.is_instructor:
-            return Course.objects.all()
+            courses = Course.objects.all()
+        else:
+            # Students see courses they're enrolled in
+            courses = Course.objects.filter(memberships__user=user).distinct()
 
-        # Students see courses they're enrolled in
-        return Course.objects.filter(memberships__user=user).distinct()
+        # Newest first; a stable order keeps the pages from overlapping
+        return courses.with_counts().order_by("-created_at", "id")
 
     def get_serializer_class(self):
         if self.request.method == "POST":
             return CourseCreateSerializer
         return CourseSerializer
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request.method == "GET":
+            # One query for the user's role in every listed course
+            context["membership_roles"] = CourseMembership.objects.roles_by_course(
+                self.request.user
+            )
+        return context
+
 
 class CourseDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
@@ -47,10 +62,10 @@ class CourseDetailView(generics.RetrieveUpdateDestroyAPIView):
 
         # Instructors can access all courses (full access)
         if user.is_instructor:
-            return Course.objects.all()
+            return Course.objects.with_counts()
 
         # Students can access courses they're enrolled in
-        return Course.objects.filter(memberships__user=user).distinct()
+        return Course.objects.filter(memberships__user=user).distinct().with_counts()
 
     def get_serializer_class(self):
         if self.request.method in ["PUT", "PATCH"]:
@@ -116,13 +131,71 @@ def enroll_course(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+GRADEBOOK_EXPORTS = {
+    "json": ("application/json", None),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "xlsx": (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "xlsx",
+    ),
+}
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def course_gradebook(request, course_id):
+    """Every student's score on every question of the course (?export=json|csv|xlsx)"""
+    if not request.user.is_instructor:
+        return Response(
+            {"detail": "فقط استاد به دفتر نمرات دسترسی دارد"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    course = get_object_or_404(Course, id=course_id)
+
+    export = request.query_params.get("export", "json")
+    if export not in GRADEBOOK_EXPORTS:
+        return Response(
+            {"detail": "export must be one of: json, csv, xlsx"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    gradebook = Gradebook(course)
+    if export == "csv":
+        content = stream_csv(gradebook.rows())
+    elif export == "xlsx":
+        content = stream_xlsx(gradebook.rows(), sheet_name="Gradebook")
+    else:
+        content = gradebook.stream_json()
+
+    content_type, extension = GRADEBOOK_EXPORTS[export]
+    response = StreamingHttpResponse(content, content_type=content_type)
+    if extension:
+        response["Content-Disposition"] = (
+            f'attachment; filename="gradebook-{course.id}.{extension}"'
+        )
+    return response
+
+
+class RosterPagination(KeysetCursorPagination):
+    page_size = 20
+
+
 class CourseRosterView(generics.ListAPIView):
     serializer_class = CourseMembershipSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = RosterPagination
 
     def get_queryset(self):
         course_id = self.kwargs["course_id"]
-        return CourseMembership.objects.filter(course_id=course_id)
+        return CourseMembership.objects.filter(
+            course_id=course_id
+        ).with_submission_count()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"] = requested_fields(self.request)
+        return context
 
 
 class EnrollByCodeView(generics.CreateAPIView):
@@ -1,5 +1,7 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Coalesce, Concat, NullIf, Trim
 
 
 class UserManager(BaseUserManager):
@@ -38,3 +40,20 @@ class User(AbstractUser):
     def role(self) -> str:
         """Return the user's role as a string"""
         return "instructor" if self.is_instructor else "student"
+
+
+def display_name_expression(prefix="", default="Unassigned"):
+    """SQL expression for a user's display name: name, then full name, then email
+
+    ``prefix`` is the lookup path to the user, e.g. ``"student__"``.
+    """
+    full_name = Trim(
+        Concat(f"{prefix}first_name", Value(" "), f"{prefix}last_name"),
+    )
+    return Coalesce(
+        NullIf(f"{prefix}name", Value("")),
+        NullIf(full_name, Value("")),
+        f"{prefix}email",
+        Value(default),
+        output_field=models.CharField(),
+    )
@@ -1,3 +1,45 @@
-from django.test import TestCase
+from rest_framework_simplejwt.tokens import RefreshToken
 
-# Create your tests here.
+from common.tests import query_counts
+from common.tests.fixtures import PASSWORD
+from common.tests.query_counts import Endpoint
+
+
+def refresh_token(d):
+    return {"refresh": str(RefreshToken.for_user(d.student))}
+
+
+class UserQueryCountTests(query_counts.QueryCountTestCase):
+    urls_module = "users.urls"
+    endpoints = [
+        Endpoint(
+            "student_signup",
+            "post",
+            data=lambda d: {
+                "email": "new.student@example.com",
+                "password": PASSWORD,
+                "name": "New Student",
+            },
+            user=None,
+            status=201,
+        ),
+        Endpoint(
+            "login",
+            "post",
+            data=lambda d: {"email": d.student.email, "password": PASSWORD},
+            user=None,
+        ),
+        Endpoint("token_refresh", "post", data=refresh_token, user=None),
+        Endpoint("logout", "post", data=refresh_token, user="student"),
+        Endpoint("me", user="student"),
+        Endpoint("profile", user="student"),
+        Endpoint(
+            "profile", "patch", data=lambda d: {"name": "Renamed"}, user="student"
+        ),
+        Endpoint(
+            "profile",
+            "put",
+            data=lambda d: {"name": "Renamed", "email": d.student.email},
+            user="student",
+        ),
+    ]
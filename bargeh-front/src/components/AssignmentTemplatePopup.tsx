@@ -9,6 +9,7 @@ import {
   Spinner,
 } from '@chakra-ui/react';
 import { useColorModeValue } from '@/hooks/useColorMode';
+import { fetchPdf } from '@/services/api';
 import { FiDownload, FiFile, FiX } from 'react-icons/fi';
 
 interface AssignmentTemplatePopupProps {
@@ -33,17 +34,21 @@ const AssignmentTemplatePopup: React.FC<AssignmentTemplatePopupProps> = ({
   const subtleText = useColorModeValue("gray.600", "gray.300");
   const borderColor = useColorModeValue("gray.200", "gray.600");
 
-  const handleDownload = () => {
+  const handleDownload = async () => {
     if (templateUrl) {
+      // The template endpoint needs the auth header, so download through
+      // the API client and hand the browser a blob URL
+      const arrayBuffer = await fetchPdf(templateUrl);
+      const blobUrl = URL.createObjectURL(new Blob([arrayBuffer], { type: 'application/pdf' }));
+
       // Create a temporary link element to trigger download
       const link = document.createElement('a');
-      link.href = templateUrl.startsWith('http') 
-        ? templateUrl 
-        : `http://localhost:8000${templateUrl}`;
+      link.href = blobUrl;
       link.download = `template_${assignmentTitle.replace(/\s+/g, '_')}.pdf`;
       document.body.appendChild(link);
       link.click();
       document.body.removeChild(link);
+      URL.revokeObjectURL(blobUrl);
     }
   };
 
@@ -2,6 +2,7 @@ import React, { useState, useCallback, useRef, useEffect } from 'react';
 import { Box, VStack, HStack, Text, Button, Icon, Spinner } from '@chakra-ui/react';
 import { FiPlus, FiX, FiSave, FiZoomIn, FiZoomOut, FiRotateCw } from 'react-icons/fi';
 import { Document, Page, pdfjs } from 'react-pdf';
+import { fetchPdf as fetchPdfData } from '@/services/api';
 
 // Set up PDF.js worker - use local file from public directory
 pdfjs.GlobalWorkerOptions.workerSrc = '/pdf.worker.min.js';
@@ -51,7 +52,7 @@ const GradescopePDFViewer: React.FC<GradescopePDFViewerProps> = ({
     console.log('GradescopePDFViewer - PDF URL:', pdfUrl);
   }, [pdfUrl]);
 
-  // Fetch PDF with proper credentials
+  // Fetch PDF through the authenticated API client
   useEffect(() => {
     if (!pdfUrl) {
       setError('No PDF URL provided');
@@ -72,23 +73,7 @@ const GradescopePDFViewer: React.FC<GradescopePDFViewerProps> = ({
         setError(null);
         console.log('Fetching PDF from:', pdfUrl);
         
-        const response = await fetch(pdfUrl, {
-          credentials: 'include', // Send cookies/session
-          headers: {
-            'Accept': 'application/pdf',
-          },
-        });
-
-        if (!response.ok) {
-          throw new Error(`HTTP ${response.status}: ${response.statusText}`);
-        }
-
-        const contentType = response.headers.get('content-type');
-        if (!contentType || !contentType.includes('application/pdf')) {
-          throw new Error(`Invalid content type: ${contentType}. Expected application/pdf`);
-        }
-
-        const arrayBuffer = await response.arrayBuffer();
+        const arrayBuffer = await fetchPdfData(pdfUrl);
         if (aborted) return;
 
         // Create a Blob URL to avoid ArrayBuffer transfer issues
@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { useParams, useNavigate } from 'react-router-dom';
+import { useParams, useNavigate, useSearchParams } from 'react-router-dom';
 import {
   Box,
   Grid,
@@ -16,7 +16,7 @@ import {
 import { FiChevronLeft, FiChevronRight, FiZoomIn, FiZoomOut, FiRotateCw, FiTrash2, FiCheck, FiX } from 'react-icons/fi';
 import { Document, Page, pdfjs } from 'react-pdf';
 import DynamicSidebar from '../../components/DynamicSidebar';
-import { api } from '../../services/api';
+import { api, fetchPdf as fetchPdfData } from '../../services/api';
 import { useColorModeValue } from '../../hooks/useColorMode';
 import { rubricService, type RubricItem, type SubmissionGrade } from '../../services/rubricService';
 
@@ -38,8 +38,25 @@ interface SubmissionGradingData {
   file_url: string;
   previous_submission_id: number | null;
   next_submission_id: number | null;
+  previous_submission_position: number | null;
+  next_submission_position: number | null;
 }
 
+// Progress counts are only sent when a grading session starts; later steps
+// carry them over from the previous submission
+type GradingProgress = Pick<
+  SubmissionGradingData,
+  'total_submissions' | 'graded_submissions' | 'progress_percentage' | 'total_submissions_for_question'
+>;
+
+const withGradedCount = <T extends GradingProgress>(data: T, gradedSubmissions: number): T => ({
+  ...data,
+  graded_submissions: gradedSubmissions,
+  progress_percentage: data.total_submissions === 0
+    ? 0
+    : Math.floor((gradedSubmissions / data.total_submissions) * 100),
+});
+
 
 const SubmissionGradingPage: React.FC = () => {
   const { courseId, assignmentId, questionId, submissionId } = useParams<{
@@ -49,6 +66,8 @@ const SubmissionGradingPage: React.FC = () => {
     submissionId: string;
   }>();
   const navigate = useNavigate();
+  const [searchParams] = useSearchParams();
+  const position = searchParams.get('position');
 
   const [gradingData, setGradingData] = useState<SubmissionGradingData | null>(null);
   const [rubricItems, setRubricItems] = useState<RubricItem[]>([]);
@@ -77,9 +96,9 @@ const SubmissionGradingPage: React.FC = () => {
 
   useEffect(() => {
     loadGradingData();
-  }, [courseId, assignmentId, questionId, submissionId]);
+  }, [courseId, assignmentId, questionId, submissionId, position]);
 
-  // Fetch PDF with proper credentials
+  // Fetch PDF through the authenticated API client
   useEffect(() => {
     console.log('PDF useEffect triggered, gradingData:', gradingData);
     if (!gradingData?.file_url) {
@@ -113,23 +132,7 @@ const SubmissionGradingPage: React.FC = () => {
         
         console.log('Fetching PDF from:', pdfUrl);
         
-        const response = await fetch(pdfUrl, {
-          credentials: 'include', // Send cookies/session
-          headers: {
-            'Accept': 'application/pdf',
-          },
-        });
-
-        if (!response.ok) {
-          throw new Error(`HTTP ${response.status}: ${response.statusText}`);
-        }
-
-        const contentType = response.headers.get('content-type');
-        if (!contentType || !contentType.includes('application/pdf')) {
-          throw new Error(`Invalid content type: ${contentType}. Expected application/pdf`);
-        }
-
-        const arrayBuffer = await response.arrayBuffer();
+        const arrayBuffer = await fetchPdfData(pdfUrl);
         if (aborted) return;
 
         // Create a Blob URL to avoid ArrayBuffer transfer issues
@@ -156,19 +159,34 @@ const SubmissionGradingPage: React.FC = () => {
   }, [gradingData?.file_url]);
 
   const loadGradingData = async () => {
+    // A reloaded or linked page has no progress to carry over yet
+    const stepping = position !== null && gradingData !== null;
     try {
       setIsLoading(true);
       setError(null);
 
-      // Load grading data
+      // Load grading data; stepping from another submission passes its
+      // position so the server skips the progress counts
       const response = await api.get(
-        `/api/assignments/${assignmentId}/questions/${questionId}/submissions/${submissionId}/grade/`
+        `/api/assignments/${assignmentId}/questions/${questionId}/submissions/${submissionId}/grade/`,
+        stepping ? { params: { position } } : undefined
       );
       
       const gradingData = response as SubmissionGradingData;
       console.log('Loaded grading data:', gradingData);
       console.log('PDF file URL:', gradingData.file_url);
-      setGradingData(gradingData);
+      setGradingData(previous => {
+        if (gradingData.total_submissions !== undefined || !previous) {
+          return gradingData;
+        }
+        const progress: GradingProgress = {
+          total_submissions: previous.total_submissions,
+          graded_submissions: previous.graded_submissions,
+          progress_percentage: previous.progress_percentage,
+          total_submissions_for_question: previous.total_submissions_for_question,
+        };
+        return { ...gradingData, ...progress };
+      });
       
       // Load rubric items from the backend
       try {
@@ -239,14 +257,14 @@ const SubmissionGradingPage: React.FC = () => {
   const goToPreviousSubmission = () => {
     if (gradingData && gradingData.previous_submission_id) {
       // Navigate to previous submission using the correct submission ID
-      navigate(`/courses/${courseId}/assignments/${assignmentId}/questions/${questionId}/submissions/${gradingData.previous_submission_id}/grade`);
+      navigate(`/courses/${courseId}/assignments/${assignmentId}/questions/${questionId}/submissions/${gradingData.previous_submission_id}/grade?position=${gradingData.previous_submission_position}`);
     }
   };
 
   const goToNextSubmission = () => {
     if (gradingData && gradingData.next_submission_id) {
       // Navigate to next submission using the correct submission ID
-      navigate(`/courses/${courseId}/assignments/${assignmentId}/questions/${questionId}/submissions/${gradingData.next_submission_id}/grade`);
+      navigate(`/courses/${courseId}/assignments/${assignmentId}/questions/${questionId}/submissions/${gradingData.next_submission_id}/grade?position=${gradingData.next_submission_position}`);
     }
   };
 
@@ -290,6 +308,12 @@ const SubmissionGradingPage: React.FC = () => {
       
       // Update with the server response
       setSubmissionGrade(updatedGrade);
+      // The first grade of this submission counts towards the progress
+      if (!submissionGrade.id && updatedGrade.id) {
+        setGradingData(previous =>
+          previous && withGradedCount(previous, previous.graded_submissions + 1)
+        );
+      }
       console.log('Rubric item toggled successfully:', itemId, 'New selection:', newSelectedIds, 'New total:', updatedGrade.total_points);
     } catch (error) {
       console.error('Error updating submission grade:', error);
@@ -80,4 +80,24 @@ export const api = {
     apiClient.delete(url, config).then(response => response.data),
 };
 
+// Fetch a PDF as an ArrayBuffer. Backend file URLs are permission-checked,
+// so they go through apiClient for the Bearer token and refresh handling;
+// local blob: URLs (files picked before upload) are read directly.
+export const fetchPdf = async (url: string): Promise<ArrayBuffer> => {
+  if (url.startsWith('blob:')) {
+    const response = await fetch(url);
+    return response.arrayBuffer();
+  }
+
+  const response = await apiClient.get<ArrayBuffer>(url, {
+    responseType: 'arraybuffer',
+    headers: { Accept: 'application/pdf, */*' },
+  });
+  const contentType = response.headers['content-type'];
+  if (!contentType || !String(contentType).includes('application/pdf')) {
+    throw new Error(`Invalid content type: ${contentType}. Expected application/pdf`);
+  }
+  return response.data;
+};
+
 export default apiClient;